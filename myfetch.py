@@ -1,33 +1,44 @@
 #!/usr/bin/env python3
+import time
+_STARTED = time.perf_counter()
+
 import sys
-import argparse
 import os
-import json
 from src.core.scanner import Scanner
 from src.core.formatter import Formatter
-from src.modules.performance import PerformanceModule
-from src.modules.network import NetworkModule
-from src.modules.health import HealthModule
-from src.modules.storage import StorageModule
-from src.modules.security import SecurityModule
-from src.modules.services import ServicesModule
-from src.modules.hardware import HardwareModule
+from src.core.scheduler import CollectorScheduler
+from src.core.cache import FactCache
+from src.core.registry import ModuleRegistry, BUILTIN_MODULES
+from src.core.rules import RuleEngine, health_facts, health_verdict
+_IMPORTED = time.perf_counter()
 
 class MyFetch:
-    def __init__(self, use_icons=False, use_colors=True):
-        self.scanner = Scanner()
+    def __init__(self, use_icons=False, use_colors=True, use_cache=True, refresh_cache=False, root='/'):
+        self.cache = FactCache(enabled=use_cache, refresh=refresh_cache)
+        self.scanner = Scanner(cache=self.cache, root=root)
         self.formatter = Formatter(use_icons=use_icons, use_colors=use_colors)
+        self.scheduler = CollectorScheduler()
+        # Machine-readable output also carries storage and top processes
+        self.include_details = False
         self.config_path = os.path.expanduser("~/.config/myfetch/config")
+        self.rules = None
         self.load_config()
+        if self.rules is None:
+            self.rules = RuleEngine.default()
 
     def load_config(self):
         """Loads configuration from ~/.config/myfetch/config (simple JSON for now)."""
         if os.path.exists(self.config_path):
+            import json
             try:
                 with open(self.config_path, 'r') as f:
                     config = json.load(f)
                     self.formatter.use_icons = config.get('icons', self.formatter.use_icons)
                     self.formatter.use_colors = config.get('colors', self.formatter.use_colors)
+                if 'rules' in config or 'default_rules' in config:
+                    self.rules, errors = RuleEngine.from_config(config)
+                    for error in errors:
+                        print(f"myfetch: {self.config_path}: {error}", file=sys.stderr)
             except (json.JSONDecodeError, PermissionError):
                 # Ignore malformed or unreadable config
                 pass
@@ -35,32 +46,53 @@ class MyFetch:
                 # Fallback for unexpected issues
                 pass
 
-    def get_health_status(self, load, mem_percent):
-        reasons = []
-        if load > 5.0: reasons.append("Critical system load")
-        elif load > 2.0: reasons.append("High system load")
-        
-        if mem_percent > 90: reasons.append("Critical memory usage")
-        elif mem_percent > 75: reasons.append("High memory usage")
+    def get_health_verdict(self, load, mem_percent, pressure=None):
+        """Returns (verdict, reasons) from the alert rules over the load, memory usage and PSI.
+
+        `load` is the 1-minute load average or the 1/5/15-minute triple. The
+        built-in rules only consult it when the kernel reports no pressure
+        stall information: the load counts runnable and D-state tasks without
+        regard to core count and so flags busy-but-healthy many-core machines.
+        """
+        loads = [load] if isinstance(load, (int, float)) else load
+        facts = health_facts(load=loads, memory_percent=mem_percent, pressure=pressure or {})
+        return health_verdict(self.rules.evaluate(facts))
 
+    def get_health_status(self, load, mem_percent, pressure=None):
+        verdict, reasons = self.get_health_verdict(load, mem_percent, pressure)
+        return self.format_health(verdict, reasons)
+
+    def format_health(self, verdict, reasons):
         reason_str = f" ({', '.join(reasons)})" if reasons else ""
-        
-        if load > 5.0 or mem_percent > 90:
-            return self.formatter.color("Needs Attention", "red", bold=True) + self.formatter.color(reason_str, "gray")
-        elif load > 2.0 or mem_percent > 75:
-            return self.formatter.color("Warning", "yellow", bold=True) + self.formatter.color(reason_str, "gray")
-        return self.formatter.color("Healthy", "green", bold=True)
+        if verdict == "Needs Attention":
+            return self.formatter.color(verdict, "red", bold=True) + self.formatter.color(reason_str, "gray")
+        elif verdict == "Warning":
+            return self.formatter.color(verdict, "yellow", bold=True) + self.formatter.color(reason_str, "gray")
+        return self.formatter.color(verdict, "green", bold=True)
 
-    def show_default(self):
-        os_info = self.scanner.get_os_release()
-        kernel = self.scanner.get_kernel_version()
-        hostname = self.scanner.get_hostname()
-        uptime = self.scanner.get_uptime()
-        cpu = self.scanner.get_cpuinfo()
-        mem = self.scanner.get_meminfo()
-        battery = self.scanner.get_battery_info()
-        load = self.scanner.get_loadavg()
-        ips = self.scanner.get_ip_addresses()
+    def register_collectors(self, scheduler: CollectorScheduler):
+        """Registers the collectors used by the default summary view."""
+        scheduler.register('os', self.scanner.get_os_release, default={})
+        scheduler.register('kernel', self.scanner.get_kernel_version, default="Unknown")
+        scheduler.register('hostname', self.scanner.get_hostname, default="localhost")
+        scheduler.register('uptime', self.scanner.get_uptime, default=0.0)
+        scheduler.register('cpu', self.scanner.get_cpuinfo, default={})
+        scheduler.register('mem', self.scanner.get_meminfo, default={})
+        scheduler.register('battery', self.scanner.get_battery_info, default=None)
+        scheduler.register('load', self.scanner.get_loadavg, default=[0.0, 0.0, 0.0])
+        scheduler.register('pressure', self.scanner.get_pressure, default={})
+        scheduler.register('ips', self.scanner.get_ip_addresses, default={})
+        scheduler.register('pkgs', self.scanner.get_package_count, timeout=2.5, default="Unknown")
+        if self.include_details:
+            scheduler.register('storage', self.scanner.get_storage_info, default=[])
+            scheduler.register('processes', lambda: self.scanner.get_top_processes(limit=10), default=[])
+
+    def collect(self):
+        """Collects the default summary as plain data."""
+        self.register_collectors(self.scheduler)
+        results = self.scheduler.run()
+        mem = results['mem']
+        load = results['load']
 
         # Calculate memory usage
         total_mem = mem.get('MemTotal', 0)
@@ -68,75 +100,317 @@ class MyFetch:
         used_mem = total_mem - available_mem
         mem_percent = (used_mem / total_mem * 100) if total_mem > 0 else 0
 
-        self.formatter.header(f"System Summary: {hostname}")
+        pressure = results['pressure']
+        verdict, reasons = self.get_health_verdict(load, mem_percent, pressure)
+        data = {
+            'hostname': results['hostname'],
+            'os': results['os'],
+            'kernel': results['kernel'],
+            'uptime': results['uptime'],
+            'cpu': results['cpu'],
+            'memory': {'total': total_mem, 'used': used_mem, 'percent': mem_percent},
+            'packages': results['pkgs'],
+            'ips': results['ips'],
+            'battery': results['battery'],
+            'load': load,
+            'pressure': pressure,
+            'health': {'verdict': verdict, 'reasons': reasons},
+            'timed_out': sorted(results.timed_out),
+        }
+        if self.include_details:
+            data['storage'] = results['storage']
+            data['processes'] = results['processes']
+        return data
+
+    def show_default(self):
+        self.render(self.collect())
+
+    def render(self, data):
+        timed_out = self.formatter.color("timed out", "gray")
+        os_info = data['os']
+        mem = data['memory']
+
+        self.formatter.header(f"System Summary: {data['hostname']}")
         
-        self.formatter.kv("OS", f"{os_info.get('NAME', 'Linux')} {os_info.get('VERSION', '')}", "")
-        self.formatter.kv("Kernel", kernel, "")
-        self.formatter.kv("Uptime", self.formatter.format_uptime(uptime), "")
-        self.formatter.kv("CPU", cpu.get('model', 'Unknown'), "")
+        self.formatter.kv("OS", f"{os_info.get('NAME', 'Linux')} {os_info.get('VERSION', '')}", "")
+        self.formatter.kv("Kernel", timed_out if 'kernel' in data['timed_out'] else data['kernel'], "")
+        self.formatter.kv("Uptime", self.formatter.format_uptime(data['uptime']), "")
+        self.formatter.kv("CPU", timed_out if 'cpu' in data['timed_out'] else data['cpu'].get('model', 'Unknown'), "")
         
-        mem_str = f"{self.formatter.format_size(used_mem)} / {self.formatter.format_size(total_mem)} ({mem_percent:.1f}%)"
-        self.formatter.kv("RAM", f"{mem_str} {self.formatter.get_progress_bar(mem_percent)}", "")
+        mem_str = f"{self.formatter.format_size(mem['used'])} / {self.formatter.format_size(mem['total'])} ({mem['percent']:.1f}%)"
+        self.formatter.kv("RAM", f"{mem_str} {self.formatter.get_progress_bar(mem['percent'])}", "")
 
         # Package Count
-        pkgs = self.scanner.get_package_count()
+        pkgs = timed_out if 'pkgs' in data['timed_out'] else data['packages']
         self.formatter.kv("Packages", pkgs, "󰏖")
 
-        self.formatter.kv("Network", f"Connected ({ips.get('primary', 'Disconnected')})", "󰩟")
+        if 'ips' in data['timed_out']:
+            self.formatter.kv("Network", timed_out, "󰩟")
+        else:
+            primary = data['ips'].get('primary', 'Disconnected')
+            network = "Disconnected" if primary == "Disconnected" else f"Connected ({primary})"
+            self.formatter.kv("Network", network, "󰩟")
 
+        battery = data['battery']
         if battery:
             self.formatter.kv("Battery", f"{battery['capacity']}% ({battery['status']})", "󰁹")
 
         # Health
-        health = self.get_health_status(load[0], mem_percent)
+        health = self.format_health(data['health']['verdict'], data['health']['reasons'])
         self.formatter.kv("System Health", health, "󰓅")
         
         print("\n" + self.formatter.color("Run 'myfetch --help' for detailed modules", "gray"))
 
-def main():
+def positive_float(value):
+    """argparse type for intervals: a number of seconds greater than zero."""
+    import argparse
+    try:
+        seconds = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number of seconds: {value!r}") from None
+    if not 0 < seconds < float('inf'):
+        raise argparse.ArgumentTypeError(f"must be a finite number greater than 0, got {value!r}")
+    return seconds
+
+def listen_address(value):
+    """argparse type for --serve: rejects addresses the exporter cannot listen on."""
+    import argparse
+    from src.core.exporter import parse_listen
+    try:
+        parse_listen(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+    return value
+
+# (flags, argparse options); module flags (--top, --network, ...) come from the registry
+OPTIONS = [
+    (("--icons",), dict(action="store_true", help="Enable Nerd Font icons")),
+    (("--json",), dict(action="store_true", help="Output the selected module's data as JSON")),
+    (("--ndjson",), dict(action="store_true", help="Output one compact JSON line per sample (use with --watch)")),
+    (("--watch",), dict(type=positive_float, default=None, metavar="N", help="Repeat the selected output every N seconds")),
+    (("--interval",), dict(type=positive_float, default=None, metavar="N", help="Refresh interval in seconds for live modes (--top, --network, --cgroups, --storage)")),
+    (("--memory",), dict(choices=("rss", "pss"), default="rss", help="Process memory for --top: rss (fast) or pss (PSS/USS/swap from smaps_rollup, aggregated by name and user)")),
+    (("--sort",), dict(choices=("cpu", "memory", "io", "pressure"), default="memory", help="Resource to rank --cgroups by (default: memory)")),
+    (("--limit",), dict(type=int, default=15, metavar="N", help="Number of entries in top-N tables such as --cgroups, --storage devices and --services boot blame (default: 15)")),
+    (("--all-mounts",), dict(action="store_true", help="With --storage, also list network (NFS, CIFS, ...), FUSE and overlay filesystems")),
+    (("--serve",), dict(type=listen_address, nargs="?", const="127.0.0.1:9877", metavar="ADDR", help="Run as a metrics exporter on HOST:PORT or a unix socket path (default: 127.0.0.1:9877)")),
+    (("--record",), dict(action="store_true", help="Record load, memory, network, temperature and disk samples to a ring file (every --interval seconds, default 10)")),
+    (("--history",), dict(nargs="?", const="1h", metavar="WINDOW", help="Summarize recorded samples, e.g. 2h, 30m or 03:00..04:00 (default: 1h)")),
+    (("--plugin",), dict(metavar="NAME", help="Run a third-party collector registered under the 'myfetch.collectors' entry point")),
+    (("--list-plugins",), dict(action="store_true", help="List installed third-party collectors")),
+    (("--root",), dict(default="/", metavar="PATH", help="Read /proc, /sys and /var under PATH instead of / (e.g. /host)")),
+    (("--bench",), dict(type=int, nargs="?", const=20, metavar="N", help="Time every collector N times (default 20) on a synthetic 50k-process host, or on --root if given")),
+    (("--bench-scale",), dict(type=float, default=1.0, metavar="F", help="Scale the synthetic benchmark host (e.g. 0.1 for a quick run)")),
+    (("--bench-baseline",), dict(metavar="FILE", help="Compare --bench against a previous --bench --json result; exits 1 on regressions")),
+    (("--trace",), dict(metavar="FILE", help="Write a Chrome trace-event JSON of collectors, file reads and subprocesses (open in Perfetto or chrome://tracing)")),
+    (("--stats",), dict(action="store_true", help="Print per-collector time, bytes read, files opened and processes spawned (to stderr)")),
+    (("--no-cache",), dict(action="store_true", help="Do not read or write the fact cache")),
+    (("--refresh",), dict(action="store_true", help="Recompute cached facts and update the cache")),
+    (("--profile-startup",), dict(action="store_true", help="Report time spent on imports and on each collector (to stderr)")),
+]
+
+def parse_args(argv):
+    """Parses the command line. A bare `myfetch` (the MOTD case) skips importing argparse entirely."""
+    module_flags = [(("--" + spec.name,), dict(action="store_true", help=spec.help)) for spec in BUILTIN_MODULES]
+    if not argv:
+        from types import SimpleNamespace
+        defaults = {}
+        for flags, options in module_flags + OPTIONS:
+            default = False if options.get('action') == 'store_true' else options.get('default')
+            defaults[flags[0].lstrip('-').replace('-', '_')] = default
+        return SimpleNamespace(**defaults)
+
+    import argparse
     parser = argparse.ArgumentParser(description="myfetch - Advanced Linux System Information")
-    parser.add_argument("--top", action="store_true", help="Real-time performance monitoring")
-    parser.add_argument("--network", action="store_true", help="Network analysis and status")
-    parser.add_argument("--health", action="store_true", help="System health and diagnostics")
-    parser.add_argument("--storage", action="store_true", help="Storage and filesystem details")
-    parser.add_argument("--security", action="store_true", help="Security status summary")
-    parser.add_argument("--services", action="store_true", help="System services and boot performance")
-    parser.add_argument("--hardware", action="store_true", help="Deep hardware information")
-    parser.add_argument("--icons", action="store_true", help="Enable Nerd Font icons")
-    parser.add_argument("--json", action="store_true", help="Output in JSON format (not all modules support yet)")
-    
-    args = parser.parse_args()
+    for flags, options in module_flags + OPTIONS:
+        parser.add_argument(*flags, **options)
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args(sys.argv[1:])
+    parsed = time.perf_counter()
     
-    fetch = MyFetch(use_icons=args.icons)
+    fetch = MyFetch(use_icons=args.icons, use_cache=not args.no_cache, refresh_cache=args.refresh, root=args.root)
+    registry = ModuleRegistry()
+    tracer = None
+    if args.trace or args.stats:
+        from src.core.tracer import Tracer
+        tracer = Tracer()
+        tracer.install()
+        tracer.instrument(fetch.scanner)
+        fetch.scheduler.tracer = tracer
+
+    if args.bench is not None:
+        from src.modules.bench import BenchModule
+        bench = BenchModule(fetch.formatter, iterations=args.bench, scale=args.bench_scale,
+                            root=args.root if args.root != "/" else None, baseline=args.bench_baseline)
+        if args.json:
+            emit(bench, "bench", args)
+        else:
+            bench.run()
+        # Non-zero exit lets CI fail on a slowdown against --bench-baseline
+        sys.exit(1 if bench.regressions else 0)
     
-    if args.json:
-        # Simple JSON dump of scanner data for now
-        data = {
-            "uptime": fetch.scanner.get_uptime(),
-            "load": fetch.scanner.get_loadavg(),
-            "memory": fetch.scanner.get_meminfo(),
-            "battery": fetch.scanner.get_battery_info(),
-            "storage": fetch.scanner.get_storage_info()
-        }
-        print(json.dumps(data, indent=2))
+    if args.serve:
+        from src.core.exporter import serve
+        serve(fetch.scanner, args.serve, rules=fetch.rules)
+        return
+
+    if args.record or args.history:
+        from src.modules.history import HistoryModule
+        history = HistoryModule(fetch.scanner, fetch.formatter)
+        if args.record:
+            history.record(interval=args.interval or 10.0)
+        else:
+            history.run(args.history)
+        return
+
+    if args.list_plugins:
+        plugins = registry.plugins()
+        if not plugins:
+            print(fetch.formatter.color("No third-party collectors installed.", "gray"))
+        for name, ep in sorted(plugins.items()):
+            print(f"{name:<20} {ep.value}")
         return
 
-    if args.top:
-        PerformanceModule(fetch.scanner, fetch.formatter).run()
-    elif args.network:
-        NetworkModule(fetch.scanner, fetch.formatter).run()
-    elif args.health:
-        HealthModule(fetch.scanner, fetch.formatter).run()
-    elif args.storage:
-        StorageModule(fetch.scanner, fetch.formatter).run()
-    elif args.security:
-        SecurityModule(fetch.scanner, fetch.formatter).run()
-    elif args.services:
-        ServicesModule(fetch.scanner, fetch.formatter).run()
-    elif args.hardware:
-        HardwareModule(fetch.scanner, fetch.formatter).run()
+    name = next((n for n in registry.names() if getattr(args, n)), None)
+    if args.plugin:
+        try:
+            view, name = registry.create_plugin(args.plugin, fetch.scanner, fetch.formatter), args.plugin
+        except KeyError:
+            print(fetch.formatter.color(f"Unknown plugin '{args.plugin}'. See --list-plugins.", "red"), file=sys.stderr)
+            sys.exit(2)
+    elif name:
+        options = {}
+        if name == 'top':
+            options = {'memory': args.memory}
+        elif name == 'cgroups':
+            options = {'sort': args.sort, 'limit': args.limit}
+        elif name == 'storage':
+            options = {'limit': args.limit, 'include_remote': args.all_mounts, 'rules': fetch.rules}
+        elif name in ('packages', 'services'):
+            options = {'limit': args.limit}
+        elif name == 'health':
+            options = {'rules': fetch.rules}
+        view = registry.create(name, fetch.scanner, fetch.formatter, fetch.scheduler, **options)
     else:
-        fetch.show_default()
+        view, name = fetch, "summary"
+
+    collect_start = time.perf_counter()
+    try:
+        if tracer is not None:
+            with tracer.span(f"view {name}", 'view'):
+                show(fetch, view, name, args)
+        else:
+            show(fetch, view, name, args)
+    finally:
+        if tracer is not None:
+            tracer.uninstall()
+            if args.trace:
+                tracer.write_chrome(args.trace)
+            if args.stats:
+                report_stats(fetch.formatter, tracer)
+
+    if args.profile_startup:
+        report_startup(fetch, registry, parsed, collect_start, time.perf_counter())
+
+def show(fetch, view, name, args):
+    """Runs the selected view in the requested output mode."""
+    if args.json or args.ndjson or args.watch:
+        fetch.include_details = args.json or args.ndjson
+        emit(view, name, args)
+    elif args.top and sys.stdout.isatty():
+        view.run_live(interval=args.interval or 2.0)
+    elif (args.network or args.cgroups or args.storage) and args.interval:
+        view.run_live(interval=args.interval)
+    else:
+        # One-shot views are assembled in memory and written in a single write()
+        with fetch.formatter.frame():
+            if view is fetch:
+                fetch.show_default()
+            else:
+                view.run()
+
+def report_stats(formatter, tracer):
+    """Per-span totals on stderr, slowest first."""
+    out = sys.stderr
+    header = f"{'SPAN':<32} {'CALLS':>6} {'TOTAL':>10} {'MAX':>10} {'READ':>10} {'FILES':>6} {'PROCS':>6}"
+    out.write(f"\n{formatter.color('COLLECTOR STATS', 'white', bold=True)}\n{header}\n{'─' * len(header)}\n")
+    for row in tracer.summary(cats=('view', 'collector', 'scanner', 'subprocess', 'io')):
+        out.write(f"{row['name'][:32]:<32} {row['calls']:>6} {row['total'] * 1000:>8.2f}ms {row['max'] * 1000:>8.2f}ms "
+                  f"{formatter.format_size(row['bytes'] / 1024):>10} {row['files']:>6} {row['procs']:>6}\n")
+    out.write(formatter.color("Times include nested spans on the same thread; collectors run in parallel.", "gray") + "\n")
+
+def process_age() -> float:
+    """Seconds since this process was started by the kernel (covers interpreter startup)."""
+    try:
+        with open('/proc/self/stat') as f:
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf('SC_CLK_TCK'))
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+def report_startup(fetch, registry, parsed, collect_start, finished):
+    """Prints where the time went, on stderr so it never mixes with JSON output."""
+    age = process_age()
+    total_wall = finished - _STARTED
+    rows = [
+        ("interpreter startup", max(0.0, age - total_wall)),
+        ("core imports", _IMPORTED - _STARTED),
+        ("argument parsing", parsed - _IMPORTED),
+    ]
+    rows += [(f"import {module}", seconds) for module, seconds in registry.import_times]
+    for group, results in fetch.scheduler.last_results.items():
+        for collector, seconds in sorted(results.durations.items(), key=lambda x: -x[1]):
+            rows.append((f"collector {group}.{collector}", seconds))
+        for collector in sorted(results.timed_out):
+            rows.append((f"collector {group}.{collector} (timed out)", None))
+    rows.append(("collect + render", finished - collect_start))
+
+    out = sys.stderr
+    out.write(f"\n{fetch.formatter.color('STARTUP PROFILE', 'white', bold=True)}\n")
+    for label, seconds in rows:
+        value = "-" if seconds is None else f"{seconds * 1000:8.2f} ms"
+        out.write(f"{label:<45} {value:>12}\n")
+    out.write(f"{'total (process start to exit)':<45} {max(age, total_wall) * 1000:8.2f} ms\n")
+
+def emit(view, name, args):
+    """Writes collect() results as JSON, NDJSON or text, once or every --watch seconds."""
+    import json
+    if args.watch and hasattr(view, 'start_sampling'):
+        view.start_sampling()
+    formatter = getattr(view, 'formatter', None)
+    text = not (args.json or args.ndjson)
+
+    def loop():
+        while True:
+            data = view.collect()
+            if args.ndjson:
+                line = {'ts': round(time.time(), 3), 'module': name, 'data': data}
+                sys.stdout.write(json.dumps(line, separators=(',', ':'), default=str) + "\n")
+            elif args.json:
+                sys.stdout.write(json.dumps(data, indent=2, default=str) + "\n")
+            elif formatter is not None:
+                with formatter.frame():
+                    view.render(data)
+            else:
+                view.render(data)
+            sys.stdout.flush()
+            if not args.watch:
+                return
+            time.sleep(args.watch)
+
+    try:
+        if text and args.watch and formatter is not None:
+            # Repaint in place, sending only the cells that changed
+            with formatter.live():
+                loop()
+        else:
+            loop()
+    except (KeyboardInterrupt, BrokenPipeError):
+        pass
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,572 @@
+import os
+import random
+import shutil
+import struct
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from src.core.scanner import Scanner
+
+# Bump when the generated tree changes so cached fixtures are rebuilt
+FIXTURE_VERSION = 9
+
+# Size of the synthetic host at scale 1.0
+FIXTURE_SIZES = {
+    'processes': 50000,
+    'mounts': 5000,
+    'interfaces': 500,
+    'dpkg_mb': 100,
+    'cgroups': 3000,
+    'nvme_namespaces': 400,
+    'rpm_packages': 3000,
+    'pci_devices': 200,
+}
+
+# Relative p50 slowdown against a baseline that counts as a regression
+REGRESSION_THRESHOLD = 0.20
+
+
+def default_fixture_dir(scale: float) -> str:
+    """Under ~/.cache even for root: /run (the root fact cache) is a small tmpfs."""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'myfetch', 'bench', f"fixture-{scale:g}")
+
+
+def _write(root: str, path: str, data: str):
+    full = os.path.join(root, path)
+    os.makedirs(os.path.dirname(full), exist_ok=True)
+    with open(full, 'w') as f:
+        f.write(data)
+
+
+def _hex_ipv4(a: int, b: int, c: int, d: int) -> str:
+    """An IPv4 address as printed in /proc/net/{tcp,udp}: one little-endian word."""
+    return f"{d:02X}{c:02X}{b:02X}{a:02X}"
+
+
+class FixtureBuilder:
+    """Generates a reproducible synthetic /proc, /sys and /var tree.
+
+    The layout mirrors what Scanner reads on a real host, sized like a busy
+    fleet machine (50k processes, 5k mounts, 500 interfaces, a 100 MB dpkg
+    status file at scale 1.0). Generation is seeded, and a finished tree is
+    marked with a stamp file so later runs reuse it instead of regenerating.
+    """
+
+    STAMP = '.myfetch-fixture'
+
+    def __init__(self, root: str, scale: float = 1.0, seed: int = 1):
+        self.root = root
+        self.scale = scale
+        self.seed = seed
+        self.sizes = {k: max(1, int(v * scale)) for k, v in FIXTURE_SIZES.items()}
+
+    def stamp(self) -> str:
+        return f"{FIXTURE_VERSION} {self.seed} {sorted(self.sizes.items())}\n"
+
+    def is_built(self) -> bool:
+        try:
+            with open(os.path.join(self.root, self.STAMP)) as f:
+                return f.read() == self.stamp()
+        except OSError:
+            return False
+
+    def build(self, force: bool = False) -> str:
+        """Builds the tree if needed and returns its root."""
+        if not force and self.is_built():
+            return self.root
+        if os.path.isdir(self.root):
+            shutil.rmtree(self.root)
+        rng = random.Random(self.seed)
+        self.write_system(rng)
+        self.write_processes(rng)
+        self.write_sockets(rng)
+        self.write_interfaces(rng)
+        self.write_mounts()
+        self.write_block_devices(rng)
+        self.write_cgroups(rng)
+        self.write_dpkg(rng)
+        self.write_rpmdb(rng)
+        self.write_hardware(rng)
+        _write(self.root, self.STAMP, self.stamp())
+        return self.root
+
+    def write_system(self, rng: random.Random):
+        # 2 sockets x 64 cores x 2 SMT threads
+        sockets, cores, threads = 2, 64, 2
+        cpus = sockets * cores * threads
+        _write(self.root, 'proc/meminfo', "".join(f"{k}:{v:>16} kB\n" for k, v in [
+            ('MemTotal', 263921676), ('MemFree', 81223412), ('MemAvailable', 201773584),
+            ('Buffers', 1203312), ('Cached', 110443120), ('SwapCached', 0),
+            ('Shmem', 2201324), ('Slab', 9876544), ('SwapTotal', 8388604), ('SwapFree', 8388604),
+        ]))
+        _write(self.root, 'proc/cpuinfo', "".join(
+            f"processor\t: {i}\nvendor_id\t: GenuineIntel\nmodel name\t: Synthetic Xeon @ 2.40GHz\n"
+            f"cpu MHz\t\t: 2400.000\ncache size\t: 36608 KB\nflags\t\t: fpu vme de pse tsc msr pae mce\n\n"
+            for i in range(cpus)))
+        _write(self.root, 'proc/loadavg', "12.40 10.85 9.97 7/61234 998877\n")
+        _write(self.root, 'proc/uptime', "8640000.12 500000000.50\n")
+        stat = ["cpu  0 0 0 0 0 0 0 0 0 0\n"]
+        for i in range(cpus):
+            busy = rng.randint(0, 9 * 10 ** 7)
+            stat.append(f"cpu{i} {busy} {busy // 50} {busy // 4} {10 ** 8 - busy} {busy // 100} 0 {busy // 200} {busy // 500} 0 0\n")
+        _write(self.root, 'proc/stat', "".join(stat) + "intr 0\nctxt 0\nbtime 1700000000\nprocesses 1000\n")
+        _write(self.root, 'sys/devices/system/cpu/online', f"0-{cpus - 1}\n")
+        _write(self.root, 'sys/devices/system/cpu/smt/active', "1\n")
+        for i in range(cpus):
+            # Linux numbers the second thread of each core after all first threads
+            core, thread = i % (sockets * cores), i // (sockets * cores)
+            base = f'sys/devices/system/cpu/cpu{i}'
+            _write(self.root, f'{base}/topology/physical_package_id', f"{core // cores}\n")
+            _write(self.root, f'{base}/topology/core_id', f"{core % cores}\n")
+            _write(self.root, f'{base}/topology/thread_siblings_list', f"{core},{core + sockets * cores}\n")
+            _write(self.root, f'{base}/cpufreq/scaling_cur_freq', f"{rng.randint(1200, 3800) * 1000}\n")
+            _write(self.root, f'{base}/cpufreq/cpuinfo_max_freq', "3800000\n")
+            _write(self.root, f'{base}/thermal_throttle/core_throttle_count', f"{rng.choice((0, 0, 0, rng.randint(1, 40)))}\n")
+            _write(self.root, f'{base}/thermal_throttle/package_throttle_count', f"{(core // cores) * 7 + 3}\n")
+        # Busy but uncontended: load 12 on 256 CPUs with little stall time
+        for resource, some, full in (('cpu', 2.15, 0.0), ('memory', 0.42, 0.08), ('io', 6.30, 3.12)):
+            _write(self.root, f'proc/pressure/{resource}',
+                   f"some avg10={some:.2f} avg60={some:.2f} avg300={some:.2f} total={int(some * 86400e6)}\n"
+                   f"full avg10={full:.2f} avg60={full:.2f} avg300={full:.2f} total={int(full * 86400e6)}\n")
+        _write(self.root, 'proc/sys/kernel/hostname', "bench-host\n")
+        _write(self.root, 'proc/sys/kernel/osrelease', "6.1.0-bench\n")
+        _write(self.root, 'proc/sys/kernel/random/boot_id', "00000000-0000-4000-8000-000000000000\n")
+        _write(self.root, 'etc/os-release', 'NAME="Debian GNU/Linux"\nVERSION_ID="12"\nVERSION="12 (bookworm)"\nID=debian\n'
+                                            'PRETTY_NAME="Debian GNU/Linux 12 (bookworm)"\n')
+        for i in range(8):
+            zone = f'sys/class/thermal/thermal_zone{i}'
+            _write(self.root, f'{zone}/type', f"x86_pkg_temp{i}\n")
+            _write(self.root, f'{zone}/temp', f"{45000 + i * 1500}\n")
+        self.write_hwmon(rng, sockets, cores)
+        _write(self.root, 'sys/class/power_supply/BAT0/status', "Discharging\n")
+        _write(self.root, 'sys/class/power_supply/BAT0/capacity', "87\n")
+
+    def write_hwmon(self, rng: random.Random, sockets: int, cores: int):
+        """coretemp per socket, a Super I/O chip with fans and voltages, NVMe drives and a power meter."""
+        chips = []
+        for socket in range(sockets):
+            temps = [("Package id %d" % socket, 100000, 100000)] + [(f"Core {c}", 100000, 100000) for c in range(cores)]
+            chips.append(('coretemp', {'temp': temps}))
+        chips.append(('nct6798', {'fan': [(f"fan{i}", None, None) for i in range(1, 8)],
+                                  'in': [(f"in{i}", 1800, None) for i in range(15)],
+                                  'temp': [("SYSTIN", 80000, 95000), ("CPUTIN", 80000, 95000)]}))
+        for n in range(8):
+            chips.append(('nvme', {'temp': [("Composite", 81850, 84850), ("Sensor 1", 65261850, None)]}))
+        chips.append(('power_meter', {'power': [("power1", None, None)]}))
+        for index, (name, sensors) in enumerate(chips):
+            base = f'sys/class/hwmon/hwmon{index}'
+            _write(self.root, f'{base}/name', name + "\n")
+            for kind, entries in sensors.items():
+                for i, (label, high, crit) in enumerate(entries, start=0 if kind == 'in' else 1):
+                    value = {'temp': rng.randint(35000, 70000), 'fan': rng.choice((0, rng.randint(600, 2400))),
+                             'in': rng.randint(900, 1500), 'power': rng.randint(80, 450) * 1000000}[kind]
+                    suffix = 'average' if kind == 'power' else 'input'
+                    _write(self.root, f'{base}/{kind}{i}_{suffix}', f"{value}\n")
+                    _write(self.root, f'{base}/{kind}{i}_label', label + "\n")
+                    if high is not None:
+                        _write(self.root, f'{base}/{kind}{i}_max', f"{high}\n")
+                    if crit is not None:
+                        _write(self.root, f'{base}/{kind}{i}_crit', f"{crit}\n")
+
+    def write_processes(self, rng: random.Random):
+        names = ['nginx', 'postgres', 'python3', 'java', 'node', 'sshd', 'containerd-shim', 'kworker/u8:1', 'bash']
+        for pid in range(1, self.sizes['processes'] + 1):
+            name = rng.choice(names)
+            rss_pages = rng.randint(0, 500000)
+            utime, stime = rng.randint(0, 10 ** 6), rng.randint(0, 10 ** 5)
+            # Fields after "(comm)": state ppid pgrp session tty tpgid flags minflt cminflt majflt
+            # cmajflt utime stime cutime cstime priority nice threads itreal starttime vsize rss ...
+            stat = (f"{pid} ({name}) S {max(1, pid // 7)} {pid} {pid} 0 -1 4194560 1200 0 0 0 "
+                    f"{utime} {stime} 0 0 20 0 1 0 {pid * 10} {rss_pages * 8192} {rss_pages} "
+                    f"18446744073709551615 1 1 0 0 0 0 0 0 0 0 0 0 17 {pid % 64} 0 0 0 0 0 0 0 0 0 0 0 0 0\n")
+            base = os.path.join(self.root, 'proc', str(pid))
+            os.makedirs(base)
+            with open(os.path.join(base, 'stat'), 'w') as f:
+                f.write(stat)
+            with open(os.path.join(base, 'comm'), 'w') as f:
+                f.write(name + "\n")
+            rss_kb = rss_pages * 4
+            private = rss_kb // 3
+            with open(os.path.join(base, 'smaps_rollup'), 'w') as f:
+                f.write(f"00400000-7ffc0000 ---p 00000000 00:00 0  [rollup]\nRss: {rss_kb} kB\nPss: {private + (rss_kb - private) // 4} kB\n"
+                        f"Shared_Clean: {rss_kb - private} kB\nShared_Dirty: 0 kB\nPrivate_Clean: 0 kB\n"
+                        f"Private_Dirty: {private} kB\nSwap: {rng.randint(0, 4096)} kB\nSwapPss: 0 kB\n")
+        # Non-PID entries that every scan has to skip
+        for name in ('self', 'thread-self', 'sys', 'net', 'irq'):
+            os.makedirs(os.path.join(self.root, 'proc', name), exist_ok=True)
+
+    def write_sockets(self, rng: random.Random):
+        processes = self.sizes['processes']
+        sockets = max(10, processes // 10)
+        rows = []
+        for i in range(sockets):
+            listening = i % 10 == 0
+            local = f"{_hex_ipv4(10, 0, i >> 8 & 255, i & 255)}:{1024 + i % 60000:04X}"
+            remote = "00000000:0000" if listening else f"{_hex_ipv4(192, 168, 1, i % 250 + 1)}:{rng.randint(1024, 65535):04X}"
+            state = '0A' if listening else '01'
+            rows.append(f"{i:4}: {local} {remote} {state} 00000000:00000000 00:00000000 00000000  1000        0 {100000 + i} 1 0000000000000000 20 4 30 10 -1\n")
+            if listening:
+                # Every listening socket is held by some process
+                fd_dir = os.path.join(self.root, 'proc', str(rng.randint(1, processes)), 'fd')
+                os.makedirs(fd_dir, exist_ok=True)
+                os.symlink(f"socket:[{100000 + i}]", os.path.join(fd_dir, str(len(os.listdir(fd_dir)) + 3)))
+        header = "  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode\n"
+        _write(self.root, 'proc/net/tcp', header + "".join(rows))
+        for table in ('tcp6', 'udp', 'udp6'):
+            _write(self.root, f'proc/net/{table}', header)
+        _write(self.root, 'proc/net/unix', "Num       RefCount Protocol Flags    Type St Inode Path\n")
+
+    def write_interfaces(self, rng: random.Random):
+        count = self.sizes['interfaces']
+        dev = ["Inter-|   Receive                                                |  Transmit\n",
+               " face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed\n",
+               "    lo: 123456 1234 0 0 0 0 0 0 123456 1234 0 0 0 0 0 0\n"]
+        route = ["Iface\tDestination\tGateway \tFlags\tRefCnt\tUse\tMetric\tMask\t\tMTU\tWindow\tIRTT\n"]
+        trie = ["Main:\n  +-- 0.0.0.0/0 3 0 5\n"]
+        inet6 = []
+        for i in range(count):
+            name = 'eth0' if i == 0 else f"veth{i:04x}"
+            base = f'sys/class/net/{name}'
+            _write(self.root, f'{base}/ifindex', f"{i + 2}\n")
+            _write(self.root, f'{base}/address', "02:42:%02x:%02x:%02x:%02x\n" % (i >> 8 & 255, i & 255, rng.randint(0, 255), rng.randint(0, 255)))
+            _write(self.root, f'{base}/mtu', "1500\n")
+            _write(self.root, f'{base}/operstate', "up\n")
+            _write(self.root, f'{base}/speed', "10000\n" if i == 0 else "-1\n")
+            counters = [rng.randint(0, 2 ** 40), rng.randint(0, 2 ** 30), 0, 0, 0, 0, 0, 0,
+                        rng.randint(0, 2 ** 40), rng.randint(0, 2 ** 30), 0, 0, 0, 0, 0, 0]
+            dev.append(f"{name:>6}: {' '.join(map(str, counters))}\n")
+            a, b = 10 + (i >> 8), i & 255
+            route.append(f"{name}\t{_hex_ipv4(a, b, 0, 0)}\t00000000\t0001\t0\t0\t0\t{_hex_ipv4(255, 255, 0, 0)}\t0\t0\t0\n")
+            trie.append(f"     |-- {a}.{b}.0.1\n        /32 host LOCAL\n")
+            inet6.append(f"fd00{i:028x} {i + 2:02x} 40 00 80 {name}\n")
+        route.insert(1, f"eth0\t00000000\t0100000A\t0003\t0\t0\t0\t00000000\t0\t0\t0\n")
+        _write(self.root, 'proc/net/dev', "".join(dev))
+        _write(self.root, 'proc/net/route', "".join(route))
+        _write(self.root, 'proc/net/fib_trie', "".join(trie))
+        _write(self.root, 'proc/net/if_inet6', "".join(inet6))
+
+    def write_mounts(self):
+        mounts = ["/dev/nvme0n1p2 / ext4 rw,relatime 0 0\n", "proc /proc proc rw,nosuid 0 0\n"]
+        mountinfo = ["22 1 259:2 / / rw,relatime shared:1 - ext4 /dev/nvme0n1p2 rw\n",
+                     "23 22 0:21 / /proc rw,nosuid shared:2 - proc proc rw\n"]
+        for i in range(self.sizes['mounts']):
+            point = f"/mnt/vol{i:05d}"
+            os.makedirs(os.path.join(self.root, point.lstrip('/')))
+            if i % 2:
+                # Container-style bind and overlay mounts that are not block devices
+                mounts.append(f"overlay {point} overlay rw,lowerdir=/l{i},upperdir=/u{i},workdir=/w{i} 0 0\n")
+                mountinfo.append(f"{100 + i} 22 0:{100 + i} / {point} rw shared:{100 + i} - overlay overlay rw\n")
+            else:
+                mounts.append(f"/dev/sd{chr(97 + i % 26)}{i % 15 + 1} {point} xfs rw,noatime 0 0\n")
+                mountinfo.append(f"{100 + i} 22 8:{i % 256} / {point} rw,noatime shared:{100 + i} - xfs /dev/sd{chr(97 + i % 26)}{i % 15 + 1} rw\n")
+        _write(self.root, 'proc/mounts', "".join(mounts))
+        _write(self.root, 'proc/self/mountinfo', "".join(mountinfo))
+
+    def write_block_devices(self, rng: random.Random):
+        """/proc/diskstats and /sys/class/block for NVMe namespaces, the SCSI disks mounted above and dm targets."""
+        disks = [f"nvme{i // 8}n{i % 8 + 1}" for i in range(self.sizes['nvme_namespaces'])]
+        disks += [f"sd{chr(97 + i)}" for i in range(26)]
+        lines = []
+        minor = 0
+
+        def device(name: str, major: int, parent: Optional[str] = None):
+            nonlocal minor
+            reads, writes = rng.randint(0, 10 ** 7), rng.randint(0, 10 ** 7)
+            lines.append(f"{major:>4} {minor:>7} {name} {reads} {reads // 9} {reads * 16} {reads // 5} {writes} "
+                         f"{writes // 3} {writes * 24} {writes // 2} {rng.randint(0, 4)} {(reads + writes) // 7} "
+                         f"{(reads // 5 + writes // 2)} 0 0 0 0\n")
+            minor += 1
+            real = f'sys/block/{parent}/{name}' if parent else f'sys/block/{name}'
+            os.makedirs(os.path.join(self.root, real), exist_ok=True)
+            if parent:
+                _write(self.root, f'{real}/partition', f"{minor}\n")
+            link = os.path.join(self.root, f'sys/class/block/{name}')
+            os.makedirs(os.path.dirname(link), exist_ok=True)
+            os.symlink(os.path.relpath(os.path.join(self.root, real), os.path.dirname(link)), link)
+
+        for disk in disks:
+            major = 8 if disk.startswith('sd') else 259
+            device(disk, major)
+            for part in range(1, 16 if disk.startswith('sd') else 3):
+                device(f"{disk}p{part}" if disk.startswith('nvme') else f"{disk}{part}", major, disk)
+        for i in range(16):
+            device(f"dm-{i}", 253)
+            _write(self.root, f'sys/block/dm-{i}/dm/name', f"vg{i // 4}-lv{i % 4}\n")
+            os.makedirs(os.path.join(self.root, f'sys/block/dm-{i}/slaves/{disks[i]}'))
+        _write(self.root, 'proc/diskstats', "".join(lines))
+
+    def write_cgroups(self, rng: random.Random):
+        """A systemd-style cgroup v2 tree: services, user sessions and Kubernetes pods."""
+        leaves = []
+        count = self.sizes['cgroups']
+        for i in range(count):
+            if i % 3 == 0:
+                leaves.append(f"system.slice/svc{i:05d}.service")
+            elif i % 3 == 1:
+                leaves.append(f"user.slice/user-{1000 + i % 50}.slice/session-{i}.scope")
+            else:
+                leaves.append(f"kubepods.slice/kubepods-pod{i % 200:03d}.slice/cri-containerd-{i:08x}.scope")
+
+        totals = {}  # path -> [memory, usage_usec, rbytes, wbytes]
+        for leaf in leaves:
+            values = [rng.randint(1, 2 ** 30), rng.randint(0, 10 ** 10), rng.randint(0, 2 ** 32), rng.randint(0, 2 ** 32)]
+            parts = leaf.split('/')
+            for depth in range(len(parts) + 1):
+                path = '/'.join(parts[:depth])
+                acc = totals.setdefault(path, [0, 0, 0, 0])
+                for k in range(4):
+                    acc[k] += values[k]
+
+        pressure = "some avg10={:.2f} avg60=0.00 avg300=0.00 total={}\nfull avg10=0.00 avg60=0.00 avg300=0.00 total=0\n"
+        for path, (memory, usage, rbytes, wbytes) in totals.items():
+            base = f'sys/fs/cgroup/{path}'.rstrip('/')
+            if not path:
+                _write(self.root, f'{base}/cgroup.controllers', "cpuset cpu io memory hugetlb pids rdma misc\n")
+                continue
+            _write(self.root, f'{base}/memory.current', f"{memory}\n")
+            _write(self.root, f'{base}/memory.stat', f"anon {memory // 2}\nfile {memory // 3}\nkernel {memory // 20}\n"
+                                                     f"kernel_stack {memory // 100}\nslab {memory // 25}\nsock 0\nshmem {memory // 50}\n"
+                                                     "file_mapped 0\nfile_dirty 0\nfile_writeback 0\nanon_thp 0\n")
+            _write(self.root, f'{base}/cpu.stat', f"usage_usec {usage}\nuser_usec {usage * 2 // 3}\nsystem_usec {usage // 3}\n"
+                                                  "nr_periods 0\nnr_throttled 0\nthrottled_usec 0\n")
+            _write(self.root, f'{base}/io.stat', f"8:0 rbytes={rbytes} wbytes={wbytes} rios={rbytes // 4096} wios={wbytes // 4096} dbytes=0 dios=0\n")
+            for resource in ('cpu', 'memory', 'io'):
+                _write(self.root, f'{base}/{resource}.pressure', pressure.format(rng.random() * 10, rng.randint(0, 10 ** 9)))
+
+    def write_dpkg(self, rng: random.Random):
+        target = self.sizes['dpkg_mb'] * 1024 * 1024
+        path = os.path.join(self.root, 'var/lib/dpkg/status')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        description = " Synthetic package used by the myfetch benchmark suite.\n" * 12
+        written = 0
+        n = 0
+        with open(path, 'w') as f:
+            while written < target:
+                status = "install ok installed" if n % 20 else "deinstall ok config-files"
+                stanza = (f"Package: pkg{n}\nStatus: {status}\nPriority: optional\nSection: libs\n"
+                          f"Installed-Size: {rng.randint(10, 90000)}\nMaintainer: Bench <bench@example.org>\n"
+                          f"Architecture: amd64\nVersion: {n % 7}.{n % 13}.{n % 5}-1\n"
+                          f"Depends: libc6 (>= 2.36)\nDescription: package {n}\n{description}\n")
+                f.write(stanza)
+                written += len(stanza)
+                n += 1
+
+    def write_rpmdb(self, rng: random.Random):
+        """An rpmdb.sqlite as written by rpm >= 4.16: header blobs in Packages, plus the Name index."""
+        import sqlite3
+        path = os.path.join(self.root, 'var/lib/rpm/rpmdb.sqlite')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        db = sqlite3.connect(path)
+        db.execute("CREATE TABLE Packages (hnum INTEGER PRIMARY KEY AUTOINCREMENT, blob BLOB NOT NULL)")
+        db.execute("CREATE TABLE Name (key TEXT NOT NULL, hnum INTEGER NOT NULL, idx INTEGER NOT NULL)")
+        filler = b"synthetic file list and changelog " * 300
+        for n in range(self.sizes['rpm_packages']):
+            name = f"rpmpkg{n}" if n % 100 else "gpg-pubkey"
+            blob = _rpm_header([(1000, name), (1001, f"{n % 9}.{n % 17}"), (1002, f"{n % 4}.el9"),
+                                (1022, "x86_64"), (1005, filler[:rng.randint(2000, len(filler))].decode())])
+            hnum = db.execute("INSERT INTO Packages (blob) VALUES (?)", (blob,)).lastrowid
+            db.execute("INSERT INTO Name VALUES (?, ?, 0)", (name, hnum))
+        db.commit()
+        db.close()
+
+    def write_hardware(self, rng: random.Random):
+        """DMI strings, PCI functions and a pci.ids the size of the real one (~2500 vendors)."""
+        for field, value in [('sys_vendor', "Synthetic Systems Inc."), ('product_name', "Bench Server 9000"),
+                             ('board_vendor', "Synthetic Systems Inc."), ('board_name', "BX-128"),
+                             ('bios_vendor', "Synthetic BIOS"), ('bios_version', "2.1.7"),
+                             ('bios_date', "03/14/2024"), ('chassis_type', "23")]:
+            _write(self.root, f'sys/class/dmi/id/{field}', value + "\n")
+
+        vendors = [f"{v:04x}" for v in sorted(rng.sample(range(0x1000, 0xffff), 2500))]
+        lines = ["# Synthetic pci.ids\n"]
+        for vendor in vendors:
+            lines.append(f"{vendor}  Vendor {vendor} Corporation\n")
+            for d in range(12):
+                lines.append(f"\t{d:04x}  Device {vendor}:{d:04x} controller\n")
+                lines.append(f"\t\t{vendor} {d:04x}  Subsystem {d}\n")
+        lines.append("\n# List of known device classes, subclasses and programming interfaces\n")
+        for class_id, name in [(1, "Mass storage controller"), (2, "Network controller"),
+                               (3, "Display controller"), (6, "Bridge")]:
+            lines.append(f"C {class_id:02x}  {name}\n\t00  {name.split()[0]} device\n\t80  Other\n")
+        _write(self.root, 'usr/share/misc/pci.ids', "".join(lines))
+
+        for n in range(self.sizes['pci_devices']):
+            base = f'sys/bus/pci/devices/0000:{n // 32:02x}:{n % 32:02x}.0'
+            _write(self.root, f'{base}/vendor', f"0x{rng.choice(vendors)}\n")
+            _write(self.root, f'{base}/device', f"0x{rng.randint(0, 15):04x}\n")  # Some IDs are unknown
+            _write(self.root, f'{base}/class', f"0x{rng.choice((1, 2, 3, 6)):02x}{rng.choice((0, 0x80)):02x}00\n")
+
+
+def _rpm_header(tags: List[Tuple[int, str]]) -> bytes:
+    """An exported RPM header (index count, data length, index entries, data) of string tags."""
+    index, data = [], b''
+    for tag, value in tags:
+        index.append(struct.pack('>iIiI', tag, 6, len(data), 1))
+        data += value.encode() + b'\0'
+    return struct.pack('>II', len(index), len(data)) + b''.join(index) + data
+
+
+class BenchResult:
+    """Timings of one collector over N iterations."""
+
+    def __init__(self, name: str, samples: List[float], peak_memory: int):
+        self.name = name
+        self.samples = sorted(samples)
+        self.peak_memory = peak_memory
+
+    def percentile(self, pct: float) -> float:
+        if not self.samples:
+            return 0.0
+        index = min(len(self.samples) - 1, max(0, int(round(pct / 100 * len(self.samples) + 0.5)) - 1))
+        return self.samples[index]
+
+    @property
+    def ops_per_sec(self) -> float:
+        total = sum(self.samples)
+        return len(self.samples) / total if total > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'iterations': len(self.samples),
+            'ops_per_sec': self.ops_per_sec,
+            'p50': self.percentile(50),
+            'p99': self.percentile(99),
+            'min': self.samples[0] if self.samples else 0.0,
+            'peak_memory': self.peak_memory,
+        }
+
+
+def benchmark(func: Callable[[], Any], iterations: int = 20, warmup: int = 1, name: Optional[str] = None) -> BenchResult:
+    """Times func() like pytest-benchmark's fixture: warmup, N timed calls, then one traced call.
+
+    Peak memory is measured with tracemalloc in a separate call so the
+    tracing overhead never shows up in the latency figures.
+    """
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    if hasattr(tracemalloc, 'reset_peak'):
+        tracemalloc.reset_peak()
+    else:
+        tracemalloc.clear_traces()
+    base = tracemalloc.get_traced_memory()[0]
+    func()
+    peak = tracemalloc.get_traced_memory()[1] - base
+    if not was_tracing:
+        tracemalloc.stop()
+    return BenchResult(name or getattr(func, '__name__', 'func'), samples, max(0, peak))
+
+
+def collectors(scanner: Scanner) -> List[Tuple[str, Callable[[], Any]]]:
+    """Every Scanner collector, bypassing the fact cache so the real work is measured."""
+    from src.core.procmon import ProcessMonitor
+    from src.core.netrate import NetRateSampler
+    from src.core.cgroups import CgroupCollector
+    from src.core.cpustat import read_cpu_topology
+    from src.core.hwids import build_index
+    from src.core.hwinfo import detect_virtualization, read_dmi
+    from src.core.hwmon import HwmonCollector
+    from src.core.rules import DEFAULT_RULES, Rule, RuleEngine, health_facts
+    monitor = ProcessMonitor(scanner.proc_path)
+    sampler = NetRateSampler(scanner.read_file)
+
+    def pci_devices():
+        # Cold name lookups through the (normally cached) offset index
+        db = scanner.ids_database('pci')
+        if db is not None:
+            db.blocks = {}
+        return scanner.get_pci_devices()
+
+    # The built-in rules plus 300 generated ones, a large alerting config; one in ten takes a rate()
+    compiled = [Rule(spec) for spec in DEFAULT_RULES] + [
+        Rule({'name': f"bench_{i}", 'for': '1m',
+              'warning': f"rate(psi_io_some, '5m') > {i % 7}" if i % 10 == 0 else f"memory_percent > {50 + i % 50} and load1 > {i % 8}"})
+        for i in range(300)]
+    engine = RuleEngine(compiled)
+    facts = {}
+    ticks = [0]
+
+    def rule_facts():
+        if not facts:
+            facts.update(health_facts(load=scanner.get_loadavg(), memory_percent=60.0, pressure=scanner.get_pressure() or {},
+                                      sensors=scanner.get_sensors(), filesystems=scanner.get_storage_info()))
+        return facts
+
+    def rules_tick():
+        # A watch tick where only the load average moved
+        ticks[0] += 1
+        current = rule_facts()
+        return engine.evaluate(dict(current, load1=current.get('load1', 0.0) + ticks[0] % 2), now=float(ticks[0]))
+
+    def listening_ports():
+        # A fresh collector per call; the shared one keeps its inode map for the run
+        scanner._sockets = None
+        return scanner.get_listening_ports()
+
+    return [
+        ('meminfo', scanner.get_meminfo),
+        ('loadavg', scanner.get_loadavg),
+        ('pressure', scanner.get_pressure),
+        ('uptime', scanner.get_uptime),
+        ('cpuinfo', scanner._read_cpuinfo),
+        ('cpu_usage', scanner.get_cpu_usage),
+        ('cpu_topology', lambda: read_cpu_topology(scanner.sys_path)),
+        ('os_release', scanner._read_os_release),
+        ('battery', scanner.get_battery_info),
+        ('temperatures', scanner.get_temperatures),
+        ('sensors', scanner.get_sensors),
+        ('sensors_cold', lambda: HwmonCollector(scanner.sys_path).read()),
+        ('thermal_throttle', scanner.get_thermal_throttle),
+        ('net_stats', scanner.get_net_stats),
+        ('net_rates', sampler.sample),
+        ('interfaces', scanner.get_interfaces),
+        ('ip_addresses', scanner.get_ip_addresses),
+        ('listening_ports', listening_ports),
+        ('process_table', scanner.get_process_table),
+        ('top_processes', scanner.get_top_processes),
+        ('process_monitor', monitor.sample),
+        ('process_memory', scanner.get_process_memory),
+        ('storage', scanner.get_storage_info),
+        ('disk_io', scanner.get_disk_io),
+        ('cgroups', scanner.get_cgroups),
+        ('cgroups_cold', lambda: CgroupCollector(scanner.sys_path).sample()),
+        ('packages', scanner._count_packages),
+        ('package_lists', scanner.get_packages),
+        ('dmi', lambda: read_dmi(scanner.sys_path)),
+        ('pci_ids_index', lambda: build_index(scanner.path('/usr/share/misc/pci.ids'))),
+        ('pci_devices', pci_devices),
+        ('virtualization', lambda: detect_virtualization(scanner.path, read_dmi(scanner.sys_path))),
+        ('rules', rules_tick),
+        ('rules_full', lambda: RuleEngine(compiled).evaluate(rule_facts())),
+    ]
+
+
+def run_suite(scanner: Scanner, iterations: int = 20, names: Optional[List[str]] = None,
+              progress: Optional[Callable[[str], None]] = None) -> Dict[str, BenchResult]:
+    results = {}
+    for name, func in collectors(scanner):
+        if names and name not in names:
+            continue
+        if progress:
+            progress(name)
+        results[name] = benchmark(func, iterations=iterations, name=name)
+    return results
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]]) -> Dict[str, float]:
+    """Relative p50 change per collector against a baseline (0.25 = 25% slower)."""
+    changes = {}
+    for name, current in results.items():
+        before = baseline.get(name, {}).get('p50')
+        if before:
+            changes[name] = current['p50'] / before - 1
+    return changes
@@ -0,0 +1,123 @@
+import marshal
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+def default_cache_dir() -> str:
+    """~/.cache/myfetch for users, /run/myfetch for root (tmpfs, cleared on reboot)."""
+    if os.getuid() == 0:
+        return '/run/myfetch'
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'myfetch')
+
+
+class FactCache:
+    """Persistent cache for slow-changing facts (package counts, OS release, DMI...).
+
+    Each entry remembers the mtimes of the files it was derived from and is
+    dropped as soon as one of them changes (or appears/disappears). Entries
+    without sources rely on the TTL, and `per_boot` entries are also dropped
+    after a reboot. The whole cache lives in a single small marshal file
+    (no json/re import on the hot path) so a warm start costs one read plus
+    a handful of stat() calls. A file written by another Python version
+    simply fails to load and is rebuilt.
+    """
+
+    FILENAME = 'facts.bin'
+
+    def __init__(self, path: Optional[str] = None, enabled: bool = True, refresh: bool = False,
+                 ttl: float = 86400.0):
+        self.path = os.path.join(path or default_cache_dir(), self.FILENAME)
+        self.enabled = enabled
+        self.refresh = refresh
+        self.ttl = ttl
+        self.entries = None  # type: Optional[Dict[str, Any]]
+        self.lock = threading.Lock()
+        self._boot_id = None
+
+    @staticmethod
+    def _mtime(path: str) -> Optional[float]:
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
+            return None
+
+    def boot_id(self) -> str:
+        if self._boot_id is None:
+            try:
+                with open('/proc/sys/kernel/random/boot_id') as f:
+                    self._boot_id = f.read().strip()
+            except OSError:
+                self._boot_id = ""
+        return self._boot_id
+
+    def _load(self):
+        if self.entries is not None:
+            return
+        self.entries = {}
+        if self.refresh:
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                data = marshal.load(f)
+            if isinstance(data, dict):
+                self.entries = data
+        except (OSError, ValueError, EOFError, TypeError):
+            pass
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, 'wb') as f:
+                marshal.dump(self.entries, f)
+            os.replace(tmp, self.path)
+        except (OSError, ValueError):
+            # Read-only home or /run: the cache is best-effort
+            pass
+
+    def _is_valid(self, entry: Dict[str, Any], ttl: float) -> bool:
+        if time.time() - entry.get('time', 0) > ttl:
+            return False
+        if entry.get('boot') and entry['boot'] != self.boot_id():
+            return False
+        for path, mtime in entry.get('sources', {}).items():
+            if self._mtime(path) != mtime:
+                return False
+        return True
+
+    def get(self, key: str, compute: Callable[[], Any], sources: Iterable[str] = (),
+            ttl: Optional[float] = None, per_boot: bool = False) -> Any:
+        """Returns the cached value for key, or computes and stores it."""
+        if not self.enabled:
+            return compute()
+
+        ttl = self.ttl if ttl is None else ttl
+        with self.lock:
+            self._load()
+            entry = self.entries.get(key)
+            if entry is not None and self._is_valid(entry, ttl):
+                return entry['value']
+
+        # Snapshot mtimes before computing so a concurrent change invalidates the entry
+        mtimes = {p: self._mtime(p) for p in sources}
+        value = compute()
+        entry = {'value': value, 'time': time.time(), 'sources': mtimes}
+        if per_boot:
+            entry['boot'] = self.boot_id()
+
+        with self.lock:
+            self.entries[key] = entry
+            self._save()
+        return value
+
+    def invalidate(self, key: Optional[str] = None):
+        with self.lock:
+            self._load()
+            if key is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(key, None)
+            self._save()
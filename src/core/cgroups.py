@@ -0,0 +1,237 @@
+import heapq
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from src.core.fileio import read_bytes
+from src.core.pressure import parse_pressure
+
+# memory.stat keys worth showing (bytes)
+MEMORY_STAT_KEYS = ('anon', 'file', 'kernel', 'kernel_stack', 'slab', 'shmem', 'sock')
+
+SORT_KEYS = ('cpu', 'memory', 'io', 'pressure')
+
+
+class CgroupNode:
+    """One cgroup directory: its children (re-listed every sample) and latest readings."""
+    __slots__ = ('path', 'children', 'memory', 'memory_stat', 'cpu_usec', 'cpu_user_usec',
+                 'cpu_system_usec', 'throttled_usec', 'io_read', 'io_write', 'io_rios', 'io_wios',
+                 'pressure', 'cpu', 'io_rate', 'sampled')
+
+    def __init__(self, path: str):
+        self.path = path
+        self.children = []  # type: List[str]
+        self.memory = None  # type: Optional[int]
+        self.memory_stat = {}  # type: Dict[str, int]
+        self.cpu_usec = None  # type: Optional[int]
+        self.cpu_user_usec = 0
+        self.cpu_system_usec = 0
+        self.throttled_usec = 0
+        self.io_read = 0
+        self.io_write = 0
+        self.io_rios = 0
+        self.io_wios = 0
+        self.pressure = {}  # type: Dict[str, float]
+        self.cpu = None  # type: Optional[float]
+        self.io_rate = None  # type: Optional[float]
+        self.sampled = False  # read at least once, so deltas are meaningful
+
+    @property
+    def depth(self) -> int:
+        return self.path.count('/') + 1 if self.path else 0
+
+    def max_pressure(self) -> float:
+        return max(self.pressure.values(), default=0.0)
+
+    def sort_value(self, key: str) -> float:
+        if key == 'cpu':
+            return self.cpu if self.cpu is not None else (self.cpu_usec or 0) / 1e6
+        if key == 'memory':
+            return self.memory or 0
+        if key == 'io':
+            return self.io_rate if self.io_rate is not None else self.io_read + self.io_write
+        return self.max_pressure()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'path': '/' + self.path,
+            'depth': self.depth,
+            'children': len(self.children),
+            'memory': self.memory,
+            'memory_stat': self.memory_stat,
+            'cpu_usec': self.cpu_usec,
+            'cpu_user_usec': self.cpu_user_usec,
+            'cpu_system_usec': self.cpu_system_usec,
+            'throttled_usec': self.throttled_usec,
+            'cpu_percent': self.cpu,
+            'io_read_bytes': self.io_read,
+            'io_write_bytes': self.io_write,
+            'io_rios': self.io_rios,
+            'io_wios': self.io_wios,
+            'io_bytes_per_sec': self.io_rate,
+            'pressure': self.pressure,
+        }
+
+
+class CgroupCollector:
+    """Samples every cgroup of the unified (v2) hierarchy.
+
+    The tree is kept between samples and every directory is re-listed each
+    sample (kernfs does not bump a parent's mtime when a child cgroup is
+    created, so mtimes cannot tell which directories changed). Nodes whose
+    path is still listed keep their state, new cgroups are added and vanished
+    ones dropped, so a new service or container shows up on the next tick
+    without losing the deltas of the others. Values are re-read every sample; CPU% and I/O rates come from deltas against
+    the previous sample. cgroup v2 counters are hierarchical, so each node
+    already includes its descendants.
+    """
+
+    PRESSURE_FILES = ('cpu', 'memory', 'io')
+
+    def __init__(self, sys_path: str = '/sys'):
+        self.root = self.find_root(sys_path)
+        self.nodes = {}  # type: Dict[str, CgroupNode]
+        self.last_time = None  # type: Optional[float]
+        self.rescanned = 0  # directories whose children changed in the last sample
+
+    @staticmethod
+    def find_root(sys_path: str) -> Optional[str]:
+        """The cgroup2 mount: /sys/fs/cgroup, or /sys/fs/cgroup/unified on hybrid hosts."""
+        for path in ('fs/cgroup', 'fs/cgroup/unified'):
+            root = os.path.join(sys_path, path)
+            if os.path.exists(os.path.join(root, 'cgroup.controllers')):
+                return root
+        return None
+
+    @property
+    def available(self) -> bool:
+        return self.root is not None
+
+    def _scan(self):
+        """Re-lists the directory tree, keeping the nodes of cgroups that still exist."""
+        nodes = self.nodes
+        seen = set()
+        stack = ['']
+        rescanned = 0
+        while stack:
+            rel = stack.pop()
+            full = os.path.join(self.root, rel) if rel else self.root
+            children = []
+            try:
+                with os.scandir(full) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            children.append(f"{rel}/{entry.name}" if rel else entry.name)
+            except OSError:
+                continue  # Removed since its parent was listed
+            node = nodes.get(rel)
+            if node is None:
+                node = nodes[rel] = CgroupNode(rel)
+            if node.children != children:
+                rescanned += 1
+                node.children = children
+            seen.add(rel)
+            stack.extend(node.children)
+        for rel in nodes.keys() - seen:
+            del nodes[rel]
+        self.rescanned = rescanned
+
+    def _read_node(self, node: CgroupNode, scale: float, elapsed: float):
+        base = os.path.join(self.root, node.path) if node.path else self.root
+
+        raw = read_bytes(f"{base}/memory.current")
+        node.memory = int(raw) if raw else None
+
+        raw = read_bytes(f"{base}/memory.stat")
+        if raw:
+            stat = {}
+            for line in raw.decode().splitlines():
+                key, _, value = line.partition(' ')
+                if key in MEMORY_STAT_KEYS:
+                    stat[key] = int(value)
+            if 'kernel' not in stat and ('kernel_stack' in stat or 'slab' in stat):
+                # Kernels before 5.18 have no combined "kernel" counter
+                stat['kernel'] = stat.get('kernel_stack', 0) + stat.get('slab', 0)
+            node.memory_stat = stat
+
+        raw = read_bytes(f"{base}/cpu.stat")
+        if raw:
+            stat = {}
+            for line in raw.decode().splitlines():
+                key, _, value = line.partition(' ')
+                stat[key] = value
+            usage = int(stat.get('usage_usec', 0))
+            if node.sampled and scale and node.cpu_usec is not None:
+                node.cpu = max(0, usage - node.cpu_usec) * scale
+            node.cpu_usec = usage
+            node.cpu_user_usec = int(stat.get('user_usec', 0))
+            node.cpu_system_usec = int(stat.get('system_usec', 0))
+            node.throttled_usec = int(stat.get('throttled_usec', 0))
+
+        raw = read_bytes(f"{base}/io.stat")
+        if raw is not None:
+            rbytes = wbytes = rios = wios = 0
+            for line in raw.decode().splitlines():
+                for field in line.split()[1:]:
+                    key, _, value = field.partition('=')
+                    if key == 'rbytes':
+                        rbytes += int(value)
+                    elif key == 'wbytes':
+                        wbytes += int(value)
+                    elif key == 'rios':
+                        rios += int(value)
+                    elif key == 'wios':
+                        wios += int(value)
+            if node.sampled and elapsed > 0:
+                node.io_rate = max(0, rbytes + wbytes - node.io_read - node.io_write) / elapsed
+            node.io_read, node.io_write, node.io_rios, node.io_wios = rbytes, wbytes, rios, wios
+
+        pressure = {}
+        for resource in self.PRESSURE_FILES:
+            raw = read_bytes(f"{base}/{resource}.pressure")
+            if raw:
+                psi = parse_pressure(raw.decode())
+                if 'some' in psi:
+                    pressure[f"{resource}_some"] = psi['some'].get('avg10', 0.0)
+                if 'full' in psi and resource != 'cpu':
+                    pressure[f"{resource}_full"] = psi['full'].get('avg10', 0.0)
+        node.pressure = pressure
+        node.sampled = True
+
+    def sample(self) -> 'CgroupCollector':
+        """Rescans the tree incrementally and refreshes every group's readings."""
+        if self.root is None:
+            return self
+        now = time.monotonic()
+        elapsed = (now - self.last_time) if self.last_time is not None else 0.0
+        # usage_usec delta -> percent of one CPU
+        scale = 100.0 / (elapsed * 1e6) if elapsed > 0 else 0.0
+        self._scan()
+        for node in self.nodes.values():
+            self._read_node(node, scale, elapsed)
+        self.last_time = now
+        return self
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def leaves(self) -> List[CgroupNode]:
+        """Groups without children, i.e. where processes actually run."""
+        return [n for n in self.nodes.values() if not n.children and n.path]
+
+    def top(self, key: str = 'memory', limit: int = 15) -> List[CgroupNode]:
+        return heapq.nlargest(limit, self.leaves(), key=lambda n: n.sort_value(key))
+
+    def tree(self, max_depth: int = 2, max_children: int = 8) -> List[Tuple[CgroupNode, int]]:
+        """(node, omitted children) down to max_depth in depth-first order, largest memory first."""
+        ordered = []
+        stack = [self.nodes['']] if '' in self.nodes else []
+        while stack:
+            node = stack.pop()
+            omitted = 0
+            if node.depth < max_depth:
+                children = [self.nodes[c] for c in node.children if c in self.nodes]
+                shown = heapq.nlargest(max_children, children, key=lambda n: n.memory or 0)
+                omitted = len(children) - len(shown)
+                stack.extend(reversed(shown))
+            ordered.append((node, omitted))
+        return ordered
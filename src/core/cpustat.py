@@ -0,0 +1,146 @@
+import os
+import time
+from array import array
+from typing import Any, Dict, List, Optional
+
+from src.core.fileio import read_bytes, read_int
+
+# Columns of a /proc/stat "cpuN" line; guest time is already included in user/nice
+STAT_FIELDS = ('user', 'nice', 'system', 'idle', 'iowait', 'irq', 'softirq', 'steal')
+IDLE_FIELDS = (STAT_FIELDS.index('idle'), STAT_FIELDS.index('iowait'))
+
+
+def parse_cpu_list(text: str) -> List[int]:
+    """Expands a sysfs CPU list such as '0-3,8-11' or '5'."""
+    cpus = []
+    for part in text.strip().split(','):
+        if not part:
+            continue
+        first, _, last = part.partition('-')
+        try:
+            cpus.extend(range(int(first), int(last or first) + 1))
+        except ValueError:
+            continue
+    return cpus
+
+
+class CpuSampler:
+    """Per-CPU utilization from /proc/stat.
+
+    Every sample keeps the counters of all CPUs in one flat array
+    (len(cpus) * len(STAT_FIELDS)), so a tick is one read of /proc/stat plus
+    a single pass of element-wise deltas; per-CPU totals are row sums over
+    that delta array. The first sample reports averages since boot. If the
+    set of online CPUs changes (hotplug) the next tick is treated as a first
+    sample again.
+    """
+
+    def __init__(self, proc_path: str = '/proc'):
+        self.proc_path = proc_path
+        self.cpus = array('i')
+        self.counters = array('q')
+        self.last_time = None  # type: Optional[float]
+
+    def _read(self):
+        cpus = array('i')
+        counters = array('q')
+        width = len(STAT_FIELDS)
+        raw = b""
+        try:
+            with open(f'{self.proc_path}/stat', 'rb') as f:
+                raw = f.read()
+        except OSError:
+            pass
+        for line in raw.split(b'\n'):
+            if not line.startswith(b'cpu'):
+                break  # The cpu lines come first; the rest (intr, ctxt, ...) can be long
+            if line[3:4] == b' ':
+                continue  # Aggregate line, recomputed from the per-CPU rows
+            fields = line.split()
+            values = fields[1:1 + width]
+            values += [b'0'] * (width - len(values))
+            cpus.append(int(fields[0][3:]))
+            counters.extend(map(int, values))
+        return cpus, counters
+
+    def sample(self) -> Dict[str, Any]:
+        """Percentages per CPU and overall, over the interval since the previous sample."""
+        now = time.monotonic()
+        cpus, counters = self._read()
+        since_boot = self.last_time is None or cpus != self.cpus
+        if since_boot:
+            deltas = counters
+        else:
+            deltas = array('q', [max(0, b - a) for a, b in zip(self.counters, counters)])
+        self.cpus, self.counters = cpus, counters
+        elapsed = None if since_boot else now - self.last_time
+        self.last_time = now
+
+        width = len(STAT_FIELDS)
+        per_cpu = []
+        totals = [0] * width
+        for row, cpu in enumerate(cpus):
+            values = deltas[row * width:(row + 1) * width]
+            total = sum(values)
+            for i, value in enumerate(values):
+                totals[i] += value
+            entry = {'cpu': cpu}
+            scale = 100.0 / total if total else 0.0
+            for field, value in zip(STAT_FIELDS, values):
+                entry[field] = value * scale
+            entry['busy'] = 100.0 - (entry['idle'] + entry['iowait']) if total else 0.0
+            per_cpu.append(entry)
+
+        overall = {}
+        grand = sum(totals)
+        scale = 100.0 / grand if grand else 0.0
+        for field, value in zip(STAT_FIELDS, totals):
+            overall[field] = value * scale
+        overall['busy'] = 100.0 - sum(totals[i] for i in IDLE_FIELDS) * scale if grand else 0.0
+        return {'since_boot': since_boot, 'interval': elapsed, 'total': overall, 'cpus': per_cpu}
+
+
+def read_cpu_topology(sys_path: str = '/sys') -> Dict[str, Any]:
+    """Sockets, physical cores and SMT siblings from /sys/devices/system/cpu."""
+    base = f'{sys_path}/devices/system/cpu'
+    online = parse_cpu_list((read_bytes(f'{base}/online', 4096) or b"").decode())
+    if not online:
+        online = sorted(int(name[3:]) for name in os.listdir(base) if name[3:].isdigit()) if os.path.isdir(base) else []
+
+    cpus = {}
+    packages = set()
+    cores = set()
+    for cpu in online:
+        topology = f'{base}/cpu{cpu}/topology'
+        package = read_int(f'{topology}/physical_package_id')
+        core = read_int(f'{topology}/core_id')
+        siblings = parse_cpu_list((read_bytes(f'{topology}/thread_siblings_list', 4096) or b"").decode()) or [cpu]
+        package = 0 if package is None or package < 0 else package
+        core = cpu if core is None else core
+        packages.add(package)
+        cores.add((package, core))
+        cpus[cpu] = {
+            'package': package,
+            'core': core,
+            'siblings': siblings,
+            'max_mhz': (read_int(f'{base}/cpu{cpu}/cpufreq/cpuinfo_max_freq') or 0) // 1000 or None,
+        }
+    smt = (read_bytes(f'{base}/smt/active', 64) or b"").strip()
+    return {
+        'sockets': len(packages),
+        'cores': len(cores),
+        'threads': len(cpus),
+        'smt': smt == b'1' if smt else len(cpus) > len(cores),
+        'cpus': cpus,
+    }
+
+
+def read_cpu_frequencies(sys_path: str, cpus: List[int]) -> Dict[int, int]:
+    """Current frequency in MHz per CPU, for CPUs exposing cpufreq."""
+    base = f'{sys_path}/devices/system/cpu'
+    frequencies = {}
+    for cpu in cpus:
+        khz = read_int(f'{base}/cpu{cpu}/cpufreq/scaling_cur_freq')
+        if khz:
+            frequencies[cpu] = khz // 1000
+    return frequencies
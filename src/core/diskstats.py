@@ -0,0 +1,160 @@
+import os
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+# Columns of /proc/diskstats after "major minor name" that are sampled.
+# Newer kernels append discard and flush counters, which are ignored.
+COLUMNS = ('reads', 'reads_merged', 'read_sectors', 'read_ms', 'writes', 'writes_merged',
+           'write_sectors', 'write_ms', 'in_flight', 'io_ms', 'queue_ms')
+READS, READ_SECTORS, READ_MS, WRITES, WRITE_SECTORS, WRITE_MS, IN_FLIGHT, IO_MS, QUEUE_MS = (
+    COLUMNS.index(c) for c in ('reads', 'read_sectors', 'read_ms', 'writes', 'write_sectors',
+                               'write_ms', 'in_flight', 'io_ms', 'queue_ms'))
+# diskstats always counts 512-byte sectors, whatever the device's block size
+SECTOR_SIZE = 512
+
+
+class DiskStatsSampler:
+    """Per-device I/O rates from /proc/diskstats.
+
+    Each tick is one read of /proc/diskstats into a flat counter array
+    (one row per device); when the device list is unchanged, deltas are a
+    single element-wise pass over the previous array. sysfs is only
+    consulted the first time a device name appears, to learn whether it is
+    a partition (and of which disk) or a device-mapper target (and on which
+    disks). The first sample reports averages since boot.
+    """
+
+    def __init__(self, proc_path: str = '/proc', sys_path: str = '/sys'):
+        self.proc_path = proc_path
+        self.sys_path = sys_path
+        self.names = []  # type: List[str]
+        self.counters = array('q')
+        self.last_time = None  # type: Optional[float]
+        self.info = {}  # type: Dict[str, Dict[str, Any]]
+
+    def _read(self) -> Tuple[List[str], List[Tuple[int, int]], array]:
+        names = []
+        numbers = []
+        counters = array('q')
+        width = len(COLUMNS)
+        try:
+            with open(f'{self.proc_path}/diskstats', 'rb') as f:
+                raw = f.read()
+        except OSError:
+            raw = b""
+        for line in raw.split(b'\n'):
+            fields = line.split()
+            if len(fields) < 3 + width:
+                continue
+            numbers.append((int(fields[0]), int(fields[1])))
+            names.append(fields[2].decode())
+            counters.extend(map(int, fields[3:3 + width]))
+        return names, numbers, counters
+
+    def _uptime(self) -> float:
+        try:
+            with open(f'{self.proc_path}/uptime') as f:
+                return float(f.read().split()[0])
+        except (OSError, ValueError, IndexError):
+            return 0.0
+
+    def describe(self, name: str) -> Dict[str, Any]:
+        """Partition parent, device-mapper name and backing disks from /sys/class/block (memoized)."""
+        info = self.info.get(name)
+        if info is not None:
+            return info
+        base = f'{self.sys_path}/class/block/{name}'
+        info = {'partition': False, 'parent': None, 'dm_name': None, 'slaves': []}
+        if os.path.exists(f'{base}/partition'):
+            info['partition'] = True
+            # /sys/class/block/nvme0n1p1 -> .../block/nvme0n1/nvme0n1p1
+            info['parent'] = os.path.basename(os.path.dirname(os.path.realpath(base)))
+        try:
+            with open(f'{base}/dm/name') as f:
+                info['dm_name'] = f.read().strip() or None
+        except OSError:
+            pass
+        try:
+            info['slaves'] = sorted(os.listdir(f'{base}/slaves'))
+        except OSError:
+            pass
+        self.info[name] = info
+        return info
+
+    def sample(self) -> Dict[str, Any]:
+        """IOPS, throughput, await, queue depth and %util per device with I/O since boot."""
+        now = time.monotonic()
+        names, numbers, counters = self._read()
+        width = len(COLUMNS)
+        since_boot = self.last_time is None
+        if since_boot:
+            elapsed = self._uptime()
+            deltas = counters
+        else:
+            elapsed = now - self.last_time
+            if names == self.names:
+                deltas = array('q', [b - a for a, b in zip(self.counters, counters)])
+            else:
+                # Devices came or went: align rows by name, new devices count from zero
+                previous = {n: i for i, n in enumerate(self.names)}
+                deltas = array('q', counters)
+                for row, name in enumerate(names):
+                    old = previous.get(name)
+                    if old is not None:
+                        for col in range(width):
+                            deltas[row * width + col] -= self.counters[old * width + col]
+        self.names, self.counters, self.last_time = names, counters, now
+
+        devices = []
+        for row, name in enumerate(names):
+            total = counters[row * width:(row + 1) * width]
+            if not (total[READS] or total[WRITES]):
+                continue  # Never used since boot (idle loop, ram and unused namespaces)
+            d = deltas[row * width:(row + 1) * width]
+            reads, writes = max(0, d[READS]), max(0, d[WRITES])
+            read_ms, write_ms = max(0, d[READ_MS]), max(0, d[WRITE_MS])
+            entry = {'name': name, 'major': numbers[row][0], 'minor': numbers[row][1]}
+            entry.update(self.describe(name))
+            entry.update({
+                'reads': total[READS],
+                'writes': total[WRITES],
+                'read_bytes': total[READ_SECTORS] * SECTOR_SIZE,
+                'write_bytes': total[WRITE_SECTORS] * SECTOR_SIZE,
+                'in_flight': total[IN_FLIGHT],
+                'read_iops': reads / elapsed if elapsed > 0 else None,
+                'write_iops': writes / elapsed if elapsed > 0 else None,
+                'read_bps': max(0, d[READ_SECTORS]) * SECTOR_SIZE / elapsed if elapsed > 0 else None,
+                'write_bps': max(0, d[WRITE_SECTORS]) * SECTOR_SIZE / elapsed if elapsed > 0 else None,
+                'read_await': read_ms / reads if reads else 0.0,
+                'write_await': write_ms / writes if writes else 0.0,
+                'await': (read_ms + write_ms) / (reads + writes) if reads + writes else 0.0,
+                # Average requests in flight and share of time with at least one
+                'queue_depth': max(0, d[QUEUE_MS]) / (elapsed * 1000) if elapsed > 0 else None,
+                'util': min(100.0, max(0, d[IO_MS]) / (elapsed * 10)) if elapsed > 0 else None,
+            })
+            devices.append(entry)
+        return {'since_boot': since_boot, 'interval': None if since_boot else elapsed, 'devices': devices}
+
+    @staticmethod
+    def index(devices: List[Dict[str, Any]]) -> Dict[Any, Dict[str, Any]]:
+        """Entries keyed by (major, minor), kernel name and device-mapper name."""
+        index = {}
+        for entry in devices:
+            index[(entry['major'], entry['minor'])] = entry
+            index[entry['name']] = entry
+            if entry['dm_name']:
+                index[entry['dm_name']] = entry
+        return index
+
+    @staticmethod
+    def resolve(device: str, index: Dict[Any, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """The diskstats entry behind a mount source such as /dev/nvme0n1p2 or /dev/mapper/vg-root."""
+        try:
+            rdev = os.stat(device).st_rdev
+            entry = index.get((os.major(rdev), os.minor(rdev)))
+            if entry is not None:
+                return entry
+        except OSError:
+            pass
+        return index.get(os.path.basename(os.path.realpath(device)))
@@ -0,0 +1,343 @@
+import json
+import os
+import re
+import socket
+import socketserver
+import stat
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.core.scanner import Scanner
+from src.core.rules import RuleEngine, health_facts
+from src.core.hwmon import cpu_temperature
+
+
+class CachedCollector:
+    """A collector result shared between scrapes.
+
+    Foreground collectors refresh on demand once their value is older than
+    `min_interval`; concurrent scrapes wait on the same refresh instead of
+    re-reading /proc. Background collectors are only ever refreshed by the
+    exporter's refresh thread, so a slow `rpm`/`systemctl` never blocks a scrape.
+    """
+
+    def __init__(self, name: str, func: Callable[[], Any], min_interval: float, background: bool = False):
+        self.name = name
+        self.func = func
+        self.min_interval = min_interval
+        self.background = background
+        self.value = None
+        self.updated = 0.0  # monotonic time of the last successful refresh
+        self.duration = 0.0
+        self.errors = 0
+        self.lock = threading.Lock()
+
+    def is_stale(self) -> bool:
+        return time.monotonic() - self.updated >= self.min_interval
+
+    def refresh(self):
+        start = time.monotonic()
+        try:
+            self.value = self.func()
+            self.updated = time.monotonic()
+        except Exception:
+            self.errors += 1
+        self.duration = time.monotonic() - start
+
+    def get(self) -> Any:
+        if self.background:
+            return self.value
+        if self.is_stale():
+            with self.lock:
+                # Another scrape may have refreshed while we waited for the lock
+                if self.is_stale():
+                    self.refresh()
+        return self.value
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+class MetricsExporter:
+    """Exposes Scanner collectors in Prometheus text format and as JSON.
+
+    The refresh thread also runs the alert rules once per tick, so 'for'
+    timers, hysteresis and rate() advance every `background_interval`
+    seconds whether or not anyone scrapes; scrapes serve the latest alerts.
+    Collectors hand out the same objects until they refresh, so the engine
+    re-evaluates only the rules whose inputs changed since the last tick.
+    """
+
+    # Collectors the alert rules read facts from
+    RULE_INPUTS = ('load', 'memory', 'pressure', 'sensors', 'thermal_throttle', 'storage', 'failed_units')
+
+    def __init__(self, scanner: Scanner, background_interval: float = 1.0, rules: RuleEngine = None):
+        self.scanner = scanner
+        self.background_interval = background_interval
+        self.collectors = {}  # type: Dict[str, CachedCollector]
+        self.rules = rules or RuleEngine.default()
+        self._rules_lock = threading.Lock()
+        self.active_alerts = []  # type: List[Dict[str, Any]]
+        self._background = False
+        self._stop = threading.Event()
+
+        self.register('uptime', scanner.get_uptime, 1)
+        self.register('load', scanner.get_loadavg, 1)
+        self.register('memory', scanner.get_meminfo, 1)
+        self.register('pressure', scanner.get_pressure, 1)
+        self.register('temperatures', scanner.get_temperatures, 5)
+        self.register('sensors', scanner.get_sensors, 5)
+        self.register('thermal_throttle', scanner.get_thermal_throttle, 5)
+        self.register('network', scanner.get_net_stats, 1)
+        self.register('storage', scanner.get_storage_info, 30)
+        self.register('battery', scanner.get_battery_info, 30)
+        self.register('system', self.system_info, 300)
+        self.register('packages', scanner.get_package_count, 300, background=True)
+        self.register('failed_units', self.failed_units, 30, background=True)
+
+    def register(self, name: str, func: Callable[[], Any], min_interval: float, background: bool = False):
+        self.collectors[name] = CachedCollector(name, func, min_interval, background)
+
+    def system_info(self) -> Dict[str, str]:
+        os_info = self.scanner.get_os_release()
+        return {
+            'hostname': self.scanner.get_hostname(),
+            'kernel': self.scanner.get_kernel_version(),
+            'os': os_info.get('PRETTY_NAME', os_info.get('NAME', 'Linux')),
+        }
+
+    def failed_units(self) -> Optional[int]:
+        if not self.scanner.is_live:
+            return None
+        # Refetched on every refresh; the exporter outlives a single run's memoized list
+        failed = self.scanner.systemd.failed(refresh=True)
+        return None if failed is None else len(failed)
+
+    def _background_loop(self):
+        while not self._stop.is_set():
+            for c in self.collectors.values():
+                if c.background and c.is_stale():
+                    c.refresh()
+            self.evaluate_rules()
+            self._stop.wait(self.background_interval)
+
+    def start_background(self):
+        self._background = True
+        threading.Thread(target=self._background_loop, daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def snapshot(self) -> Dict[str, Any]:
+        data = {name: c.get() for name, c in self.collectors.items()}
+        # Without the refresh thread (one-off use), evaluate on demand
+        data['alerts'] = self.active_alerts if self._background else self.evaluate_rules(data)
+        return data
+
+    def evaluate_rules(self, data: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Advances the alert rules with the current collector values and returns the active alerts."""
+        if data is None:
+            data = {name: self.collectors[name].get() for name in self.RULE_INPUTS}
+        mem = data['memory'] or {}
+        total = mem.get('MemTotal', 0)
+        available = mem.get('MemAvailable', mem.get('MemFree', 0) + mem.get('Cached', 0))
+        facts = health_facts(load=data['load'], memory_percent=(total - available) / total * 100 if total > 0 else None,
+                             pressure=data['pressure'] or {}, cpu_sensor=cpu_temperature(data['sensors'] or []),
+                             sensors=data['sensors'], throttle=data['thermal_throttle'], filesystems=data['storage'])
+        if data['failed_units'] is not None:
+            facts['failed_units'] = data['failed_units']  # Already a count here
+        with self._rules_lock:
+            self.active_alerts = self.rules.evaluate(facts)
+            return self.active_alerts
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot())
+
+    def to_prometheus(self) -> str:
+        data = self.snapshot()
+        lines = []  # type: List[str]
+
+        def metric(name: str, help_text: str, kind: str, samples: List[Tuple[Dict[str, Any], Any]]):
+            samples = [(l, v) for l, v in samples if v is not None]
+            if not samples:
+                return
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_labels(labels)} {value}")
+
+        if data['system']:
+            metric('myfetch_info', "Host information.", 'gauge', [(data['system'], 1)])
+        metric('myfetch_uptime_seconds', "Seconds since boot.", 'gauge', [({}, data['uptime'])])
+        if data['load']:
+            metric('myfetch_load_average', "Load average.", 'gauge',
+                   [({'period': p}, v) for p, v in zip(('1m', '5m', '15m'), data['load'])])
+        if data['memory']:
+            # HugePages_{Total,Free,Rsvd,Surp} are page counts; every other field is in kB
+            metric('myfetch_memory_bytes', "Fields of /proc/meminfo in bytes.", 'gauge',
+                   [({'field': k}, v * 1024) for k, v in data['memory'].items() if not k.startswith('HugePages_')])
+            metric('myfetch_memory_hugepages', "Huge page counts from /proc/meminfo.", 'gauge',
+                   [({'field': k}, v) for k, v in data['memory'].items() if k.startswith('HugePages_')])
+        if data['pressure']:
+            samples = []
+            for resource, kinds in data['pressure'].items():
+                for kind, values in kinds.items():
+                    if 'total' in values:
+                        samples.append(({'resource': resource, 'kind': kind}, values['total'] / 1e6))
+            metric('myfetch_pressure_stalled_seconds_total', "Time tasks stalled on the resource (PSI).", 'counter', samples)
+        if data['temperatures']:
+            metric('myfetch_temperature_celsius', "Thermal zone temperatures.", 'gauge',
+                   [({'sensor': k}, v) for k, v in data['temperatures'].items()])
+        if data['sensors']:
+            names = {'temp': ('myfetch_hwmon_temperature_celsius', "hwmon temperature sensors."),
+                     'fan': ('myfetch_hwmon_fan_rpm', "hwmon fan speeds."),
+                     'in': ('myfetch_hwmon_voltage_volts', "hwmon voltage sensors."),
+                     'power': ('myfetch_hwmon_power_watts', "hwmon power sensors.")}
+            for kind, (name, help_text) in names.items():
+                metric(name, help_text, 'gauge',
+                       [({'chip': r['chip'], 'device': r['device'] or '', 'sensor': r['label']}, r['value'])
+                        for r in data['sensors'] if r['kind'] == kind])
+        if data['thermal_throttle']:
+            metric('myfetch_thermal_throttle_events_total', "CPU thermal throttling events since boot.", 'counter',
+                   [({'scope': 'core'}, data['thermal_throttle']['core_total']),
+                    ({'scope': 'package'}, data['thermal_throttle']['package_total'])])
+        if data['network']:
+            samples = []
+            for iface, counters in data['network'].items():
+                for counter, value in counters.items():
+                    if counter not in ('rx', 'tx'):
+                        samples.append(({'iface': iface, 'counter': counter}, value))
+            metric('myfetch_network_counter_total', "Counters of /proc/net/dev.", 'counter', samples)
+        if data['storage']:
+            metric('myfetch_filesystem_size_bytes', "Filesystem size.", 'gauge',
+                   [({'device': s['device'], 'mount': s['mount'], 'fstype': s['type']}, s['total']) for s in data['storage']])
+            metric('myfetch_filesystem_used_bytes', "Filesystem space used.", 'gauge',
+                   [({'device': s['device'], 'mount': s['mount'], 'fstype': s['type']}, s['used']) for s in data['storage']])
+            metric('myfetch_filesystem_responsive', "0 if statvfs on the mount timed out (dead NFS server, hung FUSE daemon).", 'gauge',
+                   [({'device': s['device'], 'mount': s['mount'], 'fstype': s['type']}, int(s['status'] == 'ok')) for s in data['storage']])
+        if data['battery']:
+            metric('myfetch_battery_capacity_percent', "Battery charge.", 'gauge',
+                   [({'status': data['battery']['status']}, data['battery']['capacity'])])
+        if data['packages']:
+            metric('myfetch_packages', "Installed packages per package manager.", 'gauge',
+                   [({'manager': m}, int(n)) for n, m in re.findall(r'(\d+) \((\w+)\)', data['packages'])])
+        metric('myfetch_systemd_failed_units', "Failed systemd units.", 'gauge', [({}, data['failed_units'])])
+        metric('myfetch_alert', "Active alert rules (1 per firing rule and item).", 'gauge',
+               [({'rule': a['rule'], 'severity': a['severity'], 'id': a['id'] or ''}, 1) for a in data['alerts']])
+        metric('myfetch_alert_active_seconds', "Seconds since the alert started firing.", 'gauge',
+               [({'rule': a['rule'], 'severity': a['severity'], 'id': a['id'] or ''}, a['active_for']) for a in data['alerts']])
+
+        now = time.monotonic()
+        metric('myfetch_collector_age_seconds', "Seconds since the collector last refreshed.", 'gauge',
+               [({'collector': n}, round(now - c.updated, 3)) for n, c in self.collectors.items() if c.updated])
+        metric('myfetch_collector_duration_seconds', "Duration of the last collector refresh.", 'gauge',
+               [({'collector': n}, round(c.duration, 6)) for n, c in self.collectors.items() if c.updated])
+        metric('myfetch_collector_errors_total', "Collector refresh failures.", 'counter',
+               [({'collector': n}, c.errors) for n, c in self.collectors.items()])
+        return "\n".join(lines) + "\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    exporter = None  # type: MetricsExporter
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path == '/metrics':
+            body, ctype = self.exporter.to_prometheus(), 'text/plain; version=0.0.4; charset=utf-8'
+        elif path == '/json':
+            body, ctype = self.exporter.to_json(), 'application/json'
+        elif path == '/':
+            body, ctype = "myfetch exporter: /metrics (Prometheus), /json\n", 'text/plain; charset=utf-8'
+        else:
+            self.send_error(404)
+            return
+        payload = body.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', ctype)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def address_string(self) -> str:
+        # Unix socket peers have no (host, port) address
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def _is_socket(path: str) -> bool:
+    """True if path is a socket (a leftover from a previous run), False if nothing is there.
+
+    Raises ValueError for anything else, so --serve never deletes a regular file.
+    """
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return False
+    if not stat.S_ISSOCK(mode):
+        raise ValueError(f"{path} exists and is not a socket; refusing to replace it")
+    return True
+
+
+def parse_listen(address: str) -> Tuple[str, Any]:
+    """'unix:/path' or '/path' -> unix socket; 'host:port' or 'port' -> TCP.
+
+    Raises ValueError for anything else (e.g. a host without a port) and for
+    a socket path already taken by something that is not a socket.
+    """
+    if address.startswith('unix:') and len(address) > 5:
+        address = address[5:]
+    if address.startswith('/'):
+        _is_socket(address)
+        return 'unix', address
+    host, _, port = address.rpartition(':')
+    if not port.isdigit() or int(port) > 65535:
+        raise ValueError(f"invalid address {address!r}: expected HOST:PORT, PORT or a unix socket path")
+    return 'tcp', (host.strip('[]') or '127.0.0.1', int(port))
+
+
+def serve(scanner: Scanner, address: str = '127.0.0.1:9877', rules: RuleEngine = None):
+    """Runs the exporter until interrupted."""
+    kind, target = parse_listen(address)
+    exporter = MetricsExporter(scanner, rules=rules)
+    exporter.start_background()
+    handler = type('Handler', (_Handler,), {'exporter': exporter})
+
+    if kind == 'unix':
+        if _is_socket(target):
+            os.unlink(target)
+        server = _ThreadingUnixHTTPServer(target, handler)
+    else:
+        server_class = _ThreadingHTTPServer
+        if ':' in target[0]:
+            server_class = type('Server6', (_ThreadingHTTPServer,), {'address_family': socket.AF_INET6})
+        server = server_class(target, handler)
+
+    print(f"myfetch exporter listening on {address} (/metrics, /json)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        exporter.stop()
+        server.server_close()
+        if kind == 'unix' and _is_socket(target):
+            os.unlink(target)
@@ -0,0 +1,39 @@
+import os
+from typing import Optional
+
+
+def read_bytes(path: str, size: int = 65536) -> Optional[bytes]:
+    """Up to `size` bytes of a /proc or /sys file in a single read(); None if it cannot be read.
+
+    Attribute files (sysfs values, /proc/[pid]/stat, cgroup interface files)
+    are produced whole on the first read, so one open/read/close with no
+    Python file object is enough and is the cheapest way to poll them.
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        return os.read(fd, size)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+
+def read_text(path: str, default: Optional[str] = None) -> Optional[str]:
+    """The whole file as stripped text (any size, e.g. /proc/net/fib_trie); `default` if it cannot be read."""
+    try:
+        with open(path, 'r', errors='replace') as f:
+            return f.read().strip()
+    except OSError:
+        return default
+
+
+def read_int(path: str) -> Optional[int]:
+    """An integer attribute such as a sysfs counter; None if missing or not a number."""
+    raw = read_bytes(path, 64)
+    try:
+        return int(raw) if raw else None
+    except ValueError:
+        return None
@@ -1,4 +1,115 @@
+import io
 import os
+import shutil
+import sys
+import unicodedata
+from contextlib import contextmanager, redirect_stdout
+from typing import List, Optional, Tuple
+
+# (SGR state, character, column) -- a cell only matches if it is also at the same column
+Cell = Tuple[str, str, int]
+
+
+def _char_width(ch: str) -> int:
+    if unicodedata.combining(ch):
+        return 0
+    return 2 if unicodedata.east_asian_width(ch) in ('W', 'F') else 1
+
+
+def parse_cells(line: str, columns: int) -> List[Cell]:
+    """Splits a line with SGR escapes into screen cells, clipped to `columns`."""
+    cells = []
+    sgr = ''
+    col = 0
+    i = 0
+    n = len(line)
+    while i < n:
+        ch = line[i]
+        if ch == '\033' and i + 1 < n and line[i + 1] == '[':
+            end = i + 2
+            while end < n and not ('@' <= line[end] <= '~'):
+                end += 1
+            seq = line[i:end + 1]
+            if seq.endswith('m'):
+                sgr = '' if seq in ('\033[0m', '\033[m') else sgr + seq
+            i = end + 1
+            continue
+        width = _char_width(ch)
+        if col + width > columns:
+            break
+        cells.append((sgr, ch, col))
+        col += width
+        i += 1
+    return cells
+
+
+class ScreenPainter:
+    """Turns successive full frames into minimal terminal updates.
+
+    The first frame (and any frame after a resize) clears the screen; later
+    frames only move the cursor to runs of cells that changed and rewrite
+    those, then clear leftovers of shorter lines and rows. A steady `--top`
+    screen therefore costs a few dozen bytes per tick instead of a full
+    repaint, which matters on slow SSH links and avoids flicker.
+    """
+
+    # Unchanged cells between two changed runs that are cheaper to rewrite than to skip
+    MERGE_GAP = 6
+
+    def __init__(self):
+        self.previous = None  # type: Optional[List[List[Cell]]]
+        self.size = None
+
+    @staticmethod
+    def _run(row: int, cells: List[Cell]) -> str:
+        out = [f"\033[{row + 1};{cells[0][2] + 1}H\033[0m"]
+        sgr = ''
+        for cell_sgr, ch, _ in cells:
+            if cell_sgr != sgr:
+                out.append('\033[0m' + cell_sgr if sgr else cell_sgr)
+                sgr = cell_sgr
+            out.append(ch)
+        out.append('\033[0m')
+        return ''.join(out)
+
+    def paint(self, text: str) -> str:
+        size = shutil.get_terminal_size()
+        lines = text.rstrip('\n').split('\n')[:max(1, size.lines - 1)]
+        rows = [parse_cells(line, size.columns) for line in lines]
+        previous = self.previous
+        full = previous is None or size != self.size
+        self.previous, self.size = rows, size
+
+        out = ['\033[H\033[2J'] if full else []
+        for r, cells in enumerate(rows):
+            old = [] if full or r >= len(previous) else previous[r]
+            start = None
+            last = None
+            for i, cell in enumerate(cells):
+                if i < len(old) and old[i] == cell:
+                    continue
+                if start is not None and i - last > self.MERGE_GAP:
+                    out.append(self._run(r, cells[start:last + 1]))
+                    start = None
+                if start is None:
+                    start = i
+                last = i
+            if start is not None:
+                out.append(self._run(r, cells[start:last + 1]))
+            if old:
+                old_end = old[-1][2] + _char_width(old[-1][1])
+                new_end = cells[-1][2] + _char_width(cells[-1][1]) if cells else 0
+                if old_end > new_end:
+                    out.append(f"\033[{r + 1};{new_end + 1}H\033[K")
+        if not full and len(previous) > len(rows):
+            out.append(f"\033[{len(rows) + 1};1H\033[J")
+        return ''.join(out)
+
+    def finish(self) -> str:
+        """Cursor below the last frame, so the shell prompt does not overwrite it."""
+        rows = len(self.previous) if self.previous else 0
+        return f"\033[{rows + 1};1H"
+
 
 class Formatter:
     """Handles ANSI colors, icons, and layout formatting."""
@@ -16,17 +127,59 @@ class Formatter:
         'gray': '\033[90m',
     }
 
+    HEAT_GLYPHS = '▁▂▃▄▅▆▇█'
+
     def __init__(self, use_colors=True, use_icons=False):
         self.use_colors = use_colors
         self.use_icons = use_icons
+        self.painter = None  # type: Optional[ScreenPainter]
+        self._codes = {}
 
     def color(self, text: str, color_name: str, bold=False) -> str:
         if not self.use_colors:
             return text
-        code = self.COLORS.get(color_name, self.COLORS['reset'])
-        if bold:
-            code += self.COLORS['bold']
-        return f"{code}{text}{self.COLORS['reset']}"
+        code = self._codes.get((color_name, bold))
+        if code is None:
+            code = self.COLORS.get(color_name, self.COLORS['reset'])
+            if bold:
+                code += self.COLORS['bold']
+            self._codes[(color_name, bold)] = code
+        return f"{code}{text}\033[0m"
+
+    @contextmanager
+    def frame(self):
+        """Collects everything printed inside the block and writes it with one write().
+
+        While live() is active the frame is diffed against the previous one
+        and only the changed cells are sent.
+        """
+        buffer = io.StringIO()
+        try:
+            with redirect_stdout(buffer):
+                yield buffer
+        finally:
+            text = buffer.getvalue()
+            if self.painter is not None:
+                text = self.painter.paint(text)
+            if text:
+                sys.stdout.write(text)
+            sys.stdout.flush()
+
+    @contextmanager
+    def live(self):
+        """Refresh-loop mode: frames are painted in place with the cursor hidden."""
+        if not sys.stdout.isatty():
+            # Pipes and log files get plain successive frames
+            yield
+            return
+        self.painter = ScreenPainter()
+        sys.stdout.write("\033[?25l")
+        try:
+            yield
+        finally:
+            sys.stdout.write(self.painter.finish() + "\033[0m\033[?25h")
+            sys.stdout.flush()
+            self.painter = None
 
     def get_progress_bar(self, percent: float, width=20) -> str:
         """Returns a color-coded progress bar."""
@@ -41,6 +194,25 @@ class Formatter:
         
         return self.color(bar, color)
 
+    def heatmap(self, values: List[float], width: int = 64) -> List[str]:
+        """One glyph per percentage (e.g. per CPU), `width` per row; runs of one colour share an escape code."""
+        rows = []
+        for start in range(0, len(values), width):
+            parts = []
+            run, run_color = "", None
+            for value in values[start:start + width]:
+                glyph = self.HEAT_GLYPHS[min(len(self.HEAT_GLYPHS) - 1, max(0, int(value / 100 * len(self.HEAT_GLYPHS))))]
+                color = 'red' if value > 90 else 'yellow' if value > 60 else 'green' if value > 5 else 'gray'
+                if color != run_color and run:
+                    parts.append(self.color(run, run_color))
+                    run = ""
+                run += glyph
+                run_color = color
+            if run:
+                parts.append(self.color(run, run_color))
+            rows.append("".join(parts))
+        return rows
+
     def format_size(self, size_kb: float) -> str:
         """Formats size in KB to human readable string."""
         for unit in ['KB', 'MB', 'GB', 'TB']:
@@ -0,0 +1,81 @@
+import re
+from typing import Dict, Optional
+
+# Where distributions install the pciutils/usbutils databases (hwdata on Fedora/Arch)
+IDS_PATHS = {
+    'pci': ['/usr/share/hwdata/pci.ids', '/usr/share/misc/pci.ids', '/usr/share/pci.ids'],
+    'usb': ['/usr/share/hwdata/usb.ids', '/usr/share/misc/usb.ids', '/usr/share/usb.ids'],
+}
+
+# Top-level entries: "8086  Intel Corporation" and "C 03  Display controller". Anchoring on
+# the newline rather than ^ with re.M lets the regex engine skip ahead to candidate lines.
+_TOP_LEVEL = re.compile(rb'\n([0-9a-f]{4}|C [0-9a-f]{2})  ')
+
+
+def build_index(path: str) -> Dict[str, int]:
+    """Byte offset of every vendor and class line in a pci.ids/usb.ids file.
+
+    Device and subclass lines are indented under their vendor or class, so
+    with the offset of the parent line a lookup only reads that one block
+    instead of parsing the multi-megabyte file. Class keys keep their 'C '
+    prefix so they cannot collide with vendor IDs.
+    """
+    with open(path, 'rb') as f:
+        data = b'\n' + f.read()
+    # Offsets are of the line itself; the extra leading newline cancels the +1
+    return {m.group(1).decode(): m.start() for m in _TOP_LEVEL.finditer(data)}
+
+
+class IdsDatabase:
+    """Vendor, device and class names from a pci.ids/usb.ids file through an offset index.
+
+    The index is a plain dict of ints, so callers can keep it in the fact
+    cache (invalidated when the file's mtime changes); each lookup is then
+    one seek and a read of the vendor's block. Lookups are memoized.
+    """
+
+    def __init__(self, path: str, index: Dict[str, int]):
+        self.path = path
+        self.index = index
+        self.blocks = {}  # type: Dict[str, Dict[str, str]]
+
+    def _block(self, key: str) -> Optional[Dict[str, str]]:
+        """The parent line's name (under '') and its direct children by ID."""
+        block = self.blocks.get(key)
+        if block is not None or key not in self.index:
+            return block
+        block = {}
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(self.index[key])
+                block[''] = f.readline().decode('utf-8', 'replace').rstrip('\n')[len(key):].strip()
+                for raw in f:
+                    if not raw.startswith(b'\t'):
+                        if raw.startswith(b'#') or not raw.strip():
+                            continue
+                        break  # Next vendor or class
+                    if raw.startswith(b'\t\t'):
+                        continue  # Subsystems and programming interfaces
+                    child, _, name = raw.decode('utf-8', 'replace').strip().partition('  ')
+                    block[child] = name.strip()
+        except OSError:
+            return None
+        self.blocks[key] = block
+        return block
+
+    def vendor(self, vendor_id: str) -> Optional[str]:
+        block = self._block(vendor_id.lower())
+        return block[''] if block else None
+
+    def device(self, vendor_id: str, device_id: str) -> Optional[str]:
+        block = self._block(vendor_id.lower())
+        return block.get(device_id.lower()) if block else None
+
+    def device_class(self, class_id: str, subclass_id: Optional[str] = None) -> Optional[str]:
+        """Class name, or the subclass name (e.g. 'VGA compatible controller') when known."""
+        block = self._block(f"C {class_id.lower()}")
+        if not block:
+            return None
+        if subclass_id is not None and subclass_id.lower() in block:
+            return block[subclass_id.lower()]
+        return block['']
@@ -0,0 +1,155 @@
+import os
+from typing import Any, Dict, List, Optional
+
+from src.core.fileio import read_text
+
+# World-readable /sys/class/dmi/id attributes (serials and the UUID are root-only and skipped)
+DMI_FIELDS = ('sys_vendor', 'product_name', 'product_version', 'product_family',
+              'board_vendor', 'board_name', 'board_version',
+              'bios_vendor', 'bios_version', 'bios_date', 'bios_release',
+              'chassis_vendor', 'chassis_type')
+# Values firmware vendors leave in unset DMI strings
+DMI_PLACEHOLDERS = {'to be filled by o.e.m.', 'default string', 'not specified', 'not applicable',
+                    'system product name', 'system manufacturer', 'none', 'o.e.m.', 'oem', 'x.x'}
+# SMBIOS chassis types (DMTF DSP0134, 7.4.1) worth naming
+CHASSIS_TYPES = {3: "Desktop", 4: "Low Profile Desktop", 6: "Mini Tower", 7: "Tower", 8: "Portable",
+                 9: "Laptop", 10: "Notebook", 13: "All in One", 14: "Sub Notebook", 17: "Main Server Chassis",
+                 23: "Rack Mount Chassis", 30: "Tablet", 31: "Convertible", 32: "Detachable", 35: "Mini PC"}
+
+# Substrings of DMI vendor/product strings that identify a hypervisor
+HYPERVISORS = (
+    ('qemu', "QEMU"), ('kvm', "KVM"), ('vmware', "VMware"), ('virtualbox', "VirtualBox"),
+    ('innotek', "VirtualBox"), ('xen', "Xen"), ('bochs', "Bochs"), ('parallels', "Parallels"),
+    ('bhyve', "bhyve"), ('amazon ec2', "Amazon EC2"), ('google compute engine', "Google Compute Engine"),
+    ('openstack', "OpenStack"), ('cloud hypervisor', "Cloud Hypervisor"), ('firecracker', "Firecracker"),
+    ('apple virtualization', "Apple Virtualization"),
+)
+
+# PCI base classes shown as their own hardware rows
+PCI_DISPLAY, PCI_NETWORK, PCI_STORAGE = '03', '02', '01'
+
+
+def read_dmi(sys_path: str = '/sys') -> Dict[str, str]:
+    """System, board, BIOS and chassis strings from /sys/class/dmi/id (no root, no dmidecode)."""
+    base = f'{sys_path}/class/dmi/id'
+    dmi = {}
+    for field in DMI_FIELDS:
+        value = read_text(f'{base}/{field}', '')
+        if value and value.lower() not in DMI_PLACEHOLDERS:
+            dmi[field] = value
+    chassis = dmi.get('chassis_type')
+    if chassis and chassis.isdigit():
+        dmi['chassis'] = CHASSIS_TYPES.get(int(chassis), "Other")
+    return dmi
+
+
+def list_pci_devices(sys_path: str = '/sys') -> List[Dict[str, Any]]:
+    """IDs, class and bound driver of every PCI function from /sys/bus/pci/devices."""
+    base = f'{sys_path}/bus/pci/devices'
+    try:
+        slots = sorted(os.listdir(base))
+    except OSError:
+        return []
+    devices = []
+    for slot in slots:
+        path = f'{base}/{slot}'
+        vendor = read_text(f'{path}/vendor', '')
+        device = read_text(f'{path}/device', '')
+        if not vendor or not device:
+            continue
+        class_code = read_text(f'{path}/class', '')[2:].rjust(6, '0')  # 0x030000 -> class 03, subclass 00, prog-if 00
+        try:
+            driver = os.path.basename(os.readlink(f'{path}/driver'))
+        except OSError:
+            driver = None
+        devices.append({
+            'slot': slot,
+            'vendor_id': vendor[2:],
+            'device_id': device[2:],
+            'subsystem_vendor_id': read_text(f'{path}/subsystem_vendor', '')[2:] or None,
+            'subsystem_device_id': read_text(f'{path}/subsystem_device', '')[2:] or None,
+            'class_id': class_code[:2],
+            'subclass_id': class_code[2:4],
+            'driver': driver,
+        })
+    return devices
+
+
+def list_usb_devices(sys_path: str = '/sys') -> List[Dict[str, Any]]:
+    """USB devices (not interfaces) with their IDs and the strings they report themselves."""
+    base = f'{sys_path}/bus/usb/devices'
+    try:
+        names = sorted(os.listdir(base))
+    except OSError:
+        return []
+    devices = []
+    for name in names:
+        if ':' in name:
+            continue  # Interfaces such as 1-1:1.0
+        path = f'{base}/{name}'
+        vendor = read_text(f'{path}/idVendor', '')
+        product = read_text(f'{path}/idProduct', '')
+        if not vendor or not product:
+            continue
+        devices.append({
+            'bus_id': name,
+            'vendor_id': vendor,
+            'product_id': product,
+            'manufacturer': read_text(f'{path}/manufacturer', '') or None,
+            'product': read_text(f'{path}/product', '') or None,
+            'speed': read_text(f'{path}/speed', '') or None,  # Mbit/s
+            'hub': read_text(f'{path}/bDeviceClass', '') == '09',
+        })
+    return devices
+
+
+def detect_virtualization(path, dmi: Dict[str, str]) -> Dict[str, Optional[str]]:
+    """Hypervisor and container detection without root or forking.
+
+    /sys/hypervisor/type names Xen (and s390 z/VM) guests; everything else
+    is recognised from the DMI vendor, product and BIOS strings. Only when
+    there is no DMI at all is the CPUID 'hypervisor' flag checked, in the
+    first processor block of /proc/cpuinfo. `path` maps system paths under
+    the scanner root.
+    """
+    result = {'type': None, 'name': None, 'container': None}  # type: Dict[str, Optional[str]]
+
+    hypervisor = read_text(path('/sys/hypervisor/type'), '')
+    if hypervisor:
+        result.update(type='vm', name=hypervisor.capitalize() if hypervisor == 'xen' else hypervisor)
+    else:
+        fingerprint = " ".join(dmi.get(k, '') for k in ('sys_vendor', 'product_name', 'bios_vendor',
+                                                        'board_vendor', 'chassis_vendor')).lower()
+        for needle, name in HYPERVISORS:
+            if needle in fingerprint:
+                result.update(type='vm', name=name)
+                break
+        else:
+            if 'microsoft corporation' in fingerprint and 'virtual machine' in fingerprint:
+                result.update(type='vm', name="Hyper-V")
+            elif not dmi and _cpu_hypervisor_flag(path):
+                # No DMI at all (e.g. Firecracker, some ARM guests) but CPUID says virtualized
+                result.update(type='vm', name="Unknown hypervisor")
+
+    if os.path.exists(path('/.dockerenv')):
+        result['container'] = "Docker"
+    elif os.path.exists(path('/run/.containerenv')):
+        result['container'] = "Podman"
+    else:
+        # Written by systemd-nspawn, LXC and other managers that follow the container interface
+        result['container'] = read_text(path('/run/systemd/container'), '') or None
+    return result
+
+
+def _cpu_hypervisor_flag(path) -> bool:
+    """Looks for the 'hypervisor' flag in the first processor block only."""
+    try:
+        with open(path('/proc/cpuinfo'), 'r') as f:
+            for line in f:
+                if line.startswith('flags'):
+                    return ' hypervisor' in line
+                if not line.strip():
+                    break
+    except OSError:
+        pass
+    return False
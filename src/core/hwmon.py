@@ -0,0 +1,210 @@
+import os
+import re
+from array import array
+from typing import Any, Dict, List, Optional
+
+from src.core.fileio import read_text
+
+# Sensor kinds read from hwmon, with the unit and the divisor of their sysfs values
+# (see Documentation/hwmon/sysfs-interface.rst)
+SENSOR_KINDS = {
+    'temp': ('°C', 1000.0),      # millidegrees Celsius
+    'fan': ('RPM', 1.0),
+    'in': ('V', 1000.0),         # millivolts
+    'power': ('W', 1000000.0),   # microwatts
+}
+_INPUT = re.compile(r'^(temp|fan|in|power)(\d+)_(input|average)$')
+
+# CPU temperature sensors by hwmon chip name, best first; labels narrow them down when a chip has several
+CPU_SENSORS = (
+    ('coretemp', ('Package id 0',)),
+    ('k10temp', ('Tctl', 'Tdie')),
+    ('zenpower', ('Tdie', 'Tctl')),
+    ('cpu_thermal', ()),
+    ('soc_thermal', ()),
+    ('acpitz', ()),
+)
+
+# Per-CPU counters under /sys/devices/system/cpu/cpuN/thermal_throttle (Intel, therm_throt driver)
+THROTTLE_COUNTERS = ('core_throttle_count', 'package_throttle_count')
+
+
+def _read_scaled(path: str, scale: float) -> Optional[float]:
+    value = read_text(path)
+    try:
+        return int(value) / scale if value else None
+    except ValueError:
+        return None
+
+
+class HwmonCollector:
+    """Temperature, fan, voltage and power readings from /sys/class/hwmon.
+
+    The hwmon directories are walked once: every sensor's input file is
+    remembered along with its label and max/crit thresholds, which drivers
+    set at probe time. Later reads open only the remembered input files,
+    so a watch loop never lists a directory again. Call rescan() after
+    hotplugging a device that brings its own sensors.
+    """
+
+    def __init__(self, sys_path: str = '/sys'):
+        self.sys_path = sys_path
+        self.sensors = None  # type: Optional[List[Dict[str, Any]]]
+
+    def rescan(self):
+        self.sensors = None
+
+    def _discover(self) -> List[Dict[str, Any]]:
+        base = f'{self.sys_path}/class/hwmon'
+        try:
+            chips = sorted(os.listdir(base), key=lambda n: int(n[5:]) if n[5:].isdigit() else 0)
+        except OSError:
+            return []
+        sensors = []
+        for chip in chips:
+            path = f'{base}/{chip}'
+            # Drivers from before the hwmon class (and a few still) keep attributes on the device
+            if read_text(f'{path}/name') is None and os.path.exists(f'{path}/device/name'):
+                path = f'{path}/device'
+            name = read_text(f'{path}/name') or chip
+            device = os.path.basename(os.path.realpath(f'{base}/{chip}/device')) if os.path.exists(f'{base}/{chip}/device') else None
+            try:
+                files = sorted(os.listdir(path))
+            except OSError:
+                continue
+            present = set(files)
+            for filename in files:
+                m = _INPUT.match(filename)
+                if not m:
+                    continue
+                kind, index, source = m.groups()
+                prefix = f'{kind}{index}'
+                if source == 'average' and f'{prefix}_input' in present:
+                    continue  # power meters may offer both; prefer the instantaneous value
+                unit, scale = SENSOR_KINDS[kind]
+                thresholds = {}
+                for limit in ('max', 'crit'):
+                    if f'{prefix}_{limit}' in present:
+                        thresholds[limit] = _read_scaled(f'{path}/{prefix}_{limit}', scale)
+                sensors.append({
+                    'chip': name,
+                    'device': device,
+                    'kind': kind,
+                    'label': read_text(f'{path}/{prefix}_label') or prefix,
+                    'unit': unit,
+                    'scale': scale,
+                    'path': f'{path}/{filename}',
+                    'max': thresholds.get('max'),
+                    'crit': thresholds.get('crit'),
+                })
+        return sensors
+
+    def read(self) -> List[Dict[str, Any]]:
+        """Current value of every sensor; sensors that fail to read (asleep, unplugged) are left out."""
+        if self.sensors is None:
+            self.sensors = self._discover()
+        readings = []
+        for s in self.sensors:
+            value = _read_scaled(s['path'], s['scale'])
+            if value is None:
+                continue
+            readings.append({
+                'chip': s['chip'],
+                'device': s['device'],
+                'kind': s['kind'],
+                'label': s['label'],
+                'value': value,
+                'unit': s['unit'],
+                'max': s['max'],
+                'crit': s['crit'],
+            })
+        return readings
+
+
+def cpu_temperature(readings: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """The reading that best represents the CPU package temperature."""
+    temps = [r for r in readings if r['kind'] == 'temp']
+    for chip, labels in CPU_SENSORS:
+        candidates = [r for r in temps if r['chip'] == chip]
+        for label in labels:
+            for r in candidates:
+                if r['label'] == label:
+                    return r
+        if candidates:
+            return max(candidates, key=lambda r: r['value'])
+    return None
+
+
+class ThrottleSampler:
+    """CPU thermal throttling events from the per-CPU thermal_throttle counters.
+
+    The counter files are located once; each sample reads them into a flat
+    array and reports the events since the previous sample (or since boot
+    on the first call). Package counters are repeated on every CPU of a
+    package, so they are counted once per package.
+    """
+
+    def __init__(self, sys_path: str = '/sys'):
+        self.sys_path = sys_path
+        self.paths = None  # type: Optional[List[str]]
+        self.cpus = []  # type: List[int]
+        self.package_rows = set()  # type: set
+        self.counters = None  # type: Optional[array]
+
+    def _discover(self):
+        base = f'{self.sys_path}/devices/system/cpu'
+        self.paths = []
+        self.cpus = []
+        self.package_rows = set()
+        try:
+            names = os.listdir(base)
+        except OSError:
+            return
+        seen_packages = set()
+        for name in sorted((n for n in names if n[3:].isdigit() and n.startswith('cpu')), key=lambda n: int(n[3:])):
+            throttle = f'{base}/{name}/thermal_throttle'
+            if not os.path.isdir(throttle):
+                continue
+            package = read_text(f'{base}/{name}/topology/physical_package_id')
+            row = len(self.cpus)
+            if package not in seen_packages:
+                seen_packages.add(package)
+                self.package_rows.add(row)
+            self.cpus.append(int(name[3:]))
+            self.paths.extend(f'{throttle}/{counter}' for counter in THROTTLE_COUNTERS)
+
+    @property
+    def available(self) -> bool:
+        if self.paths is None:
+            self._discover()
+        return bool(self.paths)
+
+    def sample(self) -> Optional[Dict[str, Any]]:
+        """Core and package throttle events; None when the CPU does not expose the counters."""
+        if not self.available:
+            return None
+        counters = array('q', (int(read_text(p) or 0) for p in self.paths))
+        since_boot = self.counters is None
+        previous = self.counters if not since_boot else array('q', bytes(len(counters) * 8))
+        self.counters = counters
+
+        width = len(THROTTLE_COUNTERS)
+        core_events = package_events = core_total = package_total = 0
+        throttled = []
+        for row, cpu in enumerate(self.cpus):
+            core = max(0, counters[row * width] - previous[row * width])
+            core_events += core
+            core_total += counters[row * width]
+            if core:
+                throttled.append(cpu)
+            if row in self.package_rows:
+                package_events += max(0, counters[row * width + 1] - previous[row * width + 1])
+                package_total += counters[row * width + 1]
+        return {
+            'since_boot': since_boot,
+            'core_events': core_events,
+            'package_events': package_events,
+            'throttled_cpus': throttled,
+            'core_total': core_total,
+            'package_total': package_total,
+        }
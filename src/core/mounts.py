@@ -0,0 +1,188 @@
+import os
+import queue
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Filesystems whose statvfs() can block on a remote server or a userspace daemon
+NETWORK_FS = {'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'ceph', 'glusterfs', '9p', 'afs', 'lustre', 'gpfs', 'beegfs'}
+OVERLAY_FS = {'overlay', 'aufs'}
+
+_ESCAPE = re.compile(r'\\([0-7]{3})')
+
+
+def _unescape(field: str) -> str:
+    """mountinfo escapes space, tab, newline and backslash as octal (e.g. '\\040')."""
+    return _ESCAPE.sub(lambda m: chr(int(m.group(1), 8)), field) if '\\' in field else field
+
+
+def is_remote(fs_type: str) -> bool:
+    """Network, FUSE and overlay filesystems, which are skipped unless asked for."""
+    return fs_type in NETWORK_FS or fs_type in OVERLAY_FS or fs_type.startswith('fuse')
+
+
+def select_mounts(data: str, keep: Optional[Callable[[str, str], bool]] = None) -> List[Dict[str, Any]]:
+    """Parses /proc/[pid]/mountinfo (see proc(5)) into one entry per filesystem.
+
+    Mounts are deduplicated by major:minor, preferring the mount of the
+    filesystem's root over bind mounts of a subdirectory; 'binds' counts the
+    others. keep(fs_type, source) filters lines before they are unpacked and
+    entries are only built for the survivors, which is most of the cost on
+    hosts with thousands of container mounts.
+    """
+    chosen = {}  # type: Dict[str, tuple]
+    binds = {}  # type: Dict[str, int]
+    for line in data.splitlines():
+        # Optional fields vary in number, but " - " always precedes "fstype source"
+        head, sep, tail = line.partition(' - ')
+        tail = tail.split()
+        if not sep or len(tail) < 2:
+            continue
+        if keep is not None and not keep(tail[0], tail[1]):
+            continue
+        fields = head.split()
+        if len(fields) < 6:
+            continue
+        key = fields[2]
+        binds[key] = binds.get(key, 0) + 1
+        current = chosen.get(key)
+        if current is None or (fields[3] == '/' and current[0][3] != '/'):
+            chosen[key] = (fields, tail)
+
+    mounts = []
+    for key, (fields, tail) in chosen.items():
+        major, _, minor = key.partition(':')
+        mounts.append({
+            'major': int(major),
+            'minor': int(minor),
+            'root': _unescape(fields[3]),
+            'mount': _unescape(fields[4]),
+            'options': fields[5],
+            'type': tail[0],
+            'source': _unescape(tail[1]),
+            'binds': binds[key] - 1,
+        })
+    return mounts
+
+
+class MountStat:
+    """Runs statvfs() on daemon worker threads with a per-mount timeout.
+
+    A statvfs on a dead NFS server or a wedged FUSE daemon sleeps in the
+    kernel and cannot be interrupted, so it must never run on the caller's
+    thread. Each call is handed to a small pool of daemon threads; a mount
+    that has not answered within `timeout` is reported as unresponsive and
+    its worker is written off (a replacement is started so the rest of the
+    queue keeps moving). Mounts whose earlier statvfs is still stuck are
+    reported as unresponsive straight away instead of piling up threads,
+    and whatever has not answered within `budget` is given up on.
+    """
+
+    def __init__(self, timeout: float = 2.0, max_workers: int = 8, budget: float = 5.0):
+        self.timeout = timeout
+        self.budget = budget  # for the whole call, so a host full of dead mounts still returns
+        self.max_workers = max_workers
+        self.stuck = set()  # type: set
+        self.lock = threading.Lock()
+
+    def _worker(self, jobs: 'queue.Queue', results: Dict[str, Any], started: Dict[str, float],
+                done: threading.Condition, total: int):
+        while True:
+            try:
+                path = jobs.get_nowait()
+            except queue.Empty:
+                return
+            with done:
+                started[path] = time.monotonic()
+            with self.lock:
+                self.stuck.add(path)
+            try:
+                result = os.statvfs(path)  # type: Any
+            except OSError as e:
+                result = e
+            with self.lock:
+                self.stuck.discard(path)
+            with done:
+                results[path] = result
+                if len(results) == total:
+                    done.notify()
+
+    def stat_many(self, paths: List[str]) -> Dict[str, Any]:
+        """statvfs results (os.statvfs_result or OSError) per path; None means unresponsive."""
+        results = {}  # type: Dict[str, Any]
+        with self.lock:
+            skipped = [p for p in paths if p in self.stuck]
+        pending = [p for p in paths if p not in skipped]
+        if not pending:
+            return {p: None for p in paths}
+        jobs = queue.Queue()  # type: queue.Queue
+        for path in pending:
+            jobs.put(path)
+        started = {}  # type: Dict[str, float]
+        done = threading.Condition()
+        spawn = lambda: threading.Thread(target=self._worker, args=(jobs, results, started, done, len(pending)),
+                                         name='statvfs', daemon=True).start()
+        for _ in range(min(self.max_workers, len(pending))):
+            spawn()
+
+        timed_out = set()
+        deadline = time.monotonic() + self.budget
+        with done:
+            while len(results) + len(timed_out) < len(pending):
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                for path, start in started.items():
+                    if path not in results and path not in timed_out and now - start >= self.timeout:
+                        timed_out.add(path)
+                        if not jobs.empty():
+                            spawn()
+                # Woken early once every result is in; otherwise poll for timeouts
+                done.wait(min(0.05, self.timeout))
+            # Anything still running is reported as unresponsive from here on
+            outcome = dict(results)
+        for path in skipped:
+            outcome[path] = None
+        for path in paths:
+            outcome.setdefault(path, None)
+        return outcome
+
+
+def storage_info(read_file: Callable[[str], str], path: Callable[[str], str], stat: MountStat,
+                 include_remote: bool = False) -> List[Dict[str, Any]]:
+    """Capacity of every mounted filesystem, one row per device, without hanging on dead mounts."""
+    if include_remote:
+        keep = lambda fs_type, source: source.startswith('/dev/') or is_remote(fs_type)
+    else:
+        keep = lambda fs_type, source: source.startswith('/dev/')
+    mounts = select_mounts(read_file('/proc/self/mountinfo'), keep)
+    results = stat.stat_many([path(m['mount']) for m in mounts])
+    storage = []
+    for m in mounts:
+        st = results.get(path(m['mount']))
+        entry = {
+            'device': m['source'],
+            'mount': m['mount'],
+            'type': m['type'],
+            'major': m['major'],
+            'minor': m['minor'],
+            'binds': m['binds'],
+            'remote': is_remote(m['type']),
+            'status': 'ok',
+            'total': None,
+            'used': None,
+            'percent': None,
+        }
+        if st is None:
+            entry['status'] = 'unresponsive'
+        elif isinstance(st, OSError):
+            continue  # Unmounted since mountinfo was read, or not ours to stat
+        else:
+            total = st.f_blocks * st.f_frsize
+            if total == 0 and not entry['remote']:
+                continue  # Pseudo filesystems backed by a /dev node
+            used = total - st.f_bavail * st.f_frsize
+            entry.update(total=total, used=used, percent=(used / total * 100) if total > 0 else 0)
+        storage.append(entry)
+    return storage
@@ -0,0 +1,228 @@
+import os
+import socket
+import struct
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.core.fileio import read_text
+
+# rtnetlink constants (linux/netlink.h, linux/rtnetlink.h, linux/if_addr.h)
+NETLINK_ROUTE = 0
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+NLMSG_ERROR = 0x2
+NLMSG_DONE = 0x3
+RTM_NEWADDR = 20
+RTM_GETADDR = 22
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+
+NLMSG_HDR = struct.Struct('=IHHII')
+IFADDRMSG = struct.Struct('=BBBBI')
+RTATTR = struct.Struct('=HH')
+
+Address = Tuple[str, str, int, int]  # (family, address, prefixlen, ifindex)
+
+
+def _align(n: int) -> int:
+    return (n + 3) & ~3
+
+
+class AddressCollector:
+    """Enumerates interface addresses without touching the network.
+
+    Addresses come from an RTM_GETADDR dump over rtnetlink, falling back to
+    /proc/net/fib_trie + /proc/net/route (IPv4) and /proc/net/if_inet6 (IPv6)
+    when netlink sockets are unavailable (e.g. seccomp-restricted containers).
+    Link details (MTU, operstate, speed, MAC) come from /sys/class/net.
+    """
+
+    def __init__(self, proc_path: str = '/proc', sys_path: str = '/sys', use_netlink: bool = True):
+        self.proc_path = proc_path
+        self.sys_path = sys_path
+        self.use_netlink = use_netlink
+
+    def netlink_addresses(self) -> Optional[List[Address]]:
+        """Dumps all addresses over rtnetlink. Returns None if netlink is unavailable."""
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+        except (OSError, AttributeError):
+            return None
+        addresses = []
+        try:
+            sock.settimeout(1.0)
+            sock.bind((0, 0))
+            body = IFADDRMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0)
+            sock.send(NLMSG_HDR.pack(NLMSG_HDR.size + len(body), RTM_GETADDR, NLM_F_REQUEST | NLM_F_DUMP, 1, 0) + body)
+            done = False
+            while not done:
+                data = sock.recv(65536)
+                if not data:
+                    break
+                offset = 0
+                while offset + NLMSG_HDR.size <= len(data):
+                    length, msg_type, _, _, _ = NLMSG_HDR.unpack_from(data, offset)
+                    if length < NLMSG_HDR.size:
+                        done = True
+                        break
+                    if msg_type == NLMSG_DONE:
+                        done = True
+                        break
+                    if msg_type == NLMSG_ERROR:
+                        return None
+                    if msg_type == RTM_NEWADDR:
+                        addr = self._parse_addr(data[offset + NLMSG_HDR.size:offset + length])
+                        if addr:
+                            addresses.append(addr)
+                    offset += _align(length)
+        except OSError:
+            return None
+        finally:
+            sock.close()
+        return addresses
+
+    @staticmethod
+    def _parse_addr(msg: bytes) -> Optional[Address]:
+        family, prefixlen, _, _, index = IFADDRMSG.unpack_from(msg, 0)
+        attrs = {}
+        offset = IFADDRMSG.size
+        while offset + RTATTR.size <= len(msg):
+            rta_len, rta_type = RTATTR.unpack_from(msg, offset)
+            if rta_len < RTATTR.size:
+                break
+            attrs[rta_type] = msg[offset + RTATTR.size:offset + rta_len]
+            offset += _align(rta_len)
+        # IFA_LOCAL is the interface's own address on point-to-point links
+        raw = attrs.get(IFA_LOCAL) or attrs.get(IFA_ADDRESS)
+        if family == socket.AF_INET and raw and len(raw) == 4:
+            return ('inet', socket.inet_ntop(socket.AF_INET, raw), prefixlen, index)
+        if family == socket.AF_INET6 and raw and len(raw) == 16:
+            return ('inet6', socket.inet_ntop(socket.AF_INET6, raw), prefixlen, index)
+        return None
+
+    def _ifindexes(self) -> Dict[str, int]:
+        indexes = {}
+        base = os.path.join(self.sys_path, 'class/net')
+        try:
+            names = os.listdir(base)
+        except OSError:
+            return indexes
+        for name in names:
+            idx = read_text(os.path.join(base, name, 'ifindex'), "")
+            if idx.isdigit():
+                indexes[name] = int(idx)
+        return indexes
+
+    def _ipv4_routes(self) -> List[Tuple[str, int, int]]:
+        """(iface, network, mask) tuples from /proc/net/route as comparable ints.
+
+        The kernel prints the raw network-order words with %08X, so they are
+        repacked in native order and read back big-endian.
+        """
+        routes = []
+        lines = read_text(os.path.join(self.proc_path, 'net/route'), "").splitlines()[1:]
+        for line in lines:
+            parts = line.split()
+            if len(parts) < 8:
+                continue
+            try:
+                dest = struct.unpack('!I', struct.pack('=I', int(parts[1], 16)))[0]
+                mask = struct.unpack('!I', struct.pack('=I', int(parts[7], 16)))[0]
+            except (ValueError, struct.error):
+                continue
+            routes.append((parts[0], dest, mask))
+        return routes
+
+    def proc_addresses(self) -> List[Address]:
+        """Fallback: local IPv4 from fib_trie (matched to routes) and IPv6 from if_inet6."""
+        addresses = []
+        indexes = self._ifindexes()
+
+        # fib_trie lists each local address as "|-- A.B.C.D" followed by "/32 host LOCAL"
+        routes = [r for r in self._ipv4_routes() if r[2]]
+        seen = set()
+        last = None
+        for line in read_text(os.path.join(self.proc_path, 'net/fib_trie'), "").splitlines():
+            line = line.strip()
+            if line.startswith('|--'):
+                last = line[3:].strip()
+            elif line.startswith('/32 host LOCAL') and last and last not in seen:
+                seen.add(last)
+                ip = struct.unpack('!I', socket.inet_aton(last))[0]
+                if last.startswith('127.'):
+                    iface, prefix = 'lo', 8
+                else:
+                    # The longest matching connected route names the interface
+                    match = max((r for r in routes if ip & r[2] == r[1]), key=lambda r: r[2], default=None)
+                    if match is None:
+                        continue
+                    iface, prefix = match[0], bin(match[2]).count('1')
+                addresses.append(('inet', last, prefix, indexes.get(iface, 0)))
+
+        for line in read_text(os.path.join(self.proc_path, 'net/if_inet6'), "").splitlines():
+            parts = line.split()
+            if len(parts) < 6:
+                continue
+            try:
+                addr = socket.inet_ntop(socket.AF_INET6, bytes.fromhex(parts[0]))
+                addresses.append(('inet6', addr, int(parts[2], 16), int(parts[1], 16)))
+            except (ValueError, OSError):
+                continue
+        return addresses
+
+    def interfaces(self) -> List[Dict[str, Any]]:
+        """Every interface with its IPv4/IPv6 addresses and link details."""
+        addresses = self.netlink_addresses() if self.use_netlink else None
+        if addresses is None:
+            addresses = self.proc_addresses()
+
+        by_index = {}
+        base = os.path.join(self.sys_path, 'class/net')
+        for name, index in sorted(self._ifindexes().items(), key=lambda x: x[1]):
+            path = os.path.join(base, name)
+            mtu = read_text(os.path.join(path, 'mtu'), "")
+            # speed raises EINVAL for down or virtual links
+            speed = read_text(os.path.join(path, 'speed'), "")
+            by_index[index] = {
+                'name': name,
+                'index': index,
+                'mac': read_text(os.path.join(path, 'address'), ""),
+                'mtu': int(mtu) if mtu.isdigit() else None,
+                'operstate': read_text(os.path.join(path, 'operstate'), "") or 'unknown',
+                'speed': int(speed) if speed.lstrip('-').isdigit() and int(speed) > 0 else None,
+                'ipv4': [],
+                'ipv6': [],
+            }
+        for family, addr, prefix, index in addresses:
+            iface = by_index.get(index)
+            if iface is None:
+                continue
+            key = 'ipv4' if family == 'inet' else 'ipv6'
+            cidr = f"{addr}/{prefix}"
+            if cidr not in iface[key]:
+                iface[key].append(cidr)
+        return list(by_index.values())
+
+    def default_interface(self) -> Optional[str]:
+        """Interface of the IPv4 default route, read from /proc/net/route."""
+        for iface, dest, mask in self._ipv4_routes():
+            if dest == 0 and mask == 0:
+                return iface
+        return None
+
+    def primary_address(self, interfaces: Optional[List[Dict[str, Any]]] = None) -> Optional[str]:
+        """Best local address: the default-route interface, else the first global address."""
+        if interfaces is None:
+            interfaces = self.interfaces()
+        default = self.default_interface()
+        candidates = sorted(interfaces, key=lambda i: i['name'] != default)
+        for iface in candidates:
+            if iface['name'] == 'lo':
+                continue
+            for cidr in iface['ipv4']:
+                return cidr.split('/')[0]
+        for iface in candidates:
+            for cidr in iface['ipv6']:
+                addr = cidr.split('/')[0]
+                if not addr.startswith('fe80') and addr != '::1':
+                    return addr
+        return None
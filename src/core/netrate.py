@@ -0,0 +1,97 @@
+import math
+import time
+from typing import Dict, List, Optional
+
+# Column order of /proc/net/dev after the "iface:" prefix
+NET_DEV_FIELDS = (
+    'rx_bytes', 'rx_packets', 'rx_errs', 'rx_drop', 'rx_fifo', 'rx_frame', 'rx_compressed', 'rx_multicast',
+    'tx_bytes', 'tx_packets', 'tx_errs', 'tx_drop', 'tx_fifo', 'tx_colls', 'tx_carrier', 'tx_compressed',
+)
+
+COUNTER_32 = 1 << 32
+COUNTER_64 = 1 << 64
+
+
+def parse_net_dev(data: str) -> Dict[str, List[int]]:
+    """Parses /proc/net/dev into {iface: [16 counters]} in NET_DEV_FIELDS order."""
+    counters = {}
+    for line in data.splitlines()[2:]:  # Skip headers
+        iface, sep, rest = line.partition(':')
+        if not sep:
+            continue
+        try:
+            values = [int(x) for x in rest.split()]
+        except ValueError:
+            continue
+        if len(values) >= 16:
+            counters[iface.strip()] = values[:16]
+    return counters
+
+
+def counter_delta(old: int, new: int) -> int:
+    """Difference between two counter readings, tolerating 32/64-bit wraps."""
+    if new >= old:
+        return new - old
+    if COUNTER_32 >> 1 <= old < COUNTER_32:
+        return new + COUNTER_32 - old
+    if old >= COUNTER_64 >> 1:
+        return new + COUNTER_64 - old
+    # Counter went backwards far from any wrap point: it was reset (e.g. interface re-created)
+    return new
+
+
+class NetRateSampler:
+    """Per-interface throughput rates from successive /proc/net/dev reads.
+
+    Rates are smoothed with an EWMA whose weight depends on the elapsed time
+    (time constant `smoothing` seconds), so irregular ticks do not skew the
+    average. Interfaces that appear start fresh; interfaces that vanish are
+    dropped. One file read and one split per line per tick keeps hosts with
+    hundreds of veth interfaces cheap to sample.
+    """
+
+    RATE_KEYS = ('rx_bytes', 'tx_bytes', 'rx_packets', 'tx_packets', 'errs', 'drop')
+
+    def __init__(self, read_file, smoothing: float = 5.0, include_lo: bool = False):
+        self.read_file = read_file
+        self.smoothing = smoothing
+        self.include_lo = include_lo
+        self.counters = {}  # type: Dict[str, List[int]]
+        self.rates = {}  # type: Dict[str, Dict[str, float]]
+        self.last_time = None  # type: Optional[float]
+
+    def sample(self) -> Dict[str, Dict[str, float]]:
+        """Reads /proc/net/dev once and returns smoothed per-second rates per interface."""
+        now = time.monotonic()
+        current = parse_net_dev(self.read_file('/proc/net/dev'))
+        if not self.include_lo:
+            current.pop('lo', None)
+
+        elapsed = (now - self.last_time) if self.last_time is not None else 0.0
+        alpha = 1 - math.exp(-elapsed / self.smoothing) if elapsed > 0 and self.smoothing > 0 else 1.0
+
+        for iface, values in current.items():
+            old = self.counters.get(iface)
+            if old is None or elapsed <= 0:
+                continue
+            d = [counter_delta(o, n) for o, n in zip(old, values)]
+            instant = {
+                'rx_bytes': d[0] / elapsed,
+                'tx_bytes': d[8] / elapsed,
+                'rx_packets': d[1] / elapsed,
+                'tx_packets': d[9] / elapsed,
+                'errs': (d[2] + d[10]) / elapsed,
+                'drop': (d[3] + d[11]) / elapsed,
+            }
+            prev = self.rates.get(iface)
+            if prev is None:
+                self.rates[iface] = instant
+            else:
+                for key in self.RATE_KEYS:
+                    prev[key] += alpha * (instant[key] - prev[key])
+
+        for iface in self.counters.keys() - current.keys():
+            self.rates.pop(iface, None)
+        self.counters = current
+        self.last_time = now
+        return self.rates
@@ -0,0 +1,338 @@
+import os
+import struct
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# (name, version) of one installed package
+Package = Tuple[str, str]
+
+# dpkg marks installed packages with "Status: <want> ok installed"
+DPKG_INSTALLED = b' ok installed\n'
+CHUNK_SIZE = 1 << 20
+
+RPM_DIRS = ('/usr/lib/sysimage/rpm', '/var/lib/rpm')
+# Header tags of interest and the RPM_STRING_TYPE / RPM_INT32_TYPE codes
+RPMTAG_NAME, RPMTAG_VERSION, RPMTAG_RELEASE, RPMTAG_EPOCH, RPMTAG_ARCH = 1000, 1001, 1002, 1003, 1022
+RPM_INT32_TYPE, RPM_STRING_TYPE = 4, 6
+
+
+def count_dpkg(path: str) -> int:
+    """Installed packages in a dpkg status file, counted over raw chunks without decoding it."""
+    count = 0
+    carry = b''
+    keep = len(DPKG_INSTALLED) - 1
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                return count
+            data = carry + chunk
+            count += data.count(DPKG_INSTALLED)
+            # The tail is too short to hold a whole match, so nothing is counted twice
+            carry = data[-keep:]
+
+
+def list_dpkg(path: str) -> List[Package]:
+    """(name, version) of installed packages, streamed stanza by stanza."""
+    packages = []
+    name = version = None
+    installed = False
+    with open(path, 'rb') as f:
+        for line in f:
+            if line == b'\n':
+                if installed and name:
+                    packages.append((name, version or ''))
+                name = version = None
+                installed = False
+            elif line.startswith(b'Package: '):
+                name = line[9:].strip().decode('utf-8', 'replace')
+            elif line.startswith(b'Version: '):
+                version = line[9:].strip().decode('utf-8', 'replace')
+            elif line.startswith(b'Status: '):
+                installed = line.endswith(DPKG_INSTALLED)
+    if installed and name:
+        packages.append((name, version or ''))
+    return packages
+
+
+def parse_rpm_header(blob: bytes) -> Dict[int, object]:
+    """Name, version, release, epoch and arch from an exported RPM header (il, dl, index, data)."""
+    if len(blob) < 8:
+        return {}
+    il, dl = struct.unpack_from('>II', blob, 0)
+    data_start = 8 + il * 16
+    if data_start + dl > len(blob):
+        return {}
+    wanted = (RPMTAG_NAME, RPMTAG_VERSION, RPMTAG_RELEASE, RPMTAG_EPOCH, RPMTAG_ARCH)
+    values = {}
+    for i in range(il):
+        tag, kind, offset, count = struct.unpack_from('>iIiI', blob, 8 + i * 16)
+        if tag not in wanted or not 0 <= offset < dl:
+            continue
+        at = data_start + offset
+        if kind == RPM_STRING_TYPE:
+            end = blob.find(b'\0', at, data_start + dl)
+            if end != -1:
+                values[tag] = blob[at:end].decode('utf-8', 'replace')
+        elif kind == RPM_INT32_TYPE and count:
+            values[tag] = struct.unpack_from('>i', blob, at)[0]
+    return values
+
+
+def rpm_package(header: Dict[int, object]) -> Optional[Package]:
+    name = header.get(RPMTAG_NAME)
+    if not name or name == 'gpg-pubkey':
+        return None  # Imported signing keys are stored as pseudo-packages
+    version = f"{header.get(RPMTAG_VERSION, '')}-{header.get(RPMTAG_RELEASE, '')}"
+    if header.get(RPMTAG_EPOCH):
+        version = f"{header[RPMTAG_EPOCH]}:{version}"
+    if header.get(RPMTAG_ARCH):
+        version += f".{header[RPMTAG_ARCH]}"
+    return name, version
+
+
+def _sqlite_connect(path: str):
+    import sqlite3
+    from urllib.parse import quote
+    uri = f'file:{quote(path)}'
+    db = None
+    try:
+        db = sqlite3.connect(f'{uri}?mode=ro', uri=True)
+        db.execute('SELECT 1 FROM Packages LIMIT 1')
+        return db
+    except sqlite3.Error:
+        if db is not None:
+            db.close()
+    # WAL databases need a writable -shm file; as non-root, read the snapshot as immutable
+    db = sqlite3.connect(f'{uri}?mode=ro&immutable=1', uri=True)
+    try:
+        db.execute('SELECT 1 FROM Packages LIMIT 1')
+    except sqlite3.Error:
+        db.close()
+        raise
+    return db
+
+
+def count_rpm_sqlite(path: str) -> int:
+    """Packages in rpmdb.sqlite (RHEL 9, Fedora 33+), minus imported gpg-pubkey entries."""
+    db = _sqlite_connect(path)
+    try:
+        total = db.execute('SELECT COUNT(*) FROM Packages').fetchone()[0]
+        try:
+            keys = db.execute("SELECT COUNT(*) FROM Name WHERE key = 'gpg-pubkey'").fetchone()[0]
+        except Exception:
+            keys = 0
+        return total - keys
+    finally:
+        db.close()
+
+
+def list_rpm_sqlite(path: str) -> List[Package]:
+    db = _sqlite_connect(path)
+    try:
+        packages = []
+        for (blob,) in db.execute('SELECT blob FROM Packages'):
+            package = rpm_package(parse_rpm_header(bytes(blob)))
+            if package:
+                packages.append(package)
+        return packages
+    finally:
+        db.close()
+
+
+class BerkeleyHash:
+    """Minimal reader for the Berkeley DB hash file rpm used before 4.16 (/var/lib/rpm/Packages).
+
+    Only what is needed to enumerate records is implemented: the metadata
+    page (byte order and page size), hash pages (key/data item pairs) and
+    overflow page chains, which hold the header blobs.
+    """
+
+    HASH_MAGIC = 0x061561
+    P_HASH_UNSORTED, P_OVERFLOW, P_HASH = 2, 7, 13
+    H_KEYDATA, H_OFFPAGE = 1, 3
+    PAGE_HEADER = 26
+
+    def __init__(self, path: str):
+        import mmap
+        with open(path, 'rb') as f:
+            # Mapped rather than read: counting only touches the hash pages, not the header blobs
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            for order in ('<', '>'):
+                if len(self.data) >= 512 and struct.unpack_from(order + 'I', self.data, 12)[0] == self.HASH_MAGIC:
+                    self.order = order
+                    break
+            else:
+                raise ValueError("not a Berkeley DB hash file")
+            self.page_size = struct.unpack_from(self.order + 'I', self.data, 20)[0]
+            if not self.page_size or len(self.data) % self.page_size:
+                raise ValueError("truncated Berkeley DB file")
+        except ValueError:
+            self.close()
+            raise
+
+    def close(self):
+        self.data.close()
+
+    def __enter__(self) -> 'BerkeleyHash':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _page(self, pgno: int) -> Tuple[int, int, int, int, int]:
+        """(offset, next page, entries, hf_offset, type) of a page."""
+        base = pgno * self.page_size
+        next_pgno, entries, hf_offset, _, kind = struct.unpack_from(self.order + 'IHHBB', self.data, base + 16)
+        return base, next_pgno, entries, hf_offset, kind
+
+    def _overflow(self, pgno: int, length: int) -> bytes:
+        parts = []
+        remaining = length
+        seen = 0
+        while pgno and remaining > 0 and seen < len(self.data) // self.page_size:
+            base, next_pgno, _, used, kind = self._page(pgno)
+            if kind != self.P_OVERFLOW:
+                break
+            parts.append(self.data[base + self.PAGE_HEADER:base + self.PAGE_HEADER + min(used, remaining)])
+            remaining -= used
+            pgno = next_pgno
+            seen += 1
+        return b''.join(parts)
+
+    def records(self, values: bool = True) -> Iterator[Tuple[bytes, Optional[bytes]]]:
+        """(key, value) of every record; value is None when values=False."""
+        order = self.order
+        pages = len(self.data) // self.page_size
+        for pgno in range(1, pages):
+            base, _, entries, _, kind = self._page(pgno)
+            if kind not in (self.P_HASH, self.P_HASH_UNSORTED):
+                continue
+            offsets = struct.unpack_from(f'{order}{entries}H', self.data, base + self.PAGE_HEADER)
+            for i in range(0, entries - 1, 2):
+                key_at, value_at = base + offsets[i], base + offsets[i + 1]
+                key_end = base + (offsets[i - 1] if i else self.page_size)
+                if self.data[key_at] != self.H_KEYDATA:
+                    continue
+                key = self.data[key_at + 1:key_end]
+                value = None
+                if values:
+                    if self.data[value_at] == self.H_OFFPAGE:
+                        pgno_ov, length = struct.unpack_from(order + 'II', self.data, value_at + 4)
+                        value = self._overflow(pgno_ov, length)
+                    elif self.data[value_at] == self.H_KEYDATA:
+                        value = self.data[value_at + 1:key_at]
+                yield key, value
+
+
+def _is_header_key(key: bytes) -> bool:
+    # Record 0 holds rpm's next-instance counter, not a package
+    return len(key) == 4 and key != b'\0\0\0\0'
+
+
+def count_rpm_bdb(path: str) -> int:
+    """Records in the legacy Packages hash file. Unlike the SQLite count this includes gpg-pubkey entries."""
+    with BerkeleyHash(path) as db:
+        return sum(1 for key, _ in db.records(values=False) if _is_header_key(key))
+
+
+def list_rpm_bdb(path: str) -> List[Package]:
+    packages = []
+    with BerkeleyHash(path) as db:
+        for key, blob in db.records():
+            if _is_header_key(key) and blob:
+                package = rpm_package(parse_rpm_header(blob))
+                if package:
+                    packages.append(package)
+    return packages
+
+
+def _count_entries(path: str, suffix: str = '', dirs_only: bool = False) -> int:
+    with os.scandir(path) as entries:
+        return sum(1 for e in entries
+                   if e.name.endswith(suffix) and not e.name.startswith('.') and (not dirs_only or e.is_dir()))
+
+
+def list_pacman(path: str) -> List[Package]:
+    """pacman keeps one directory per package named name-version-release."""
+    packages = []
+    with os.scandir(path) as entries:
+        for e in entries:
+            if e.is_dir():
+                name, _, version = e.name.rpartition('-')
+                name, _, pkgver = name.rpartition('-')
+                packages.append((name, f"{pkgver}-{version}"))
+    return packages
+
+
+class PackageInventory:
+    """Installed packages per package manager, read straight from their databases.
+
+    Nothing is forked: the dpkg status file is counted over raw byte
+    chunks, rpm's SQLite database is opened read-only with the stdlib
+    sqlite3 module (falling back to the legacy Berkeley DB hash file), and
+    pacman, flatpak and snap are single directory listings. `path` maps
+    absolute paths under the scanner root.
+    """
+
+    def __init__(self, path: Callable[[str], str] = lambda p: p):
+        self.path = path
+
+    def _rpm_database(self) -> Tuple[Optional[str], Optional[str]]:
+        for directory in RPM_DIRS:
+            sqlite_db = self.path(f'{directory}/rpmdb.sqlite')
+            if os.path.exists(sqlite_db):
+                return 'sqlite', sqlite_db
+            bdb = self.path(f'{directory}/Packages')
+            if os.path.exists(bdb):
+                return 'bdb', bdb
+        return None, None
+
+    def _managers(self, versions: bool):
+        """(manager, callable) for every package database present on the host."""
+        dpkg = self.path('/var/lib/dpkg/status')
+        if os.path.exists(dpkg):
+            yield 'dpkg', (lambda: list_dpkg(dpkg)) if versions else (lambda: count_dpkg(dpkg))
+        kind, rpm_db = self._rpm_database()
+        if kind == 'sqlite':
+            yield 'rpm', (lambda: list_rpm_sqlite(rpm_db)) if versions else (lambda: count_rpm_sqlite(rpm_db))
+        elif kind == 'bdb':
+            yield 'rpm', (lambda: list_rpm_bdb(rpm_db)) if versions else (lambda: count_rpm_bdb(rpm_db))
+        pacman = self.path('/var/lib/pacman/local')
+        if os.path.isdir(pacman):
+            yield 'pacman', (lambda: list_pacman(pacman)) if versions else (lambda: _count_entries(pacman, dirs_only=True))
+        flatpak = self.path('/var/lib/flatpak/app')
+        if os.path.isdir(flatpak):
+            yield 'flatpak', (lambda: [(e, '') for e in os.listdir(flatpak)]) if versions else (lambda: _count_entries(flatpak))
+        snap = self.path('/var/lib/snapd/snaps')
+        if os.path.isdir(snap):
+            if versions:
+                # Snap files are named <name>_<revision>.snap
+                yield 'snap', lambda: [(f[:-5].rpartition('_')[0], f[:-5].rpartition('_')[2]) for f in os.listdir(snap) if f.endswith('.snap')]
+            else:
+                yield 'snap', lambda: _count_entries(snap, '.snap')
+
+    def counts(self) -> Dict[str, int]:
+        """{manager: installed packages}; unreadable databases are left out."""
+        counts = {}
+        for manager, func in self._managers(versions=False):
+            try:
+                count = func()
+            except Exception:
+                # A locked, corrupt or unreadable database must not break the summary
+                continue
+            if count > 0:
+                counts[manager] = count
+        return counts
+
+    def packages(self) -> Dict[str, List[Package]]:
+        """{manager: [(name, version), ...]} sorted by name."""
+        inventory = {}
+        for manager, func in self._managers(versions=True):
+            try:
+                packages = func()
+            except Exception:
+                continue
+            if packages:
+                inventory[manager] = sorted(packages)
+        return inventory
@@ -0,0 +1,88 @@
+import time
+from typing import Dict, Optional
+
+
+def parse_pressure(data: str) -> Dict[str, Dict[str, float]]:
+    """Parses a PSI file (/proc/pressure/* or a cgroup's *.pressure).
+
+    Returns {'some': {...}, 'full': {...}} with avg10/avg60/avg300 in percent
+    and total in microseconds of stall time. 'full' is absent for CPU on
+    older kernels.
+    """
+    result = {}
+    for line in data.splitlines():
+        kind, _, rest = line.partition(' ')
+        if kind not in ('some', 'full'):
+            continue
+        values = {}
+        for field in rest.split():
+            key, _, value = field.partition('=')
+            try:
+                values[key] = int(value) if key == 'total' else float(value)
+            except ValueError:
+                continue
+        result[kind] = values
+    return result
+
+
+class PressureSampler:
+    """System-wide Pressure Stall Information from /proc/pressure/{cpu,memory,io}.
+
+    The kernel's avg10/avg60/avg300 are exponentially decayed averages. For
+    sampling modes the `total` stall counters (microseconds) are also turned
+    into exact stall rates over the sampling interval: the share of wall time
+    in which some (or all) runnable tasks were stalled on the resource.
+    """
+
+    RESOURCES = ('cpu', 'memory', 'io')
+
+    def __init__(self, read_file):
+        self.read_file = read_file
+        self.last_totals = {}  # type: Dict[str, int]
+        self.last_time = None  # type: Optional[float]
+
+    def read(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """{resource: {'some': {...}, 'full': {...}}}; empty when PSI is disabled (psi=0) or unsupported."""
+        pressure = {}
+        for resource in self.RESOURCES:
+            data = self.read_file(f'/proc/pressure/{resource}')
+            if data:
+                pressure[resource] = parse_pressure(data)
+        return pressure
+
+    def sample(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Like read(), plus a 'rate' (percent stalled) per line from the second sample on."""
+        now = time.monotonic()
+        pressure = self.read()
+        elapsed = (now - self.last_time) if self.last_time is not None else 0.0
+        totals = {}
+        for resource, kinds in pressure.items():
+            for kind, values in kinds.items():
+                key = f"{resource}.{kind}"
+                total = values.get('total')
+                if total is None:
+                    continue
+                totals[key] = total
+                previous = self.last_totals.get(key)
+                if previous is not None and elapsed > 0:
+                    values['rate'] = max(0, total - previous) / (elapsed * 1e6) * 100
+        self.last_totals = totals
+        self.last_time = now
+        return pressure
+
+
+# (resource, kind, warning %, critical %, reason) behind the built-in psi_* alert rules.
+# 'some' = at least one task stalled, 'full' = all non-idle tasks stalled at once (lost throughput).
+PRESSURE_THRESHOLDS = (
+    ('cpu', 'some', 25.0, 60.0, "CPU contention"),
+    ('memory', 'some', 10.0, 30.0, "Memory pressure"),
+    ('memory', 'full', 2.0, 10.0, "Memory thrashing"),
+    ('io', 'some', 25.0, 60.0, "I/O contention"),
+    ('io', 'full', 10.0, 30.0, "I/O stalls"),
+)
+
+
+def stall_percent(values: Dict[str, float]) -> float:
+    """The measured rate over the last interval when sampled, otherwise the kernel's 60s average."""
+    rate = values.get('rate')
+    return rate if rate is not None else values.get('avg60', 0.0)
@@ -0,0 +1,99 @@
+import heapq
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.core.proctable import ProcessTable
+
+
+class ProcState:
+    """Per-PID state kept between ticks."""
+    __slots__ = ('name', 'uid', 'start', 'ticks', 'cpu', 'rss')
+
+    def __init__(self, name: str, uid: Optional[int], start: int, ticks: int):
+        self.name = name
+        self.uid = uid
+        self.start = start
+        self.ticks = ticks
+        self.cpu = 0.0
+        self.rss = 0
+
+
+class ProcessMonitor:
+    """Computes per-process CPU% from utime/stime deltas between ProcessTable snapshots.
+
+    Each sample() refreshes the shared ProcessTable (one read of
+    /proc/[pid]/stat per PID) and diffs its rows against the previous tick:
+    only new PIDs pay for the owner lookup, exited PIDs are dropped, and a PID
+    whose start time changed was reused by the kernel and is treated as a new
+    process.
+    """
+
+    def __init__(self, proc_path: str = '/proc'):
+        self.proc_path = proc_path
+        self.table = ProcessTable(proc_path)
+        try:
+            self.clk_tck = os.sysconf('SC_CLK_TCK')
+        except (ValueError, OSError):
+            self.clk_tck = 100
+        self.procs = {}  # type: Dict[int, ProcState]
+        self.last_time = None  # type: Optional[float]
+        self.overhead = 0.0  # percent of one core used by the monitor itself
+        self.added = 0
+        self.removed = 0
+
+    def sample(self):
+        """Takes one tick: refreshes every tracked PID and updates CPU% figures."""
+        cpu_start = time.process_time()
+        now = time.monotonic()
+        elapsed = (now - self.last_time) if self.last_time is not None else 0.0
+        scale = 100.0 / (self.clk_tck * elapsed) if elapsed > 0 else 0.0
+
+        table = self.table.refresh()
+        names, owner = table.names, table.owner
+        previous = self.procs
+        procs = {}
+        added = 0
+        for i, (pid, start, utime, stime, rss) in enumerate(
+                zip(table.pid, table.start, table.utime, table.stime, table.rss)):
+            ticks = utime + stime
+            st = previous.pop(pid, None)
+            if st is None or st.start != start:
+                st = ProcState(names[i], owner(i), start, ticks)
+                added += 1
+            else:
+                st.cpu = (ticks - st.ticks) * scale
+                st.ticks = ticks
+            st.rss = rss
+            procs[pid] = st
+
+        # Whatever is left in the previous tick's map has exited
+        self.procs = procs
+        self.added = added
+        self.removed = len(previous)
+
+        if elapsed > 0:
+            # CPU time spent sampling, relative to the interval it covers
+            self.overhead = (time.process_time() - cpu_start) / elapsed * 100
+        self.last_time = now
+
+    def top(self, limit: int = 5, key: str = 'cpu') -> List[Dict[str, Any]]:
+        """Returns the top processes by 'cpu' or 'rss' using a heap, not a full sort."""
+        getter = (lambda item: (item[1].cpu, item[1].rss)) if key == 'cpu' else (lambda item: item[1].rss)
+        return [
+            {
+                'pid': pid,
+                'name': st.name,
+                'cpu': st.cpu,
+                'mem_bytes': st.rss,
+                'owner': st.uid,
+            }
+            for pid, st in heapq.nlargest(limit, self.procs.items(), key=getter)
+        ]
+
+    def memory_candidates(self) -> List[Tuple[int, str, int]]:
+        """(pid, name, rss) of every process with resident memory, for smaps_rollup accounting."""
+        return [(pid, st.name, st.rss) for pid, st in self.procs.items() if st.rss]
+
+    def __len__(self) -> int:
+        return len(self.procs)
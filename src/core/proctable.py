@@ -0,0 +1,132 @@
+import heapq
+import os
+from array import array
+from typing import Any, Dict, List, Optional
+
+from src.core.fileio import read_bytes
+
+
+class ProcessTable:
+    """Process snapshot stored as parallel typed arrays instead of one dict per process.
+
+    refresh() fills every column in a single os.scandir('/proc') pass reading
+    only /proc/[pid]/stat. Owners are resolved lazily (one stat per PID that is
+    actually displayed), and top-N queries use a bounded heap over row indices,
+    i.e. O(n log k) instead of sorting the whole table.
+    """
+
+    COLUMNS = ('pid', 'ppid', 'rss', 'utime', 'stime', 'start', 'uid', 'state')
+    UNKNOWN_UID = -1
+
+    def __init__(self, proc_path: str = '/proc'):
+        self.proc_path = proc_path
+        try:
+            self.page_size = os.sysconf('SC_PAGE_SIZE')
+        except (ValueError, OSError):
+            self.page_size = 4096
+        self.clear()
+
+    def clear(self):
+        self.pid = array('i')
+        self.ppid = array('i')
+        self.rss = array('q')      # bytes
+        self.utime = array('q')    # clock ticks
+        self.stime = array('q')    # clock ticks
+        self.start = array('q')    # clock ticks after boot; tells a reused PID apart
+        self.uid = array('q')      # UNKNOWN_UID until resolved
+        self.state = array('b')    # ord() of the state letter
+        self.names = []  # type: List[str]
+
+    def __len__(self) -> int:
+        return len(self.pid)
+
+    def refresh(self) -> 'ProcessTable':
+        """Rebuilds the table from /proc."""
+        self.clear()
+        page_size = self.page_size
+        pid_a, ppid_a, rss_a = self.pid.append, self.ppid.append, self.rss.append
+        utime_a, stime_a, start_a = self.utime.append, self.stime.append, self.start.append
+        uid_a, state_a = self.uid.append, self.state.append
+        names_a = self.names.append
+        proc_path = self.proc_path
+        try:
+            entries = os.scandir(proc_path)
+        except OSError:
+            return self
+        with entries:
+            for entry in entries:
+                name = entry.name
+                if not name.isdigit():
+                    continue
+                raw = read_bytes(f'{proc_path}/{name}/stat', 4096) or b""
+                end = raw.rfind(b')')
+                if end == -1:
+                    continue
+                rest = raw[end + 2:].split()
+                try:
+                    # rest indices: 0=state, 1=ppid, 11=utime, 12=stime, 19=starttime, 21=rss (pages)
+                    ppid = int(rest[1])
+                    utime = int(rest[11])
+                    stime = int(rest[12])
+                    start = int(rest[19])
+                    rss = int(rest[21]) * page_size
+                    state = rest[0][0]
+                except (IndexError, ValueError):
+                    continue
+                pid_a(int(name))
+                ppid_a(ppid)
+                rss_a(rss)
+                utime_a(utime)
+                stime_a(stime)
+                start_a(start)
+                uid_a(self.UNKNOWN_UID)
+                state_a(state)
+                names_a(raw[raw.find(b'(') + 1:end].decode(errors='replace'))
+        return self
+
+    def column(self, name: str) -> array:
+        if name not in self.COLUMNS:
+            raise KeyError(f"Unknown process table column: {name}")
+        return getattr(self, name)
+
+    def owner(self, index: int) -> Optional[int]:
+        """Resolves (and remembers) the owning UID of a row."""
+        uid = self.uid[index]
+        if uid == self.UNKNOWN_UID:
+            try:
+                uid = os.stat(f'{self.proc_path}/{self.pid[index]}').st_uid
+            except OSError:
+                return None
+            self.uid[index] = uid
+        return uid
+
+    def top(self, column: str = 'rss', limit: int = 5) -> List[int]:
+        """Row indices of the `limit` largest values of a column."""
+        if column == 'cpu':
+            utime, stime = self.utime, self.stime
+            key = lambda i: utime[i] + stime[i]
+        else:
+            key = self.column(column).__getitem__
+        return heapq.nlargest(limit, range(len(self)), key=key)
+
+    def row(self, index: int, with_owner: bool = False) -> Dict[str, Any]:
+        return {
+            'pid': self.pid[index],
+            'ppid': self.ppid[index],
+            'name': self.names[index],
+            'state': chr(self.state[index]),
+            'mem_bytes': self.rss[index],
+            'utime': self.utime[index],
+            'stime': self.stime[index],
+            'owner': self.owner(index) if with_owner else None,
+        }
+
+    def top_rows(self, column: str = 'rss', limit: int = 5, with_owner: bool = False) -> List[Dict[str, Any]]:
+        return [self.row(i, with_owner) for i in self.top(column, limit)]
+
+    def count_by_state(self) -> Dict[str, int]:
+        counts = {}
+        for s in self.state:
+            key = chr(s)
+            counts[key] = counts.get(key, 0) + 1
+        return counts
@@ -0,0 +1,199 @@
+import math
+import mmap
+import os
+import re
+import struct
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+# Field order of one fixed-width record (little-endian, no padding)
+RECORD_FIELDS = (
+    ('time', 'd'),
+    ('load1', 'f'),
+    ('load5', 'f'),
+    ('load15', 'f'),
+    ('mem_percent', 'f'),
+    ('mem_available', 'Q'),   # bytes
+    ('net_rx', 'Q'),          # cumulative bytes, all interfaces
+    ('net_tx', 'Q'),
+    ('temp_max', 'f'),        # NaN when no sensor
+    ('disk_percent', 'f'),    # fullest mounted filesystem
+)
+RECORD = struct.Struct('<' + ''.join(code for _, code in RECORD_FIELDS))
+FIELD_NAMES = [name for name, _ in RECORD_FIELDS]
+
+MAGIC = b'MFRB'
+VERSION = 1
+# magic, version, record size, capacity, total records ever written
+HEADER = struct.Struct('<4sHHIQ')
+HEADER_SIZE = 64
+
+
+def default_ring_path() -> str:
+    if os.getuid() == 0:
+        return '/var/lib/myfetch/history.ring'
+    base = os.environ.get('XDG_DATA_HOME') or os.path.expanduser('~/.local/share')
+    return os.path.join(base, 'myfetch', 'history.ring')
+
+
+class RingFile:
+    """Fixed-size, memory-mapped ring of fixed-width binary records.
+
+    Disk usage is HEADER_SIZE + capacity * RECORD.size and never grows; once
+    full, the oldest record is overwritten. Records are written before the
+    header's write counter is bumped, so a crash loses at most one sample.
+    Queries binary-search the timestamps and only touch the records inside
+    the requested window.
+    """
+
+    def __init__(self, path: Optional[str] = None, capacity: int = 60480, writable: bool = False):
+        self.path = path or default_ring_path()
+        self.writable = writable
+        if writable and not os.path.exists(self.path):
+            self._create(capacity)
+
+        self._fd = os.open(self.path, os.O_RDWR if writable else os.O_RDONLY)
+        try:
+            header = os.pread(self._fd, HEADER.size, 0)
+            magic, version, record_size, self.capacity, _ = HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+                raise ValueError(f"{self.path} is not a myfetch history file (or has an incompatible format)")
+            length = HEADER_SIZE + self.capacity * RECORD.size
+            access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+            self._map = mmap.mmap(self._fd, length, access=access)
+        except Exception:
+            os.close(self._fd)
+            raise
+
+    def _create(self, capacity: int):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, capacity, 0).ljust(HEADER_SIZE, b'\0'))
+            f.truncate(HEADER_SIZE + capacity * RECORD.size)
+        os.replace(tmp, self.path)
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def written(self) -> int:
+        return HEADER.unpack_from(self._map, 0)[4]
+
+    def __len__(self) -> int:
+        return min(self.written, self.capacity)
+
+    def _offset(self, logical: int) -> int:
+        """Byte offset of the logical record index (0 = oldest retained)."""
+        written = self.written
+        first = written - len(self) if written > self.capacity else 0
+        return HEADER_SIZE + ((first + logical) % self.capacity) * RECORD.size
+
+    def append(self, values: Tuple):
+        written = self.written
+        RECORD.pack_into(self._map, HEADER_SIZE + (written % self.capacity) * RECORD.size, *values)
+        struct.pack_into('<Q', self._map, HEADER.size - 8, written + 1)
+
+    def record(self, logical: int) -> Tuple:
+        return RECORD.unpack_from(self._map, self._offset(logical))
+
+    def timestamp(self, logical: int) -> float:
+        return struct.unpack_from('<d', self._map, self._offset(logical))[0]
+
+    def bisect(self, ts: float) -> int:
+        """First logical index whose timestamp is >= ts."""
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.timestamp(mid) < ts:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def window(self, start: float, end: float) -> List[Tuple]:
+        return [self.record(i) for i in range(self.bisect(start), self.bisect(end))]
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[min(len(sorted_values), max(rank, 1)) - 1]
+
+
+def summarize(records: List[Tuple]) -> Dict[str, Dict[str, float]]:
+    """min/avg/max/p95 per field; net counters are converted to bytes/s between samples."""
+    series = {name: [] for name in FIELD_NAMES[1:] if not name.startswith('net_')}
+    series['net_rx_rate'] = []
+    series['net_tx_rate'] = []
+    prev = None
+    for rec in records:
+        row = dict(zip(FIELD_NAMES, rec))
+        for name in series:
+            value = row.get(name)
+            if value is not None and value == value:  # skip NaN
+                series[name].append(value)
+        if prev is not None and row['time'] > prev['time']:
+            dt = row['time'] - prev['time']
+            # Counters restart at boot: skip the sample instead of reporting a negative rate
+            if row['net_rx'] >= prev['net_rx'] and row['net_tx'] >= prev['net_tx']:
+                series['net_rx_rate'].append((row['net_rx'] - prev['net_rx']) / dt)
+                series['net_tx_rate'].append((row['net_tx'] - prev['net_tx']) / dt)
+        prev = row
+
+    summary = {}
+    for name, values in series.items():
+        if not values:
+            continue
+        ordered = sorted(values)
+        summary[name] = {
+            'min': ordered[0],
+            'avg': sum(ordered) / len(ordered),
+            'max': ordered[-1],
+            'p95': _percentile(ordered, 95),
+        }
+    return summary
+
+
+_DURATION = re.compile(r'^(\d+(?:\.\d+)?)\s*([smhdw])$')
+_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+
+def parse_time(text: str, now: datetime) -> datetime:
+    """Accepts 'HH:MM' (today, or yesterday if that is still in the future) or ISO 'YYYY-MM-DD[THH:MM]'."""
+    text = text.strip()
+    if re.match(r'^\d{1,2}:\d{2}$', text):
+        hour, minute = (int(x) for x in text.split(':'))
+        moment = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        return moment - timedelta(days=1) if moment > now else moment
+    for fmt in ('%Y-%m-%dT%H:%M', '%Y-%m-%d %H:%M', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid time '{text}'")
+
+
+def parse_window(spec: str, now: Optional[float] = None) -> Tuple[float, float]:
+    """'2h' -> the last two hours; '03:00..04:00' or ISO 'START..END' -> that range."""
+    now = time.time() if now is None else now
+    match = _DURATION.match(spec.strip())
+    if match:
+        return now - float(match.group(1)) * _UNITS[match.group(2)], now
+    if '..' in spec:
+        start_text, end_text = spec.split('..', 1)
+        ref = datetime.fromtimestamp(now)
+        start = parse_time(start_text, ref)
+        end = parse_time(end_text, ref) if end_text.strip() else ref
+        if end < start:
+            end += timedelta(days=1)
+        return start.timestamp(), end.timestamp()
+    raise ValueError(f"Invalid history window '{spec}' (use e.g. 2h, 30m, 03:00..04:00)")
@@ -0,0 +1,92 @@
+import importlib
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Entry point group third-party collectors register under, e.g. in their pyproject.toml:
+#   [project.entry-points."myfetch.collectors"]
+#   gpu = "myfetch_gpu:GpuModule"
+ENTRY_POINT_GROUP = 'myfetch.collectors'
+
+
+class ModuleSpec:
+    """A view selectable by a CLI flag, imported only when that flag is used."""
+
+    def __init__(self, name: str, module: str, class_name: str, help: str, uses_scheduler: bool = False):
+        self.name = name
+        self.module = module
+        self.class_name = class_name
+        self.help = help
+        self.uses_scheduler = uses_scheduler
+
+
+BUILTIN_MODULES = [
+    ModuleSpec('top', 'src.modules.performance', 'PerformanceModule', "Real-time performance monitoring"),
+    ModuleSpec('network', 'src.modules.network', 'NetworkModule', "Network analysis and status"),
+    ModuleSpec('health', 'src.modules.health', 'HealthModule', "System health and diagnostics", uses_scheduler=True),
+    ModuleSpec('storage', 'src.modules.storage', 'StorageModule', "Storage and filesystem details"),
+    ModuleSpec('security', 'src.modules.security', 'SecurityModule', "Security status summary", uses_scheduler=True),
+    ModuleSpec('services', 'src.modules.services', 'ServicesModule', "System services and boot performance", uses_scheduler=True),
+    ModuleSpec('cgroups', 'src.modules.cgroups', 'CgroupsModule', "cgroup v2 tree with CPU, memory, I/O and pressure per slice"),
+    ModuleSpec('packages', 'src.modules.packages', 'PackagesModule', "Installed packages with versions per package manager"),
+    ModuleSpec('hardware', 'src.modules.hardware', 'HardwareModule', "Deep hardware information", uses_scheduler=True),
+]
+
+
+class ModuleRegistry:
+    """Maps view names to module classes without importing them up front.
+
+    Built-in views are imported on first use; third-party views are looked up
+    through the `myfetch.collectors` entry point group only when a plugin is
+    actually requested, so the common path never pays for importlib.metadata.
+    Import durations are kept for --profile-startup.
+    """
+
+    def __init__(self, specs: Optional[List[ModuleSpec]] = None):
+        self.specs = {s.name: s for s in (specs or BUILTIN_MODULES)}
+        self.import_times = []  # type: List[Tuple[str, float]]
+        self._plugins = None  # type: Optional[Dict[str, Any]]
+
+    def names(self) -> List[str]:
+        return list(self.specs)
+
+    def load(self, name: str):
+        """Imports and returns the class of a built-in view."""
+        spec = self.specs[name]
+        start = time.perf_counter()
+        cls = getattr(importlib.import_module(spec.module), spec.class_name)
+        self.import_times.append((spec.module, time.perf_counter() - start))
+        return cls
+
+    def create(self, name: str, scanner, formatter, scheduler=None, **options):
+        """Instantiates a built-in view; `options` are view-specific flags (e.g. memory='pss')."""
+        cls = self.load(name)
+        if self.specs[name].uses_scheduler:
+            return cls(scanner, formatter, scheduler, **options)
+        return cls(scanner, formatter, **options)
+
+    def plugins(self) -> Dict[str, Any]:
+        """Entry points of installed third-party collectors, keyed by name."""
+        if self._plugins is None:
+            self._plugins = {}
+            try:
+                from importlib.metadata import entry_points
+            except ImportError:
+                return self._plugins
+            eps = entry_points()
+            if hasattr(eps, 'select'):
+                group = eps.select(group=ENTRY_POINT_GROUP)
+            else:
+                group = eps.get(ENTRY_POINT_GROUP, [])
+            for ep in group:
+                self._plugins[ep.name] = ep
+        return self._plugins
+
+    def create_plugin(self, name: str, scanner, formatter):
+        """Loads a third-party view. Plugins take (scanner, formatter) and provide collect()/render()."""
+        ep = self.plugins().get(name)
+        if ep is None:
+            raise KeyError(name)
+        start = time.perf_counter()
+        cls = ep.load()
+        self.import_times.append((f"plugin:{name}", time.perf_counter() - start))
+        return cls(scanner, formatter)
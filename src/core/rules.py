@@ -0,0 +1,493 @@
+import ast
+import re
+import sys
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.core.pressure import PRESSURE_THRESHOLDS, stall_percent
+
+SEVERITIES = ('warning', 'critical')  # alert levels 1 and 2
+_MISSING = object()
+
+_DURATION = re.compile(r'(\d+(?:\.\d+)?)(ms|s|m|h|d)')
+_DURATION_SECONDS = {'ms': 0.001, 's': 1.0, 'm': 60.0, 'h': 3600.0, 'd': 86400.0}
+
+# Functions callable from rule expressions; rate() is bound per engine
+FUNCTIONS = ('abs', 'min', 'max', 'round', 'rate')
+_BUILTINS = {'abs': abs, 'min': min, 'max': max, 'round': round}
+
+# Everything a rule expression may contain: arithmetic, comparisons, boolean logic,
+# conditionals, literals, names and calls to FUNCTIONS. No attributes, subscripts or lambdas.
+_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn,
+    ast.Is, ast.IsNot, ast.IfExp, ast.Name, ast.Load, ast.Call, ast.Tuple, ast.List,
+)
+# Python 3.6 and 3.7 parse literals to Num, Str and NameConstant rather than Constant
+_LITERALS = (ast.Constant,) if sys.version_info >= (3, 8) else (ast.Constant, ast.Num, ast.Str, ast.NameConstant)
+_ALLOWED_NODES += _LITERALS
+
+
+def _literal_value(node: ast.AST) -> Any:
+    if hasattr(node, 'value'):
+        return node.value  # Constant, NameConstant
+    return node.n if hasattr(node, 'n') else node.s
+
+
+# Built-in rules; a configured rule with the same name replaces one of these.
+# They reproduce the thresholds the views used before rules were configurable.
+DEFAULT_RULES = [
+    # The load average only counts when the kernel has no PSI (see get_health_verdict)
+    {'name': 'load', 'warning': "not has_psi and load1 > 2", 'critical': "not has_psi and load1 > 5",
+     'message': {'warning': "High system load", 'critical': "Critical system load"}},
+    {'name': 'memory', 'warning': "memory_percent > 75", 'critical': "memory_percent > 90",
+     'message': {'warning': "High memory usage", 'critical': "Critical memory usage"}},
+] + [
+    {'name': f"psi_{resource}_{kind}", 'warning': f"psi_{resource}_{kind} > {warning}",
+     'critical': f"psi_{resource}_{kind} > {critical}",
+     'message': f"{reason} ({{psi_{resource}_{kind}:.0f}}% stalled)"}
+    for resource, kind, warning, critical, reason in PRESSURE_THRESHOLDS
+] + [
+    # Temperatures hover around a threshold, so the alert only clears a few degrees below it
+    {'name': 'cpu_temperature',
+     'warning': "cpu_temp > 65 or (cpu_temp_max and cpu_temp >= cpu_temp_max)",
+     'critical': "cpu_temp > 80 or (cpu_temp_crit and cpu_temp >= cpu_temp_crit)",
+     'clear': {'warning': "cpu_temp <= 62", 'critical': "cpu_temp <= 77"},
+     'message': {'warning': "CPU temperature is high ({cpu_temp:.0f}°C)",
+                 'critical': "CPU is overheating ({cpu_temp:.0f}°C)"}},
+    {'name': 'sensor_limits', 'each': 'sensors',
+     'warning': "kind in ('temp', 'power') and max and value >= max",
+     'critical': "kind in ('temp', 'power') and crit and value >= crit",
+     'message': "{chip} {label} at {value:g}{unit}"},
+    {'name': 'thermal_throttling', 'warning': "throttle_events > 0",
+     'message': "CPU thermal throttling ({throttle_events} events)"},
+    {'name': 'failed_units', 'warning': "failed_units > 0", 'message': "{failed_units} failed systemd unit(s)"},
+    {'name': 'filesystem_usage', 'each': 'filesystems',
+     'warning': "percent is not None and percent > 80", 'critical': "percent is not None and percent > 90",
+     'message': "{mount} is {percent:.0f}% full"},
+    {'name': 'filesystem_unresponsive', 'each': 'filesystems', 'critical': "status == 'unresponsive'",
+     'message': "{mount} is not responding"},
+]
+
+
+class RuleError(ValueError):
+    """A rule in the configuration that cannot be compiled."""
+
+
+def parse_duration(value: Any) -> float:
+    """Seconds in a duration such as 30 (seconds), '90s', '5m' or '1h30m'."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).replace(' ', '')
+    if text.replace('.', '', 1).isdigit():
+        return float(text)
+    parts = _DURATION.findall(text)
+    if not parts or ''.join(n + u for n, u in parts) != text:
+        raise RuleError(f"invalid duration {value!r} (use e.g. '30s', '5m', '1h')")
+    return sum(float(n) * _DURATION_SECONDS[u] for n, u in parts)
+
+
+class _RateCalls(ast.NodeTransformer):
+    """Rewrites rate(x, '5m') to rate('x', 300.0) so the engine can look up x's history."""
+
+    def __init__(self, origin: str):
+        self.origin = origin
+        self.series = set()  # type: set
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        self.generic_visit(node)
+        if isinstance(node.func, ast.Name) and node.func.id == 'rate':
+            if not node.args or not isinstance(node.args[0], ast.Name) or len(node.args) > 2 or node.keywords:
+                raise RuleError(f"{self.origin}: rate() takes a fact name and an optional window, e.g. rate(load1, '5m')")
+            window = 60.0
+            if len(node.args) == 2:
+                literal = node.args[1]
+                if not isinstance(literal, _LITERALS):
+                    raise RuleError(f"{self.origin}: the rate() window must be a constant")
+                window = parse_duration(_literal_value(literal))
+            name = node.args[0].id
+            self.series.add(name)
+            node.args = [ast.copy_location(ast.Constant(name), node.args[0]), ast.copy_location(ast.Constant(window), node)]
+        return node
+
+
+class Expression:
+    """A rule expression, validated against a small grammar and compiled to bytecode once.
+
+    `names` are the facts it reads, which is what the engine uses to skip
+    rules whose inputs did not change; `series` are the facts it takes a
+    rate() of.
+    """
+
+    def __init__(self, source: str, origin: str):
+        self.source = source
+        try:
+            tree = ast.parse(str(source).strip(), mode='eval')
+        except SyntaxError as e:
+            raise RuleError(f"{origin}: {e.msg} in {source!r}") from None
+        names = set()
+        for node in ast.walk(tree):
+            if not isinstance(node, _ALLOWED_NODES):
+                raise RuleError(f"{origin}: {type(node).__name__} is not allowed in {source!r}")
+            if isinstance(node, ast.Call) and not (isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS):
+                raise RuleError(f"{origin}: only {', '.join(FUNCTIONS)} can be called in {source!r}")
+            if isinstance(node, ast.Name) and node.id not in FUNCTIONS:
+                names.add(node.id)
+        rates = _RateCalls(origin)
+        tree = ast.fix_missing_locations(rates.visit(tree))
+        self.names = frozenset(names)
+        self.series = frozenset(rates.series)
+        self.code = compile(tree, origin, 'eval')
+
+    def test(self, scope: Dict[str, Any], functions: Dict[str, Any]) -> bool:
+        """True when the expression holds; a missing fact or a None/zero operand counts as False."""
+        try:
+            return bool(eval(self.code, functions, scope))
+        except (NameError, TypeError, ArithmeticError, ValueError):
+            return False
+
+
+class _FormatScope(dict):
+    def __missing__(self, key: str) -> str:
+        return '?'
+
+
+class Rule:
+    """One configured rule: per-severity conditions plus 'for', 'clear' and 'each' options.
+
+        {"name": "memory", "warning": "memory_percent > 75", "critical": "memory_percent > 90",
+         "for": "5m", "clear": "memory_percent < 70", "message": "Memory at {memory_percent:.0f}%"}
+
+    "when" with "severity" is shorthand for a single-level rule. "for"
+    delays an alert until its condition has held that long. "clear" adds
+    hysteresis: a firing alert keeps its level until the clear condition
+    (one expression, or one per severity) holds. "each" evaluates the rule
+    once per item of a list fact (e.g. "filesystems"), with the item's
+    fields as names, and raises one alert per item.
+    """
+
+    def __init__(self, spec: Dict[str, Any]):
+        if not isinstance(spec, dict) or not spec.get('name'):
+            raise RuleError(f"every rule needs a name: {spec!r}")
+        self.name = str(spec['name'])
+        origin = f"rule '{self.name}'"
+        conditions = {}
+        if 'when' in spec:
+            severity = spec.get('severity', 'warning')
+            if severity not in SEVERITIES:
+                raise RuleError(f"{origin}: severity must be one of {', '.join(SEVERITIES)}")
+            conditions[severity] = spec['when']
+        for severity in SEVERITIES:
+            if severity in spec:
+                conditions[severity] = spec[severity]
+        if not conditions:
+            raise RuleError(f"{origin}: needs 'when', 'warning' or 'critical'")
+        # Level 2 (critical) is tested before level 1 (warning)
+        self.levels = [(SEVERITIES.index(s) + 1, Expression(e, f"{origin} {s}")) for s, e in conditions.items()]
+        self.levels.sort(key=lambda level: -level[0])
+
+        clear = spec.get('clear')
+        if isinstance(clear, dict):
+            self.clear = {SEVERITIES.index(s) + 1: Expression(e, f"{origin} clear") for s, e in clear.items()
+                          if s in SEVERITIES}
+        elif clear is not None:
+            expression = Expression(clear, f"{origin} clear")
+            self.clear = {level: expression for level in (1, 2)}
+        else:
+            self.clear = {}
+        self.hold = parse_duration(spec['for']) if spec.get('for') else 0.0
+        self.each = spec.get('each')
+        message = spec.get('message', self.name)
+        self.messages = message if isinstance(message, dict) else {s: message for s in SEVERITIES}
+
+        expressions = [e for _, e in self.levels] + list(self.clear.values())
+        self.inputs = frozenset().union(*(e.names for e in expressions)) | ({self.each} if self.each else set())
+        self.series = frozenset().union(*(e.series for e in expressions))
+
+    def level(self, scope: Dict[str, Any], functions: Dict[str, Any]) -> int:
+        for level, expression in self.levels:
+            if expression.test(scope, functions):
+                return level
+        return 0
+
+    def message(self, level: int, scope: Dict[str, Any]) -> str:
+        template = self.messages.get(SEVERITIES[level - 1], self.name)
+        try:
+            return str(template).format_map(_FormatScope(scope))
+        except (ValueError, TypeError, IndexError, AttributeError):
+            return str(template)
+
+
+class _State:
+    """Where one rule (or one item of an 'each' rule) stands between evaluations."""
+    __slots__ = ('raw', 'level', 'since', 'scope', 'item', 'active_since')
+
+    def __init__(self):
+        self.raw = 0        # level of the condition alone, before 'for' and 'clear'
+        self.level = 0      # level reported
+        self.since = {}     # type: Dict[int, float]  # when raw first reached each level
+        self.scope = {}     # type: Dict[str, Any]
+        self.item = None    # type: Optional[Dict[str, Any]]
+        self.active_since = None  # type: Optional[float]
+
+
+class RuleEngine:
+    """Evaluates compiled rules against facts, re-checking only the rules whose inputs changed.
+
+    Each call to evaluate() receives the current facts (flat names such as
+    'memory_percent', plus lists such as 'filesystems'). Facts are compared
+    with the previous call and only the rules indexed under a changed name
+    run their expressions; rules waiting out a 'for' duration just advance
+    their timers, and rules that use rate() run every time because their
+    value changes with time. Hundreds of rules over a handful of changed
+    facts cost a few dozen expression evaluations per tick.
+    """
+
+    def __init__(self, rules: Iterable[Rule]):
+        self.rules = list(rules)
+        self.by_input = {}  # type: Dict[str, List[int]]
+        for i, rule in enumerate(self.rules):
+            for name in rule.inputs:
+                self.by_input.setdefault(name, []).append(i)
+        self.volatile = [i for i, r in enumerate(self.rules) if r.series]
+        self.series = {name: deque() for r in self.rules for name in r.series}  # type: Dict[str, deque]
+        self.states = [{} for _ in self.rules]  # type: List[Dict[Any, _State]]
+        self.pending = set()  # type: set
+        self.facts = None  # type: Optional[Dict[str, Any]]
+        self.evaluations = 0  # expression evaluations, for --stats and the bench
+        self.functions = dict(_BUILTINS, rate=self.rate, __builtins__={})
+        self.now = 0.0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Tuple['RuleEngine', List[str]]:
+        """The built-in rules overlaid with config['rules']; invalid rules are skipped and reported."""
+        specs = {} if config.get('default_rules') is False else {r['name']: r for r in DEFAULT_RULES}
+        errors = []
+        for spec in config.get('rules') or []:
+            name = spec.get('name') if isinstance(spec, dict) else None
+            if name is not None and spec.get('disabled'):
+                specs.pop(name, None)  # {"name": "load", "disabled": true} turns a built-in rule off
+                continue
+            if name in specs and 'message' not in spec:
+                spec = dict(spec, message=specs[name].get('message', name))  # Retuned thresholds keep the wording
+            specs[name if name is not None else f"#{len(specs)}"] = spec
+        rules = []
+        for spec in specs.values():
+            try:
+                rules.append(Rule(spec))
+            except RuleError as e:
+                errors.append(str(e))
+        return cls(rules), errors
+
+    @classmethod
+    def default(cls) -> 'RuleEngine':
+        return cls(Rule(spec) for spec in DEFAULT_RULES)
+
+    def rate(self, name: str, window: float) -> Optional[float]:
+        """Change per second of a fact over the last `window` seconds (None until two samples exist).
+
+        The base is the newest sample at least `window` old, so sparse
+        samples (say, a 15s scrape against a 10s window) still give a rate.
+        """
+        history = self.series.get(name)
+        if not history or len(history) < 2:
+            return None
+        now, latest = history[-1]
+        t, value = history[0]
+        for sample in history:
+            if now - sample[0] < window:
+                break
+            t, value = sample
+        if now - t <= 0:
+            return None
+        try:
+            return (latest - value) / (now - t)
+        except TypeError:
+            return None
+
+    def _record(self, facts: Dict[str, Any], now: float):
+        """Keeps recent samples of the facts that rules take a rate() of."""
+        for name, history in self.series.items():
+            value = facts.get(name)
+            if isinstance(value, (int, float)):
+                history.append((now, value))
+            # An hour is the longest window worth keeping at one sample per second
+            while history and now - history[0][0] > 3600:
+                history.popleft()
+
+    def _advance(self, rule: Rule, state: _State, raw: int, now: float) -> int:
+        """Applies 'for' and 'clear' to a raw level and returns the level to report."""
+        state.raw = raw
+        if rule.hold:
+            for level in (1, 2):
+                if raw >= level:
+                    state.since.setdefault(level, now)
+                else:
+                    state.since.pop(level, None)
+            reached = [level for level, since in state.since.items() if now - since >= rule.hold]
+            level = max(reached) if reached else 0
+        else:
+            level = raw
+        # Hysteresis: step down only through levels whose clear condition holds
+        if level < state.level:
+            current = state.level
+            while current > level:
+                clear = rule.clear.get(current)
+                if clear is not None and not clear.test(state.scope, self.functions):
+                    break
+                current -= 1
+            level = current
+        if level and not state.level:
+            state.active_since = now
+        elif not level:
+            state.active_since = None
+        state.level = level
+        return level
+
+    def _waiting(self, rule: Rule, state: _State) -> bool:
+        """True while a 'for' timer is running for a level not reported yet."""
+        return bool(rule.hold) and any(level > state.level for level in state.since)
+
+    def _run(self, index: int, facts: Dict[str, Any], now: float):
+        rule = self.rules[index]
+        states = self.states[index]
+        waiting = False
+        if rule.each:
+            items = facts.get(rule.each) or []
+            seen = set()
+            for item in items:
+                key = item.get('id')
+                seen.add(key)
+                scope = dict(facts)
+                scope.update(item)
+                state = states.get(key)
+                if state is None:
+                    state = states[key] = _State()
+                state.scope, state.item = scope, item
+                self.evaluations += 1
+                self._advance(rule, state, rule.level(scope, self.functions), now)
+                waiting = waiting or self._waiting(rule, state)
+            for key in [k for k in states if k not in seen]:
+                del states[key]  # The item is gone (unmounted, unplugged)
+        else:
+            state = states.get(None)
+            if state is None:
+                state = states[None] = _State()
+            state.scope = facts
+            self.evaluations += 1
+            self._advance(rule, state, rule.level(facts, self.functions), now)
+            waiting = self._waiting(rule, state)
+        if waiting:
+            self.pending.add(index)
+        else:
+            self.pending.discard(index)
+
+    def evaluate(self, facts: Dict[str, Any], now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Updates every affected rule with the current facts and returns the active alerts."""
+        now = time.monotonic() if now is None else now
+        self.now = now
+        self._record(facts, now)
+        previous = self.facts
+        if previous is None:
+            dirty = set(range(len(self.rules)))
+        else:
+            changed = {k for k, v in facts.items() if previous.get(k, _MISSING) != v}
+            changed.update(k for k in previous if k not in facts)
+            dirty = set(self.volatile)
+            for name in changed:
+                dirty.update(self.by_input.get(name, ()))
+        self.facts = facts
+
+        for index in sorted(dirty):
+            self._run(index, facts, now)
+        # Unchanged inputs, but a 'for' timer may have run out since the last tick
+        for index in sorted(self.pending - dirty):
+            rule = self.rules[index]
+            for state in self.states[index].values():
+                self._advance(rule, state, state.raw, now)
+            if not any(self._waiting(rule, s) for s in self.states[index].values()):
+                self.pending.discard(index)
+        return self.alerts()
+
+    def alerts(self) -> List[Dict[str, Any]]:
+        """Active alerts in rule order; each carries the item it was raised for, if any."""
+        alerts = []
+        for rule, states in zip(self.rules, self.states):
+            for key, state in states.items():
+                if not state.level:
+                    continue
+                alerts.append({
+                    'rule': rule.name,
+                    'each': rule.each,
+                    'severity': SEVERITIES[state.level - 1],
+                    'message': rule.message(state.level, state.scope),
+                    'id': key,
+                    'item': state.item,
+                    'active_for': round(self.now - state.active_since, 3) if state.active_since is not None else 0.0,
+                })
+        return alerts
+
+
+def health_verdict(alerts: List[Dict[str, Any]], rules: Optional[Iterable[str]] = None) -> Tuple[str, List[str]]:
+    """('Healthy' | 'Warning' | 'Needs Attention', reasons) from active alerts, optionally of some rules only."""
+    if rules is not None:
+        rules = set(rules)
+        alerts = [a for a in alerts if a['rule'] in rules]
+    reasons = [a['message'] for a in alerts]
+    if any(a['severity'] == 'critical' for a in alerts):
+        return "Needs Attention", reasons
+    if alerts:
+        return "Warning", reasons
+    return "Healthy", reasons
+
+
+def alert_level(alerts: List[Dict[str, Any]], rule: str, item: Any = None) -> Optional[str]:
+    """Severity of a rule's alert (for an 'each' rule, the alert of one item), or None."""
+    for a in alerts:
+        if a['rule'] == rule and a['id'] == item:
+            return a['severity']
+    return None
+
+
+def item_level(alerts: List[Dict[str, Any]], each: str, item: Any) -> Optional[str]:
+    """Worst severity any 'each' rule over the `each` list raised for one item, or None."""
+    levels = [SEVERITIES.index(a['severity']) for a in alerts if a['each'] == each and a['id'] == item]
+    return SEVERITIES[max(levels)] if levels else None
+
+
+def health_facts(load: Optional[List[float]] = None, memory_percent: Optional[float] = None,
+                 pressure: Optional[Dict[str, Any]] = None, cpu_sensor: Optional[Dict[str, Any]] = None,
+                 cpu_temp: Optional[float] = None, sensors: Optional[List[Dict[str, Any]]] = None,
+                 throttle: Optional[Dict[str, Any]] = None, failed_units: Optional[List[Any]] = None,
+                 filesystems: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Flattens collector outputs into the names rules are written against.
+
+    Only what a view collected becomes a fact; rules reading a missing fact
+    simply do not fire, so one rule set serves every view.
+    """
+    facts = {}  # type: Dict[str, Any]
+    if load:
+        facts.update(zip(('load1', 'load5', 'load15'), load))
+    if memory_percent is not None:
+        facts['memory_percent'] = memory_percent
+    if pressure is not None:
+        facts['has_psi'] = bool(pressure)
+        for resource, kinds in pressure.items():
+            for kind, values in kinds.items():
+                facts[f"psi_{resource}_{kind}"] = stall_percent(values)
+    if cpu_sensor:
+        facts.update(cpu_temp=cpu_sensor['value'], cpu_temp_max=cpu_sensor['max'], cpu_temp_crit=cpu_sensor['crit'])
+    elif cpu_temp:
+        facts.update(cpu_temp=cpu_temp, cpu_temp_max=None, cpu_temp_crit=None)
+    if sensors is not None:
+        facts['sensors'] = [dict(s, id=f"{s['chip']}/{s['device'] or ''}/{s['label']}") for s in sensors]
+    if throttle and not throttle['since_boot']:
+        # Counts since boot say nothing about now; only events between samples are facts
+        facts['throttle_events'] = throttle['core_events'] + throttle['package_events']
+    if failed_units is not None:
+        facts['failed_units'] = len(failed_units)
+    if filesystems is not None:
+        facts['filesystems'] = [dict(fs, id=fs['mount']) for fs in filesystems]
+    return facts
@@ -1,19 +1,73 @@
 import os
-import re
-import time
 from typing import Dict, Any, List, Optional
+from src.core.cache import FactCache
 
 class Scanner:
-    """Core scanner to read system data directly from /proc and /sys."""
+    """Core scanner to read system data directly from /proc and /sys.
+
+    Every path is resolved against `root`, so the same code can inspect a
+    host from a container (root='/host') or a synthetic fixture tree used by
+    the benchmark suite. With a non-default root nothing is read from the
+    live kernel (netlink, statvfs of host paths), only from files.
+    """
+
+    # Files whose mtime changes whenever a package manager installs or removes something
+    PACKAGE_SOURCES = [
+        '/var/lib/dpkg/status',
+        '/var/lib/rpm',
+        '/var/lib/rpm/rpmdb.sqlite',
+        '/var/lib/rpm/Packages',
+        '/usr/lib/sysimage/rpm/rpmdb.sqlite',
+        '/usr/lib/sysimage/rpm/rpmdb.sqlite-wal',
+        '/var/lib/rpm/rpmdb.sqlite-wal',
+        '/var/lib/pacman/local',
+        '/var/lib/flatpak/app',
+        '/var/lib/snapd/snaps',
+    ]
+
+    def __init__(self, cache: Optional[FactCache] = None, root: str = '/'):
+        self.cache = cache
+        self.root = os.path.abspath(root)
+        self.proc_path = self.path('/proc')
+        self.sys_path = self.path('/sys')
+        self._sockets = None
+        self._cgroups = None
+        self._pressure = None
+        self._cpu_stats = None
+        self._disk_stats = None
+        self._mount_stat = None
+        self._systemd = None
+        self._ids = {}  # type: Dict[str, Any]
+        self._hwmon = None
+        self._throttle = None
+
+    @property
+    def is_live(self) -> bool:
+        """True when reading the running system rather than a mounted or synthetic tree."""
+        return self.root == '/'
+
+    def path(self, path: str) -> str:
+        """Maps an absolute system path (e.g. '/proc/meminfo') under the scanner root."""
+        if self.root == '/':
+            return path
+        return os.path.join(self.root, path.lstrip('/'))
+
+    def cached(self, key: str, compute, sources=(), ttl: Optional[float] = None, per_boot: bool = False):
+        """Runs compute() through the fact cache when one is configured."""
+        if self.cache is None:
+            return compute()
+        if self.root != '/':
+            key = f"{self.root}:{key}"
+        sources = [self.path(s) for s in sources]
+        return self.cache.get(key, compute, sources=sources, ttl=ttl, per_boot=per_boot)
 
     @staticmethod
     def is_root() -> bool:
         return os.getuid() == 0
 
-    @staticmethod
-    def read_file(path: str) -> str:
+    def read_file(self, path: str) -> str:
         try:
-            with open(path, 'r') as f:
+            with open(self.path(path), 'r') as f:
                 return f.read()
         except (IOError, OSError):
             return ""
@@ -26,9 +80,9 @@ class Scanner:
             parts = line.split(':')
             if len(parts) == 2:
                 name = parts[0].strip()
-                match = re.search(r'(\d+)', parts[1])
-                if match:
-                    meminfo[name] = int(match.group(1))
+                value = parts[1].split()
+                if value and value[0].isdigit():
+                    meminfo[name] = int(value[0])
         # Ensure consistent keys for calculation
         if 'MemAvailable' not in meminfo:
             # Fallback for older kernels
@@ -36,7 +90,15 @@ class Scanner:
         return meminfo
 
     def get_cpuinfo(self) -> Dict[str, Any]:
-        """Parses /proc/cpuinfo for basic CPU details."""
+        """CPU details, cached until the next reboot."""
+        return self.cached('cpuinfo', self._read_cpuinfo, per_boot=True)
+
+    def _read_cpuinfo(self) -> Dict[str, Any]:
+        """Parses /proc/cpuinfo for basic CPU details.
+
+        Only boot-invariant fields: the 'cpu MHz' line is one core's current
+        frequency and would be stale for the rest of the boot once cached.
+        """
         data = self.read_file('/proc/cpuinfo')
         cpuinfo = {}
         for line in data.splitlines():
@@ -48,8 +110,6 @@ class Scanner:
                 val = parts[1].strip()
                 if key == 'model name':
                     cpuinfo['model'] = val
-                elif key == 'cpu MHz':
-                    cpuinfo['mhz'] = val
                 elif key == 'cache size':
                     cpuinfo['cache'] = val
         
@@ -57,6 +117,23 @@ class Scanner:
         cpuinfo['cores'] = data.count('processor\t:')
         return cpuinfo
 
+    def get_cpu_topology(self) -> Dict[str, Any]:
+        """Sockets, cores and SMT siblings from sysfs, cached until the next reboot."""
+        from src.core.cpustat import read_cpu_topology
+        return self.cached('cpu_topology', lambda: read_cpu_topology(self.sys_path), per_boot=True)
+
+    @property
+    def cpu_stats(self) -> 'CpuSampler':
+        """Per-CPU /proc/stat sampler shared for the run (keeps the previous counters)."""
+        if self._cpu_stats is None:
+            from src.core.cpustat import CpuSampler
+            self._cpu_stats = CpuSampler(self.proc_path)
+        return self._cpu_stats
+
+    def get_cpu_usage(self) -> Dict[str, Any]:
+        """Per-CPU utilization; averages since boot on the first call, interval deltas afterwards."""
+        return self.cpu_stats.sample()
+
     def get_loadavg(self) -> List[float]:
         """Reads /proc/loadavg."""
         data = self.read_file('/proc/loadavg')
@@ -74,6 +151,10 @@ class Scanner:
         return 0.0
 
     def get_os_release(self) -> Dict[str, str]:
+        """OS release info, cached until /etc/os-release changes."""
+        return self.cached('os_release', self._read_os_release, sources=['/etc/os-release'])
+
+    def _read_os_release(self) -> Dict[str, str]:
         """Parses /etc/os-release."""
         data = self.read_file('/etc/os-release')
         info = {}
@@ -94,10 +175,10 @@ class Scanner:
     def get_battery_info(self) -> Optional[Dict[str, Any]]:
         """Reads battery info from /sys/class/power_supply/."""
         base_path = '/sys/class/power_supply'
-        if not os.path.exists(base_path):
+        if not os.path.exists(self.path(base_path)):
             return None
         
-        for supply in os.listdir(base_path):
+        for supply in os.listdir(self.path(base_path)):
             if supply.startswith('BAT'):
                 path = os.path.join(base_path, supply)
                 status = self.read_file(os.path.join(path, 'status')).strip()
@@ -112,170 +193,248 @@ class Scanner:
         return None
 
     def get_net_stats(self) -> Dict[str, Any]:
-        """Basic network status from /proc/net/dev."""
-        data = self.read_file('/proc/net/dev')
+        """Full per-interface counters from /proc/net/dev ('rx'/'tx' are the byte totals)."""
+        from src.core.netrate import NET_DEV_FIELDS, parse_net_dev
         stats = {}
-        for line in data.splitlines()[2:]:  # Skip headers
-            parts = line.split(':')
-            if len(parts) == 2:
-                iface = parts[0].strip()
-                if iface == 'lo': continue
-                metrics = parts[1].split()
-                stats[iface] = {
-                    'rx': int(metrics[0]),
-                    'tx': int(metrics[8])
-                }
+        for iface, values in parse_net_dev(self.read_file('/proc/net/dev')).items():
+            if iface == 'lo': continue
+            counters = dict(zip(NET_DEV_FIELDS, values))
+            counters['rx'] = counters['rx_bytes']
+            counters['tx'] = counters['tx_bytes']
+            stats[iface] = counters
         return stats
 
-    def get_top_processes(self, limit: int = 5) -> List[Dict[str, Any]]:
-        """Scans /proc/[pid]/stat for top processes."""
-        processes = []
-        pids = [d for d in os.listdir('/proc') if d.isdigit()]
-        try:
-            page_size = os.sysconf('SC_PAGE_SIZE')
-        except:
-            page_size = 4096
-        
-        for pid in pids:
-            try:
-                raw_stat = self.read_file(f'/proc/{pid}/stat')
-                if not raw_stat: continue
-                
-                # The name is between the first '(' and the last ')'
-                start = raw_stat.find('(')
-                end = raw_stat.rfind(')')
-                if start == -1 or end == -1: continue
-                
-                name = raw_stat[start + 1:end]
-                # The rest of the fields start AFTER the last ')'
-                rest = raw_stat[end + 2:].split()
-                
-                # rest[0] is state, so indices are shifted by 2 from the start of file
-                # Field 24 (RSS) is at index 21 in 'rest'
-                # rest indices: 0=state, 1=ppid, ..., 21=rss
-                rss_pages = int(rest[21])
-                rss_bytes = rss_pages * page_size
-                
-                processes.append({
-                    'pid': pid,
-                    'name': name,
-                    'mem_bytes': rss_bytes,
-                    'owner': os.stat(f'/proc/{pid}').st_uid if self.is_root() else None
-                })
-            except (IOError, IndexError, ValueError, OSError):
-                continue
-        
-        return sorted(processes, key=lambda x: x['mem_bytes'], reverse=True)[:limit]
+    def get_process_table(self) -> 'ProcessTable':
+        """Snapshot of all processes as a column-oriented ProcessTable."""
+        from src.core.proctable import ProcessTable
+        return ProcessTable(self.proc_path).refresh()
 
-    def get_ip_addresses(self) -> Dict[str, str]:
-        """Simple IP lookup (avoiding external commands if possible, but reading /proc/net/fib_trie is complex).
-        We'll use a small trick with socket to get primary IP if needed, or stick to basic for now.
-        """
-        import socket
-        ips = {}
-        try:
-            # Get primary IP
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.connect(("8.8.8.8", 80))
-            ips['primary'] = s.getsockname()[0]
-            s.close()
-        except:
-            ips['primary'] = "Disconnected"
+    def get_top_processes(self, limit: int = 5, column: str = 'rss') -> List[Dict[str, Any]]:
+        """Top processes by a process table column (rss by default)."""
+        table = self.get_process_table()
+        return table.top_rows(column, limit, with_owner=self.is_root())
+
+    def get_process_memory(self, limit: int = 10) -> Dict[str, Any]:
+        """PSS/USS/swap from smaps_rollup for the largest processes, aggregated by name and user."""
+        from src.core.smaps import MemoryAccounting
+        table = self.get_process_table()
+        rss = table.rss
+        candidates = [(table.pid[i], table.names[i], rss[i]) for i in range(len(table)) if rss[i]]
+        return MemoryAccounting(self.proc_path).inspect(candidates, limit)
+
+    @property
+    def sockets(self) -> 'SocketCollector':
+        """Socket collector shared for the run (keeps its inode -> PID map)."""
+        if self._sockets is None:
+            from src.core.sockets import SocketCollector
+            self._sockets = SocketCollector(self.proc_path)
+        return self._sockets
+
+    @property
+    def cgroups(self) -> 'CgroupCollector':
+        """cgroup v2 collector shared for the run (keeps the directory tree and previous counters)."""
+        if self._cgroups is None:
+            from src.core.cgroups import CgroupCollector
+            self._cgroups = CgroupCollector(self.sys_path)
+        return self._cgroups
+
+    def get_cgroups(self) -> 'CgroupCollector':
+        """Samples every cgroup; CPU% and I/O rates are available from the second call on."""
+        return self.cgroups.sample()
+
+    @property
+    def pressure(self) -> 'PressureSampler':
+        """PSI sampler shared for the run (keeps the previous stall totals)."""
+        if self._pressure is None:
+            from src.core.pressure import PressureSampler
+            self._pressure = PressureSampler(self.read_file)
+        return self._pressure
+
+    def get_pressure(self) -> Dict[str, Any]:
+        """System-wide PSI; stall rates from the `total` counters are added from the second call on."""
+        return self.pressure.sample()
+
+    def get_listening_ports(self) -> List[Dict[str, Any]]:
+        """Listening TCP / bound UDP sockets from /proc/net with owning processes."""
+        return self.sockets.listening()
+
+    def get_interfaces(self) -> List[Dict[str, Any]]:
+        """All interfaces with addresses, MTU, operstate and link speed (netlink, /proc, /sys)."""
+        return self._address_collector().interfaces()
+
+    def _address_collector(self) -> 'AddressCollector':
+        from src.core.netaddr import AddressCollector
+        # Netlink always describes the live kernel, so it is skipped for other roots
+        return AddressCollector(self.proc_path, self.sys_path, use_netlink=self.is_live)
+
+    def get_primary_address(self, interfaces: Optional[List[Dict[str, Any]]] = None) -> Optional[str]:
+        """Address of the default-route interface (else the first global one) under the scanner root."""
+        return self._address_collector().primary_address(interfaces)
+
+    def get_ip_addresses(self) -> Dict[str, Any]:
+        """Primary IP plus per-interface addresses, without opening any connection."""
+        interfaces = self.get_interfaces()
+        ips = {'primary': self.get_primary_address(interfaces) or "Disconnected"}
+        for iface in interfaces:
+            if iface['ipv4'] or iface['ipv6']:
+                ips[iface['name']] = iface['ipv4'] + iface['ipv6']
         return ips
 
-    def get_storage_info(self) -> List[Dict[str, Any]]:
-        """Parses /proc/mounts and uses os.statvfs for usage info."""
-        storage = []
-        data = self.read_file('/proc/mounts')
-        
-        # We only care about real physical disks usually
-        seen_mounts = set()
-        for line in data.splitlines():
-            parts = line.split()
-            if len(parts) < 3: continue
-            
-            device = parts[0]
-            mount_point = parts[1]
-            fs_type = parts[2]
-            
-            if not device.startswith('/dev/'): continue
-            if mount_point in seen_mounts: continue
-            
-            try:
-                st = os.statvfs(mount_point)
-                total = (st.f_blocks * st.f_frsize)
-                free = (st.f_bavail * st.f_frsize)
-                used = total - free
-                
-                storage.append({
-                    'device': device,
-                    'mount': mount_point,
-                    'type': fs_type,
-                    'total': total,
-                    'used': used,
-                    'percent': (used / total * 100) if total > 0 else 0
-                })
-                seen_mounts.add(mount_point)
-            except:
-                continue
-        return storage
+    @property
+    def mount_stat(self) -> 'MountStat':
+        """statvfs worker pool shared for the run (remembers mounts that are still hanging)."""
+        if self._mount_stat is None:
+            from src.core.mounts import MountStat
+            self._mount_stat = MountStat()
+        return self._mount_stat
+
+    def get_storage_info(self, include_remote: bool = False) -> List[Dict[str, Any]]:
+        """Capacity per filesystem from /proc/self/mountinfo, one row per major:minor.
+
+        statvfs runs on worker threads with a timeout, so a dead NFS or FUSE
+        mount is listed with status 'unresponsive' instead of hanging the
+        caller. Network, FUSE and overlay filesystems are only included with
+        include_remote.
+        """
+        from src.core.mounts import storage_info
+        return storage_info(self.read_file, self.path, self.mount_stat, include_remote)
+
+    @property
+    def disk_stats(self) -> 'DiskStatsSampler':
+        """/proc/diskstats sampler shared for the run (keeps the previous counters and sysfs lookups)."""
+        if self._disk_stats is None:
+            from src.core.diskstats import DiskStatsSampler
+            self._disk_stats = DiskStatsSampler(self.proc_path, self.sys_path)
+        return self._disk_stats
+
+    def get_disk_io(self) -> Dict[str, Any]:
+        """Per-device I/O; averages since boot on the first call, interval rates afterwards."""
+        return self.disk_stats.sample()
 
     def get_package_count(self) -> str:
-        """Heuristically counts installed packages from common package managers."""
-        counts = []
-        
-        # 1. Check for DPKG (Debian, Ubuntu)
-        if os.path.exists('/var/lib/dpkg/status'):
-            data = self.read_file('/var/lib/dpkg/status')
-            count = data.count('Status: install ok installed')
-            if count > 0: counts.append(f"{count} (dpkg)")
-            
-        # 2. Check for RPM (Fedora, RHEL, openSUSE)
-        # Reading RPM DB directly is hard, so we use a faster check if possible
-        if os.path.exists('/var/lib/rpm/Packages') or os.path.exists('/var/lib/rpm/rpmdb.sqlite'):
-            # Fallback to shell if we can't read it easily, but for now we'll just check existence
-            # and use a small subprocess trick since RPM is binary
-            import subprocess
-            try:
-                out = subprocess.check_output(['rpm', '-qa'], stderr=subprocess.DEVNULL).decode().count('\n')
-                if out > 0: counts.append(f"{out} (rpm)")
-            except:
-                pass
-
-        # 3. Check for Pacman (Arch, Manjaro)
-        if os.path.exists('/var/lib/pacman/local'):
-            try:
-                count = len(os.listdir('/var/lib/pacman/local'))
-                if count > 0: counts.append(f"{count} (pacman)")
-            except:
-                pass
-
-        # 4. Check for Flatpak
-        if os.path.exists('/var/lib/flatpak/app'):
-            try:
-                count = len(os.listdir('/var/lib/flatpak/app'))
-                if count > 0: counts.append(f"{count} (flatpak)")
-            except:
-                pass
-
-        # 5. Check for Snap
-        if os.path.exists('/var/lib/snapd/snaps'):
-            try:
-                count = len([f for f in os.listdir('/var/lib/snapd/snaps') if f.endswith('.snap')])
-                if count > 0: counts.append(f"{count} (snap)")
-            except:
-                pass
-
-        return ", ".join(counts) if counts else "Unknown"
+        """Package counts, cached until a package database changes."""
+        return self.cached('package_count', self._count_packages, sources=self.PACKAGE_SOURCES)
+
+    def _count_packages(self) -> str:
+        """Counts installed packages per package manager without spawning any process."""
+        from src.core.packages import PackageInventory
+        counts = PackageInventory(self.path).counts()
+        return ", ".join(f"{count} ({manager})" for manager, count in counts.items()) or "Unknown"
+
+    def get_packages(self) -> Dict[str, List[Any]]:
+        """{manager: [(name, version), ...]} for every package database found."""
+        from src.core.packages import PackageInventory
+        return PackageInventory(self.path).packages()
+
+    @property
+    def systemd(self) -> 'SystemdUnits':
+        """Unit states from one `systemctl list-units` call, shared within a collection pass."""
+        if self._systemd is None:
+            from src.core.systemd import SystemdUnits
+            self._systemd = SystemdUnits()
+        return self._systemd
+
+    def get_systemd_units(self) -> Optional[List[Dict[str, str]]]:
+        """Every systemd unit's load/active/sub state; None without a running systemd (or another root)."""
+        if not self.is_live:
+            return None
+        return self.systemd.units()
+
+    def get_failed_units(self) -> Optional[List[Dict[str, str]]]:
+        if not self.is_live:
+            return None
+        return self.systemd.failed()
+
+    def get_boot_analysis(self) -> Optional[Dict[str, Any]]:
+        """Per-unit start times and the critical chain from systemd-analyze."""
+        if not self.is_live:
+            return None
+        from src.core.systemd import boot_analysis
+        return boot_analysis(timeout=2.5)
+
+    def get_dmi(self) -> Dict[str, str]:
+        """System, board, BIOS and chassis strings from sysfs, cached until the next reboot."""
+        from src.core.hwinfo import read_dmi
+        return self.cached('dmi', lambda: read_dmi(self.sys_path), per_boot=True)
+
+    def ids_database(self, kind: str) -> Optional['IdsDatabase']:
+        """The system pci.ids or usb.ids; its offset index is cached until the file changes."""
+        if kind not in self._ids:
+            from src.core.hwids import IDS_PATHS, IdsDatabase, build_index
+            self._ids[kind] = None
+            for source in IDS_PATHS[kind]:
+                full = self.path(source)
+                if os.path.exists(full):
+                    index = self.cached(f'{kind}_ids', lambda: build_index(full), sources=[source])
+                    self._ids[kind] = IdsDatabase(full, index)
+                    break
+        return self._ids[kind]
+
+    def get_pci_devices(self) -> List[Dict[str, Any]]:
+        """PCI functions with vendor, device and class names.
+
+        Not cached: listing sysfs is cheap and catches hot-plugged functions,
+        and names go through the pci.ids offset index, which is invalidated
+        when pciutils/hwdata updates the file.
+        """
+        from src.core.hwinfo import list_pci_devices
+        db = self.ids_database('pci')
+        devices = list_pci_devices(self.sys_path)
+        for d in devices:
+            d['vendor'] = db.vendor(d['vendor_id']) if db else None
+            d['device'] = db.device(d['vendor_id'], d['device_id']) if db else None
+            d['class'] = db.device_class(d['class_id'], d['subclass_id']) if db else None
+        return devices
+
+    def get_usb_devices(self) -> List[Dict[str, Any]]:
+        """Connected USB devices; names the device does not report come from usb.ids."""
+        from src.core.hwinfo import list_usb_devices
+        devices = list_usb_devices(self.sys_path)
+        if any(not (d['manufacturer'] and d['product']) for d in devices):
+            db = self.ids_database('usb')
+            if db:
+                for d in devices:
+                    d['manufacturer'] = d['manufacturer'] or db.vendor(d['vendor_id'])
+                    d['product'] = d['product'] or db.device(d['vendor_id'], d['product_id'])
+        return devices
+
+    def get_virtualization(self) -> Dict[str, Optional[str]]:
+        """Hypervisor (from /sys/hypervisor and DMI) and container, cached until the next reboot."""
+        from src.core.hwinfo import detect_virtualization
+        return self.cached('virtualization', lambda: detect_virtualization(self.path, self.get_dmi()), per_boot=True)
+
+    @property
+    def hwmon(self) -> 'HwmonCollector':
+        """hwmon sensors, located once per run and then re-read from the remembered paths."""
+        if self._hwmon is None:
+            from src.core.hwmon import HwmonCollector
+            self._hwmon = HwmonCollector(self.sys_path)
+        return self._hwmon
+
+    def get_sensors(self) -> List[Dict[str, Any]]:
+        """Temperature, fan, voltage and power readings with labels and max/crit thresholds."""
+        return self.hwmon.read()
+
+    @property
+    def thermal_throttle(self) -> 'ThrottleSampler':
+        """Per-CPU thermal_throttle counters shared for the run (keeps the previous counts)."""
+        if self._throttle is None:
+            from src.core.hwmon import ThrottleSampler
+            self._throttle = ThrottleSampler(self.sys_path)
+        return self._throttle
+
+    def get_thermal_throttle(self) -> Optional[Dict[str, Any]]:
+        """Throttling events since boot on the first call, since the previous call afterwards."""
+        return self.thermal_throttle.sample()
 
     def get_temperatures(self) -> Dict[str, float]:
         """Reads from /sys/class/thermal/."""
         temps = {}
         base = '/sys/class/thermal'
-        if not os.path.exists(base):
+        if not os.path.exists(self.path(base)):
             return temps
             
-        for d in os.listdir(base):
+        for d in os.listdir(self.path(base)):
             if d.startswith('thermal_zone'):
                 try:
                     name = self.read_file(os.path.join(base, d, 'type')).strip()
@@ -0,0 +1,131 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class CollectorResults(dict):
+    """Collector values keyed by name, plus the set of names that ran out of time."""
+
+    def __init__(self):
+        super().__init__()
+        self.timed_out = set()
+        self.errors = {}
+        self.durations = {}  # seconds spent in each collector that finished
+
+    def is_timed_out(self, name: str) -> bool:
+        return name in self.timed_out
+
+
+class Collector:
+    def __init__(self, name: str, func: Callable[[], Any], timeout: float, default: Any = None):
+        self.name = name
+        self.func = func
+        self.timeout = timeout
+        self.default = default
+
+
+class CollectorScheduler:
+    """Runs independent collectors concurrently on a small pool of daemon threads.
+
+    Every collector has its own timeout (measured from when it starts running)
+    and the whole batch shares a global deadline. A collector that misses either
+    is reported in `CollectorResults.timed_out` and gets its default value, so a
+    hung `rpm -qa` or `statvfs` never blocks the output. Workers are daemon
+    threads so a stuck call cannot keep the process alive at exit.
+    """
+
+    def __init__(self, max_workers: int = 4, deadline: float = 3.0, default_timeout: float = 2.0):
+        self.max_workers = max_workers
+        self.deadline = deadline
+        self.default_timeout = default_timeout
+        self.groups = {}  # type: Dict[str, Dict[str, Collector]]
+        self.last_results = {}  # type: Dict[str, CollectorResults]
+        self.tracer = None  # set by --trace/--stats to record a span per collector
+
+    def register(self, name: str, func: Callable[[], Any], group: str = "default",
+                 timeout: Optional[float] = None, default: Any = None):
+        """Registers a collector under a group. Re-registering a name replaces it."""
+        if timeout is None:
+            timeout = self.default_timeout
+        self.groups.setdefault(group, {})[name] = Collector(name, func, timeout, default)
+
+    def run(self, group: str = "default", names: Optional[List[str]] = None) -> CollectorResults:
+        """Runs the collectors of a group and waits until all finish or time out."""
+        collectors = self.groups.get(group, {})
+        if names is not None:
+            collectors = {n: collectors[n] for n in names if n in collectors}
+
+        results = self.last_results[group] = CollectorResults()
+        if not collectors:
+            return results
+
+        jobs = queue.Queue()
+        done = queue.Queue()
+        started = {}
+        tracer = self.tracer
+        for c in collectors.values():
+            jobs.put(c)
+
+        def worker():
+            while True:
+                try:
+                    c = jobs.get_nowait()
+                except queue.Empty:
+                    return
+                start = started[c.name] = time.monotonic()
+                try:
+                    if tracer is not None:
+                        with tracer.span(f"{group}.{c.name}", 'collector'):
+                            value = c.func()
+                    else:
+                        value = c.func()
+                    results.durations[c.name] = time.monotonic() - start
+                    done.put((c.name, True, value))
+                except Exception as e:
+                    results.durations[c.name] = time.monotonic() - start
+                    done.put((c.name, False, e))
+
+        for _ in range(min(self.max_workers, len(collectors))):
+            threading.Thread(target=worker, name=f"collector-{group}", daemon=True).start()
+
+        end = time.monotonic() + self.deadline
+        pending = set(collectors)
+        while pending:
+            now = time.monotonic()
+            # Wake up at the earliest of the global deadline or a running collector's timeout
+            wake = end
+            for name in pending:
+                if name in started:
+                    wake = min(wake, started[name] + collectors[name].timeout)
+            if now >= end:
+                break
+            try:
+                name, ok, value = done.get(timeout=max(0.0, wake - now))
+                if name in pending:
+                    pending.discard(name)
+                    if ok:
+                        results[name] = value
+                    else:
+                        results.errors[name] = value
+                        results[name] = collectors[name].default
+            except queue.Empty:
+                pass
+
+            now = time.monotonic()
+            for name in list(pending):
+                if name in started and now - started[name] >= collectors[name].timeout:
+                    pending.discard(name)
+                    results.timed_out.add(name)
+                    results[name] = collectors[name].default
+
+        # Anything left missed the global deadline; drop queued jobs that never started
+        for name in pending:
+            results.timed_out.add(name)
+            results[name] = collectors[name].default
+        while True:
+            try:
+                jobs.get_nowait()
+            except queue.Empty:
+                break
+        return results
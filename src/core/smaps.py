@@ -0,0 +1,130 @@
+import heapq
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+# smaps_rollup fields we keep (values are in kB)
+ROLLUP_FIELDS = {
+    b'Rss': 'rss',
+    b'Pss': 'pss',
+    b'Private_Clean': 'private_clean',
+    b'Private_Dirty': 'private_dirty',
+    b'Swap': 'swap',
+    b'SwapPss': 'swap_pss',
+}
+
+# (pid, name, rss bytes) of a process that may be inspected
+Candidate = Tuple[int, str, int]
+
+
+def parse_smaps_rollup(raw: bytes) -> Dict[str, int]:
+    """Parses /proc/[pid]/smaps_rollup into bytes, with 'uss' = private clean + dirty."""
+    values = {}
+    for line in raw.split(b'\n')[1:]:
+        key, sep, rest = line.partition(b':')
+        name = ROLLUP_FIELDS.get(key)
+        if name is None or not sep:
+            continue
+        try:
+            values[name] = int(rest.split()[0]) * 1024
+        except (IndexError, ValueError):
+            continue
+    values['uss'] = values.pop('private_clean', 0) + values.pop('private_dirty', 0)
+    return values
+
+
+class MemoryAccounting:
+    """PSS/USS/swap per process from /proc/[pid]/smaps_rollup.
+
+    smaps_rollup walks every mapping of a process under its mmap lock, so it
+    costs far more than /proc/[pid]/stat. Only the largest processes by RSS
+    are inspected (PSS can never exceed RSS, so small-RSS processes cannot
+    make the top list), and the reads run on a thread pool since the kernel
+    work happens outside the GIL. If the smallest PSS in the top list is
+    still below the RSS of the next uninspected process, another batch is
+    read so the top list stays exact.
+    """
+
+    def __init__(self, proc_path: str = '/proc', max_workers: int = 8, candidates: int = 256):
+        self.proc_path = proc_path
+        self.max_workers = max_workers
+        self.candidates = candidates
+
+    def _read(self, pid: int) -> Optional[Dict[str, int]]:
+        try:
+            fd = os.open(f'{self.proc_path}/{pid}/smaps_rollup', os.O_RDONLY)
+        except OSError:
+            # Gone, kernel thread, or not ours to inspect (needs ptrace access)
+            return None
+        try:
+            raw = os.read(fd, 4096)
+            # The file is owned by the process' effective UID, so the owner comes for free
+            uid = os.fstat(fd).st_uid
+        except OSError:
+            return None
+        finally:
+            os.close(fd)
+        if not raw:
+            return None
+        values = parse_smaps_rollup(raw)
+        values['owner'] = uid
+        return values
+
+    def read_many(self, pids: List[int]) -> List[Optional[Dict[str, int]]]:
+        """smaps_rollup for each PID, in order, read in parallel."""
+        if len(pids) < 16 or self.max_workers <= 1:
+            return [self._read(pid) for pid in pids]
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='smaps') as pool:
+            return list(pool.map(self._read, pids, chunksize=8))
+
+    def inspect(self, candidates: List[Candidate], limit: int = 10) -> Dict[str, Any]:
+        """Reads candidates (largest RSS first) in batches and aggregates the results."""
+        candidates = sorted(candidates, key=lambda c: -c[2])
+        processes = []
+        unreadable = 0
+        inspected = 0
+        while inspected < len(candidates):
+            batch = candidates[inspected:inspected + self.candidates]
+            inspected += len(batch)
+            for (pid, name, rss), values in zip(batch, self.read_many([c[0] for c in batch])):
+                if values is None:
+                    unreadable += 1
+                    continue
+                values.update(pid=pid, name=name)
+                values.setdefault('rss', rss)
+                processes.append(values)
+            if inspected >= len(candidates):
+                break
+            if len(processes) >= limit:
+                kth = heapq.nlargest(limit, (p.get('pss', 0) for p in processes))[-1]
+                if kth >= candidates[inspected][2]:
+                    break
+
+        uninspected_rss = sum(c[2] for c in candidates[inspected:])
+        return {
+            'processes': heapq.nlargest(limit, processes, key=lambda p: p.get('pss', 0)),
+            'by_name': self.aggregate(processes, 'name'),
+            'by_user': self.aggregate(processes, 'owner'),
+            'total_pss': sum(p.get('pss', 0) for p in processes),
+            'total_uss': sum(p['uss'] for p in processes),
+            'total_swap': sum(p.get('swap', 0) for p in processes),
+            'inspected': inspected - unreadable,
+            'unreadable': unreadable,
+            'uninspected': len(candidates) - inspected,
+            'uninspected_rss': uninspected_rss,
+        }
+
+    @staticmethod
+    def aggregate(processes: List[Dict[str, Any]], key: str) -> List[Dict[str, Any]]:
+        """Sums PSS/USS/swap per process name or owner, largest PSS first."""
+        groups = {}
+        for p in processes:
+            g = groups.get(p[key])
+            if g is None:
+                g = groups[p[key]] = {key: p[key], 'count': 0, 'rss': 0, 'pss': 0, 'uss': 0, 'swap': 0}
+            g['count'] += 1
+            g['rss'] += p.get('rss', 0)
+            g['pss'] += p.get('pss', 0)
+            g['uss'] += p['uss']
+            g['swap'] += p.get('swap', 0)
+        return sorted(groups.values(), key=lambda g: -g['pss'])
@@ -0,0 +1,185 @@
+import os
+import socket
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+TCP_STATES = {
+    '01': 'ESTABLISHED',
+    '02': 'SYN_SENT',
+    '03': 'SYN_RECV',
+    '04': 'FIN_WAIT1',
+    '05': 'FIN_WAIT2',
+    '06': 'TIME_WAIT',
+    '07': 'CLOSE',
+    '08': 'CLOSE_WAIT',
+    '09': 'LAST_ACK',
+    '0A': 'LISTEN',
+    '0B': 'CLOSING',
+    '0C': 'NEW_SYN_RECV',
+}
+
+# /proc/net/unix "Flags" bit set on sockets that called listen()
+UNIX_ACCEPTCON = 0x10000
+
+
+def decode_address(hex_addr: str) -> Tuple[str, int]:
+    """Decodes a /proc/net/{tcp,udp}[6] 'ADDR:PORT' field.
+
+    Addresses are printed as 32-bit words in host (little-endian) order,
+    so each 4-byte group has to be reversed before inet_ntop.
+    """
+    addr, port = hex_addr.split(':')
+    raw = bytes.fromhex(addr)
+    packed = b"".join(raw[i:i + 4][::-1] for i in range(0, len(raw), 4))
+    family = socket.AF_INET if len(packed) == 4 else socket.AF_INET6
+    return socket.inet_ntop(family, packed), int(port, 16)
+
+
+class SocketCollector:
+    """Pure-/proc socket inventory (no `ss`/`netstat` required).
+
+    The inode -> PID map comes from a single walk of /proc/*/fd that stops as
+    soon as every wanted inode is found, and is cached for the lifetime of
+    the collector (one run).
+    """
+
+    INET_TABLES = ('tcp', 'tcp6', 'udp', 'udp6')
+
+    def __init__(self, proc_path: str = '/proc'):
+        self.proc_path = proc_path
+        self._owners = {}  # type: Dict[int, Tuple[int, str]]
+        self._owners_complete = False
+
+    def _lines(self, table: str) -> List[str]:
+        try:
+            with open(os.path.join(self.proc_path, 'net', table), 'r') as f:
+                return f.read().splitlines()[1:]
+        except (IOError, OSError):
+            return []
+
+    def inet_sockets(self, tables: Iterable[str] = INET_TABLES, listening_only: bool = False) -> List[Dict[str, Any]]:
+        """Parses the TCP/UDP tables. UDP sockets in state CLOSE are reported as UNCONN (bound)."""
+        sockets = []
+        for table in tables:
+            is_tcp = table.startswith('tcp')
+            for line in self._lines(table):
+                parts = line.split()
+                if len(parts) < 10:
+                    continue
+                st = parts[3]
+                # Filter on the raw state before paying for address decoding
+                if listening_only and st != ('0A' if is_tcp else '07'):
+                    continue
+                try:
+                    local_ip, local_port = decode_address(parts[1])
+                    remote_ip, remote_port = decode_address(parts[2])
+                    inode = int(parts[9])
+                    uid = int(parts[7])
+                except (ValueError, OSError):
+                    continue
+                state = TCP_STATES.get(st, st) if is_tcp else ('UNCONN' if st == '07' else TCP_STATES.get(st, st))
+                sockets.append({
+                    'proto': table,
+                    'local': local_ip,
+                    'port': local_port,
+                    'remote': remote_ip,
+                    'remote_port': remote_port,
+                    'state': state,
+                    'uid': uid,
+                    'inode': inode,
+                })
+        return sockets
+
+    def unix_sockets(self, listening_only: bool = False) -> List[Dict[str, Any]]:
+        sockets = []
+        for line in self._lines('unix'):
+            parts = line.split()
+            if len(parts) < 7:
+                continue
+            try:
+                flags = int(parts[3], 16)
+                inode = int(parts[6])
+            except ValueError:
+                continue
+            listening = bool(flags & UNIX_ACCEPTCON)
+            if listening_only and not listening:
+                continue
+            sockets.append({
+                'proto': 'unix',
+                'path': parts[7] if len(parts) > 7 else '',
+                'state': 'LISTEN' if listening else 'CONNECTED' if parts[5] == '03' else 'UNCONN',
+                'inode': inode,
+            })
+        return sockets
+
+    def inode_owners(self, wanted: Optional[Iterable[int]] = None) -> Dict[int, Tuple[int, str]]:
+        """Maps socket inodes to (pid, process name) by scanning /proc/*/fd once.
+
+        Only sockets of processes we may inspect are resolved (all of them as root).
+        """
+        wanted = set(wanted) if wanted is not None else None
+        if self._owners_complete or (wanted is not None and wanted <= self._owners.keys()):
+            return self._owners
+
+        missing = (wanted - self._owners.keys()) if wanted is not None else None
+        try:
+            entries = os.scandir(self.proc_path)
+        except OSError:
+            return self._owners
+        with entries:
+            for entry in entries:
+                if not entry.name.isdigit():
+                    continue
+                fd_dir = f'{self.proc_path}/{entry.name}/fd'
+                try:
+                    fds = os.listdir(fd_dir)
+                except OSError:
+                    continue
+                name = None
+                for fd in fds:
+                    try:
+                        target = os.readlink(f'{fd_dir}/{fd}')
+                    except OSError:
+                        continue
+                    if not target.startswith('socket:['):
+                        continue
+                    inode = int(target[8:-1])
+                    if inode in self._owners:
+                        continue
+                    if name is None:
+                        try:
+                            with open(f'{self.proc_path}/{entry.name}/comm', 'r') as f:
+                                name = f.read().strip()
+                        except (IOError, OSError):
+                            name = '?'
+                    self._owners[inode] = (int(entry.name), name)
+                    if missing is not None:
+                        missing.discard(inode)
+                if missing is not None and not missing:
+                    return self._owners
+        self._owners_complete = True
+        return self._owners
+
+    def listening(self, include_unix: bool = False) -> List[Dict[str, Any]]:
+        """Listening TCP and bound UDP sockets, with owning PID/program where visible."""
+        sockets = self.inet_sockets(listening_only=True)
+        if include_unix:
+            sockets += self.unix_sockets(listening_only=True)
+        owners = self.inode_owners(s['inode'] for s in sockets if s['inode'])
+        for s in sockets:
+            pid, name = owners.get(s['inode'], (None, None))
+            s['pid'] = pid
+            s['program'] = name
+        sockets.sort(key=lambda s: (s['proto'], s.get('port', 0)))
+        return sockets
+
+    def state_counts(self) -> Dict[str, int]:
+        """Counts TCP sockets per state (cheap summary for hosts with many connections)."""
+        counts = {}
+        for table in ('tcp', 'tcp6'):
+            for line in self._lines(table):
+                parts = line.split(None, 4)
+                if len(parts) < 4:
+                    continue
+                state = TCP_STATES.get(parts[3], parts[3])
+                counts[state] = counts.get(state, 0) + 1
+        return counts
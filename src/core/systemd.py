@@ -0,0 +1,193 @@
+import json
+import re
+import subprocess
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# "1min 2.345s", "345ms", "1h 2min 3.5s", as printed by systemd-analyze
+_TIMESPAN = re.compile(r'(\d+(?:\.\d+)?)(h|min|ms|us|µs|s)')
+_SPAN_SECONDS = {'h': 3600.0, 'min': 60.0, 's': 1.0, 'ms': 1e-3, 'us': 1e-6, 'µs': 1e-6}
+# "  └─docker.service @6.531s +1.853s" in critical-chain output
+_CHAIN_LINE = re.compile(r'^(?P<indent>[\s│├└─]*)(?P<unit>\S+\.\w+)'
+                         r'(?: @(?P<at>[^+]+?))?(?: \+(?P<took>.+?))?\s*$')
+
+
+def parse_timespan(text: str) -> Optional[float]:
+    """Seconds in a systemd timespan such as '1min 2.345s'; None if there is none."""
+    parts = _TIMESPAN.findall(text)
+    if not parts:
+        return None
+    return sum(float(value) * _SPAN_SECONDS[unit] for value, unit in parts)
+
+
+def parse_units_json(text: str) -> List[Dict[str, str]]:
+    """`systemctl list-units --output=json` (systemd 246+)."""
+    return [{'unit': u.get('unit', ''), 'load': u.get('load', ''), 'active': u.get('active', ''),
+             'sub': u.get('sub', ''), 'description': u.get('description', '')}
+            for u in json.loads(text)]
+
+
+def parse_units_plain(text: str) -> List[Dict[str, str]]:
+    """`systemctl list-units --plain --no-legend --full`: UNIT LOAD ACTIVE SUB DESCRIPTION."""
+    units = []
+    for line in text.splitlines():
+        fields = line.split(None, 4)
+        if len(fields) < 4:
+            continue
+        units.append({'unit': fields[0], 'load': fields[1], 'active': fields[2], 'sub': fields[3],
+                      'description': fields[4] if len(fields) > 4 else ''})
+    return units
+
+
+def parse_blame(text: str) -> List[Dict[str, Any]]:
+    """`systemd-analyze blame`: time each unit took to start, slowest first."""
+    blame = []
+    for line in text.splitlines():
+        span, _, unit = line.strip().rpartition(' ')
+        seconds = parse_timespan(span)
+        if seconds is not None and unit:
+            blame.append({'unit': unit, 'seconds': seconds})
+    return blame
+
+
+def parse_critical_chain(text: str) -> List[Dict[str, Any]]:
+    """`systemd-analyze critical-chain`: the chain of units the default target waited on.
+
+    'at' is when the unit became active and 'took' how long it took to
+    start, both in seconds since userspace started; the first entry is the
+    default target, so its 'at' is the userspace boot time.
+    """
+    chain = []
+    for line in text.splitlines():
+        m = _CHAIN_LINE.match(line)
+        if not m or not (m.group('at') or m.group('took')):
+            continue  # The explanatory header lines
+        chain.append({
+            'unit': m.group('unit'),
+            'depth': len(m.group('indent')) // 2,
+            'at': parse_timespan(m.group('at') or ''),
+            'took': parse_timespan(m.group('took') or ''),
+        })
+    return chain
+
+
+class SystemdUnits:
+    """Load/active/sub state of every unit from a single `systemctl list-units` call.
+
+    The result is memoized until expire() or a refresh. Views expire it at
+    the start of each collection pass, so every collector of a pass shares
+    one list instead of each forking its own `systemctl --state=...` or
+    `is-active`, while --watch still sees units fail and recover.
+    Concurrent callers wait for the one call in flight. JSON output is
+    preferred; systemd older than 246 rejects it once and the plain table
+    is used from then on.
+    """
+
+    def __init__(self, timeout: float = 5.0):
+        self.timeout = timeout
+        self.json = True
+        self.lock = threading.Lock()
+        self._units = None  # type: Optional[List[Dict[str, str]]]
+        self._fetched = False
+
+    def _list_units(self) -> Optional[List[Dict[str, str]]]:
+        base = ['systemctl', 'list-units', '--all', '--no-pager', '--full']
+        try:
+            if self.json:
+                proc = subprocess.run(base + ['--output=json'], stdout=subprocess.PIPE,
+                                      stderr=subprocess.PIPE, timeout=self.timeout)
+                if proc.returncode == 0:
+                    try:
+                        return parse_units_json(proc.stdout.decode())
+                    except ValueError:
+                        pass
+                if b'output' not in proc.stderr.lower():
+                    return None  # Not running under systemd; plain output would fail the same way
+                self.json = False  # "Unknown output 'json'."
+            proc = subprocess.run(base + ['--plain', '--no-legend'], stdout=subprocess.PIPE,
+                                  stderr=subprocess.DEVNULL, timeout=self.timeout)
+        except (OSError, subprocess.SubprocessError):
+            return None
+        if proc.returncode != 0:
+            return None
+        return parse_units_plain(proc.stdout.decode(errors='replace'))
+
+    def units(self, refresh: bool = False) -> Optional[List[Dict[str, str]]]:
+        """Every loaded unit, or None when systemd is not running or did not answer."""
+        with self.lock:
+            if refresh or not self._fetched:
+                self._units = self._list_units()
+                self._fetched = True
+            return self._units
+
+    def expire(self):
+        """Makes the next units() call fetch again; views call this once per collection pass."""
+        with self.lock:
+            self._fetched = False
+
+    def failed(self, refresh: bool = False) -> Optional[List[Dict[str, str]]]:
+        units = self.units(refresh)
+        return None if units is None else [u for u in units if u['active'] == 'failed']
+
+    def running_services(self) -> Optional[List[Dict[str, str]]]:
+        units = self.units()
+        return None if units is None else [u for u in units
+                                           if u['unit'].endswith('.service') and u['sub'] == 'running']
+
+    def state(self, *names: str) -> Optional[str]:
+        """Active state of the first of `names` that is loaded ('inactive' if none is)."""
+        units = self.units()
+        if units is None:
+            return None
+        wanted = {n if '.' in n else f"{n}.service" for n in names}
+        for u in units:
+            if u['unit'] in wanted and u['load'] == 'loaded':
+                return u['active']
+        return 'inactive'
+
+
+def boot_analysis(timeout: float = 5.0) -> Optional[Dict[str, Any]]:
+    """`systemd-analyze blame` and `critical-chain`, run concurrently under one timeout.
+
+    Either command may be slow on a busy bus; whichever has not answered by
+    the deadline is killed and its part is left empty. Returns None when
+    systemd-analyze is missing or neither command produced anything.
+    """
+    commands = {
+        'blame': ['systemd-analyze', 'blame', '--no-pager'],
+        'critical_chain': ['systemd-analyze', 'critical-chain', '--no-pager'],
+    }
+    procs = {}
+    for name, argv in commands.items():
+        try:
+            procs[name] = subprocess.Popen(argv, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        except OSError:
+            pass
+    if not procs:
+        return None
+
+    deadline = time.monotonic() + timeout
+    output = {}
+    timed_out = []
+    for name, proc in procs.items():
+        try:
+            out, _ = proc.communicate(timeout=max(0.0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            timed_out.append(name)
+            continue
+        if proc.returncode == 0:
+            output[name] = out.decode(errors='replace')
+
+    blame = parse_blame(output.get('blame', ''))
+    chain = parse_critical_chain(output.get('critical_chain', ''))
+    if not blame and not chain and not timed_out:
+        return None
+    return {
+        'blame': blame,
+        'critical_chain': chain,
+        'userspace_time': chain[0]['at'] if chain else None,
+        'timed_out': timed_out,
+    }
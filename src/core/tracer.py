@@ -0,0 +1,209 @@
+import builtins
+import json
+import os
+import subprocess
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+class _Counters(threading.local):
+    """Cumulative per-thread counters; spans record deltas so nesting stays inclusive."""
+    files = 0
+    procs = 0
+    probe = 0  # bytes read by _thread_read_bytes itself, excluded from spans
+
+
+def _thread_read_bytes(counters: _Counters) -> int:
+    """Bytes read by the calling thread (rchar in /proc/thread-self/io), 0 where unavailable."""
+    try:
+        fd = _real_os_open('/proc/thread-self/io', os.O_RDONLY)
+    except OSError:
+        return 0
+    try:
+        data = os.read(fd, 512)
+    except OSError:
+        return 0
+    finally:
+        os.close(fd)
+    counters.probe += len(data)
+    # First line is "rchar: N"
+    line = data.split(b'\n', 1)[0]
+    try:
+        return int(line.split(b':')[1])
+    except (IndexError, ValueError):
+        return 0
+
+
+_real_open = builtins.open
+_real_os_open = os.open
+_real_run = subprocess.run
+_real_popen_init = subprocess.Popen.__init__
+
+
+class Span:
+    """Times one call and attributes the files, bytes and child processes it caused."""
+    __slots__ = ('tracer', 'name', 'cat', 'args', 'start', 'files', 'procs', 'read', 'probe')
+
+    def __init__(self, tracer: 'Tracer', name: str, cat: str, args: Optional[Dict[str, Any]] = None):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        counters = self.tracer.counters
+        self.files = counters.files
+        self.procs = counters.procs
+        self.probe = counters.probe
+        self.read = _thread_read_bytes(counters)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        counters = self.tracer.counters
+        probes = counters.probe - self.probe
+        args = dict(self.args) if self.args else {}
+        args['bytes'] = max(0, _thread_read_bytes(counters) - self.read - probes)
+        args['files'] = counters.files - self.files
+        args['procs'] = counters.procs - self.procs
+        if exc_type is not None:
+            args['error'] = exc_type.__name__
+        self.tracer.record(self.name, self.cat, self.start, end - self.start, args)
+        return False
+
+
+class Tracer:
+    """Records spans around Scanner reads, collectors and subprocess calls.
+
+    Nothing is patched until install(): it wraps builtins.open/os.open to
+    count files, subprocess.Popen to count children and subprocess.run (which
+    check_output goes through) to time each command. instrument() wraps a
+    Scanner's read_file and get_* methods on that instance only. Events can
+    be exported in the Chrome trace-event format (chrome://tracing, Perfetto)
+    or summarized per span name.
+    """
+
+    def __init__(self):
+        self.counters = _Counters()
+        self.events = []  # type: List[Dict[str, Any]]
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        self.thread_names = {}  # type: Dict[int, str]
+        self.installed = False
+
+    def span(self, name: str, cat: str = 'function', args: Optional[Dict[str, Any]] = None) -> Span:
+        return Span(self, name, cat, args)
+
+    def record(self, name: str, cat: str, start: float, duration: float, args: Dict[str, Any]):
+        tid = threading.get_ident()
+        event = {
+            'name': name,
+            'cat': cat,
+            'ph': 'X',
+            'ts': (start - self.origin) * 1e6,
+            'dur': duration * 1e6,
+            'pid': self.pid,
+            'tid': tid,
+            'args': args,
+        }
+        with self.lock:
+            self.events.append(event)
+            if tid not in self.thread_names:
+                # Scheduler workers are gone by export time, so remember names now
+                self.thread_names[tid] = threading.current_thread().name
+
+    def install(self):
+        """Patches the process-wide hooks. Only used for --trace/--stats runs."""
+        if self.installed:
+            return
+        tracer = self
+        counters = self.counters
+
+        def traced_open(*args, **kwargs):
+            counters.files += 1
+            return _real_open(*args, **kwargs)
+
+        def traced_os_open(*args, **kwargs):
+            counters.files += 1
+            return _real_os_open(*args, **kwargs)
+
+        def traced_popen_init(popen, *args, **kwargs):
+            counters.procs += 1
+            return _real_popen_init(popen, *args, **kwargs)
+
+        def traced_run(*args, **kwargs):
+            cmd = args[0] if args else kwargs.get('args')
+            argv = cmd if isinstance(cmd, (list, tuple)) else [str(cmd)]
+            with tracer.span(f"exec {os.path.basename(str(argv[0]))}", 'subprocess', {'argv': ' '.join(map(str, argv))}):
+                return _real_run(*args, **kwargs)
+
+        builtins.open = traced_open
+        os.open = traced_os_open
+        subprocess.Popen.__init__ = traced_popen_init
+        subprocess.run = traced_run
+        self.installed = True
+
+    def uninstall(self):
+        if not self.installed:
+            return
+        builtins.open = _real_open
+        os.open = _real_os_open
+        subprocess.Popen.__init__ = _real_popen_init
+        subprocess.run = _real_run
+        self.installed = False
+
+    def wrap(self, func, name: str, cat: str):
+        tracer = self
+
+        def traced(*args, **kwargs):
+            with tracer.span(name, cat):
+                return func(*args, **kwargs)
+        traced.__name__ = getattr(func, '__name__', name)
+        traced.__doc__ = getattr(func, '__doc__', None)
+        return traced
+
+    def instrument(self, scanner):
+        """Wraps read_file and every get_* method of one Scanner instance."""
+        tracer = self
+        read_file = scanner.read_file
+
+        def traced_read_file(path: str) -> str:
+            with tracer.span('read_file', 'io', {'path': path}):
+                return read_file(path)
+        scanner.read_file = traced_read_file
+
+        for attr in dir(type(scanner)):
+            if attr.startswith('get_') and callable(getattr(type(scanner), attr)):
+                setattr(scanner, attr, self.wrap(getattr(scanner, attr), f"Scanner.{attr}", 'scanner'))
+        return scanner
+
+    def to_chrome(self) -> Dict[str, Any]:
+        events = list(self.events)
+        for tid, name in self.thread_names.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': tid, 'args': {'name': name}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write_chrome(self, path: str):
+        with _real_open(path, 'w') as f:
+            json.dump(self.to_chrome(), f)
+
+    def summary(self, cats=('collector', 'scanner', 'subprocess', 'io')) -> List[Dict[str, Any]]:
+        """Per-name totals, slowest first. Spans include nested spans on the same thread."""
+        rows = {}
+        for e in self.events:
+            if e['cat'] not in cats:
+                continue
+            row = rows.get(e['name'])
+            if row is None:
+                row = rows[e['name']] = {'name': e['name'], 'cat': e['cat'], 'calls': 0, 'total': 0.0,
+                                         'max': 0.0, 'bytes': 0, 'files': 0, 'procs': 0}
+            dur = e['dur'] / 1e6
+            row['calls'] += 1
+            row['total'] += dur
+            row['max'] = max(row['max'], dur)
+            for key in ('bytes', 'files', 'procs'):
+                row[key] += e['args'].get(key, 0)
+        return sorted(rows.values(), key=lambda r: -r['total'])
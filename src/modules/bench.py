@@ -0,0 +1,97 @@
+import json
+import resource
+import sys
+import time
+from typing import Any, Dict, List, Optional
+from src.core.scanner import Scanner
+from src.core.formatter import Formatter
+from src.core.bench import FixtureBuilder, REGRESSION_THRESHOLD, compare, default_fixture_dir, run_suite
+
+class BenchModule:
+    """Times every collector against a synthetic fixture tree (or any --root)."""
+
+    def __init__(self, formatter: Formatter, iterations: int = 20, scale: float = 1.0,
+                 root: Optional[str] = None, baseline: Optional[str] = None, names: Optional[List[str]] = None):
+        self.formatter = formatter
+        self.iterations = iterations
+        self.scale = scale
+        self.root = root
+        self.baseline = baseline
+        self.names = names
+        self.regressions = []  # type: List[str]
+
+    def progress(self, message: str):
+        if sys.stderr.isatty():
+            sys.stderr.write(f"\r\033[K{self.formatter.color(message, 'gray')}")
+            sys.stderr.flush()
+
+    def prepare(self) -> str:
+        """Returns the root to benchmark, generating the synthetic tree on first use."""
+        if self.root:
+            return self.root
+        builder = FixtureBuilder(default_fixture_dir(self.scale), scale=self.scale)
+        if not builder.is_built():
+            self.progress(f"Generating fixture in {builder.root} ...")
+            started = time.monotonic()
+            builder.build()
+            self.progress(f"Fixture generated in {time.monotonic() - started:.1f}s")
+        return builder.root
+
+    def collect(self) -> Dict[str, Any]:
+        root = self.prepare()
+        scanner = Scanner(root=root)
+        results = run_suite(scanner, self.iterations, self.names, progress=lambda n: self.progress(f"Benchmarking {n} ..."))
+        self.progress("")
+        data = {
+            'root': root,
+            'scale': None if self.root else self.scale,
+            'iterations': self.iterations,
+            'python': sys.version.split()[0],
+            'max_rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+            'collectors': {name: r.to_dict() for name, r in results.items()},
+        }
+        if self.baseline:
+            with open(self.baseline) as f:
+                baseline = json.load(f)
+            data['changes'] = compare(data['collectors'], baseline.get('collectors', baseline))
+            data['regressions'] = self.regressions = sorted(n for n, c in data['changes'].items() if c > REGRESSION_THRESHOLD)
+        return data
+
+    def run(self):
+        self.render(self.collect())
+
+    @staticmethod
+    def format_time(seconds: float) -> str:
+        if seconds < 1e-3:
+            return f"{seconds * 1e6:.0f} µs"
+        if seconds < 1:
+            return f"{seconds * 1e3:.2f} ms"
+        return f"{seconds:.2f} s"
+
+    def render(self, data: Dict[str, Any]):
+        source = f"synthetic x{data['scale']:g}" if data['scale'] is not None else data['root']
+        self.formatter.header(f"Collector Benchmark ({source})")
+        changes = data.get('changes', {})
+
+        header = f"{'COLLECTOR':<18} {'OPS/S':>10} {'P50':>10} {'P99':>10} {'PEAK MEM':>10}"
+        if 'changes' in data:
+            header += f" {'VS BASE':>9}"
+        print(header)
+        print("─" * (len(header) + 2))
+        for name, r in data['collectors'].items():
+            line = (f"{name:<18} {r['ops_per_sec']:>10.1f} {self.format_time(r['p50']):>10} "
+                    f"{self.format_time(r['p99']):>10} {self.formatter.format_size(r['peak_memory'] / 1024):>10}")
+            if name in changes:
+                change = changes[name]
+                color = "red" if change > REGRESSION_THRESHOLD else "green" if change < -REGRESSION_THRESHOLD else "gray"
+                line += " " + self.formatter.color(f"{change * 100:>+8.1f}%", color)
+            print(line)
+
+        print("\n" + self.formatter.color(
+            f"{data['iterations']} iterations per collector, Python {data['python']}, "
+            f"process peak RSS {self.formatter.format_size(data['max_rss'] / 1024)}.", "gray"))
+        if data.get('regressions'):
+            print(self.formatter.color(f"Regressions (p50 > +{REGRESSION_THRESHOLD * 100:.0f}%): "
+                                       f"{', '.join(data['regressions'])}", "red", bold=True))
+        elif 'changes' not in data:
+            print(self.formatter.color("Save with --json to compare later runs via --bench-baseline FILE.", "gray"))
@@ -0,0 +1,98 @@
+import time
+from typing import Dict, Any, Optional
+from src.core.scanner import Scanner
+from src.core.formatter import Formatter
+
+class CgroupsModule:
+    def __init__(self, scanner: Scanner, formatter: Formatter, sort: str = 'memory', limit: int = 15):
+        self.scanner = scanner
+        self.formatter = formatter
+        self.sort = sort
+        self.limit = limit
+
+    def start_sampling(self):
+        """Takes a first sample so later collect() calls report CPU% and I/O rates."""
+        if self.scanner.cgroups.last_time is None:
+            self.scanner.get_cgroups()
+
+    def collect(self) -> Dict[str, Any]:
+        collector = self.scanner.get_cgroups()
+        if not collector.available:
+            return {'available': False}
+        return {
+            'available': True,
+            'root': collector.root,
+            'count': len(collector),
+            'rescanned': collector.rescanned,
+            'sort': self.sort,
+            'tree': [dict(n.to_dict(), omitted=omitted) for n, omitted in collector.tree(max_depth=2, max_children=8)],
+            'top': [n.to_dict() for n in collector.top(self.sort, self.limit)],
+        }
+
+    def run(self):
+        self.render(self.collect())
+
+    def render(self, data: Dict[str, Any]):
+        self.formatter.header("Control Groups")
+
+        if not data['available']:
+            print(self.formatter.color("No cgroup v2 hierarchy found (cgroup v1-only host?).", "yellow"))
+            return
+
+        size = lambda b: self.formatter.format_size(b / 1024) if b is not None else "-"
+        cpu = lambda g: f"{g['cpu_percent']:.1f}%" if g['cpu_percent'] is not None else "-"
+        io = lambda g: (size(g['io_bytes_per_sec']) + "/s") if g['io_bytes_per_sec'] is not None else size(g['io_read_bytes'] + g['io_write_bytes'])
+
+        def pressure(g):
+            worst = max(g['pressure'].values(), default=0.0)
+            text = f"{worst:.1f}%"
+            return self.formatter.color(f"{text:>8}", "red" if worst > 20 else "yellow" if worst > 5 else "gray")
+
+        header = f"{'CGROUP':<44} {'CPU':>7} {'MEMORY':>10} {'IO':>12} {'PSI':>8}"
+
+        print(f"\n{self.formatter.color('SLICES', 'white', bold=True)}")
+        print(header)
+        print("─" * (len(header) + 2))
+        # "… N more" notes are printed once the subtree they belong to is done
+        pending = []
+        for g in data['tree']:
+            while pending and pending[-1][0] >= g['depth']:
+                depth, omitted = pending.pop()
+                print(self.formatter.color("  " * depth + f"… {omitted} more", "gray"))
+            if g['omitted']:
+                pending.append((g['depth'], g['omitted']))
+            if g['depth'] == 0:
+                continue
+            name = "  " * (g['depth'] - 1) + g['path'].rsplit('/', 1)[-1]
+            print(f"{name[:44]:<44} {cpu(g):>7} {size(g['memory']):>10} {io(g):>12} {pressure(g)}")
+        for depth, omitted in reversed(pending):
+            print(self.formatter.color("  " * depth + f"… {omitted} more", "gray"))
+
+        title = f"TOP CGROUPS BY {data['sort'].upper()}"
+        print(f"\n{self.formatter.color(title, 'white', bold=True)}")
+        print(header)
+        print("─" * (len(header) + 2))
+        for g in data['top']:
+            path = g['path'] if len(g['path']) <= 44 else "…" + g['path'][-43:]
+            print(f"{path:<44} {cpu(g):>7} {size(g['memory']):>10} {io(g):>12} {pressure(g)}")
+
+        note = f"{data['count']} cgroups under {data['root']}. PSI is the worst 10s stall average (cpu/memory/io)."
+        if data['top'] and data['top'][0]['cpu_percent'] is None:
+            note += " CPU% and I/O rates need --interval or --watch."
+        print("\n" + self.formatter.color(note, "gray"))
+
+    def run_live(self, interval: float = 2.0, iterations: Optional[int] = None):
+        """Refreshes the cgroup view every `interval` seconds with CPU% and I/O rates."""
+        self.start_sampling()
+        tick = 0
+        try:
+            with self.formatter.live():
+                while iterations is None or tick < iterations:
+                    time.sleep(interval)
+                    data = self.collect()
+                    tick += 1
+
+                    with self.formatter.frame():
+                        self.render(data)
+        except KeyboardInterrupt:
+            pass
@@ -1,60 +1,136 @@
+from typing import Dict, Any, List
 from src.core.scanner import Scanner
 from src.core.formatter import Formatter
+from src.core.scheduler import CollectorScheduler
+from src.core.hwinfo import PCI_DISPLAY, PCI_NETWORK, PCI_STORAGE
 
 class HardwareModule:
-    def __init__(self, scanner: Scanner, formatter: Formatter):
+    def __init__(self, scanner: Scanner, formatter: Formatter, scheduler: CollectorScheduler = None):
         self.scanner = scanner
         self.formatter = formatter
+        self.scheduler = scheduler or CollectorScheduler()
+
+    @staticmethod
+    def pci_name(d: Dict[str, Any]) -> str:
+        """'Vendor Device' from pci.ids, or the raw IDs as lspci -n prints them."""
+        if d['device']:
+            return f"{d['vendor']} {d['device']}"
+        if d['vendor']:
+            return f"{d['vendor']} [{d['device_id']}]"
+        return f"[{d['vendor_id']}:{d['device_id']}]"
+
+    def register_collectors(self, scheduler: CollectorScheduler):
+        # Everything below is plain sysfs/procfs reads: no root, no lspci or dmidecode
+        scheduler.register('cpu', self.scanner.get_cpuinfo, group='hardware', default={})
+        scheduler.register('mem', self.scanner.get_meminfo, group='hardware', default={})
+        scheduler.register('dmi', self.scanner.get_dmi, group='hardware', default={})
+        scheduler.register('pci', self.scanner.get_pci_devices, group='hardware', default=[])
+        scheduler.register('usb', self.scanner.get_usb_devices, group='hardware', default=[])
+        scheduler.register('virt', self.scanner.get_virtualization, group='hardware', default=None)
+
+    def collect(self) -> Dict[str, Any]:
+        self.register_collectors(self.scheduler)
+        results = self.scheduler.run('hardware')
+        pci = results['pci']
+
+        def by_class(class_id: str) -> List[str]:
+            # Identical controllers (e.g. several NVMe drives) are listed once with a count
+            counts = {}  # type: Dict[str, int]
+            for d in pci:
+                if d['class_id'] == class_id:
+                    name = self.pci_name(d)
+                    counts[name] = counts.get(name, 0) + 1
+            return [f"{name} (x{n})" if n > 1 else name for name, n in counts.items()]
+
+        return {
+            'cpu': results['cpu'],
+            'memory_total': results['mem'].get('MemTotal', 0),
+            'gpus': by_class(PCI_DISPLAY),
+            'network_controllers': by_class(PCI_NETWORK),
+            'storage_controllers': by_class(PCI_STORAGE),
+            'dmi': results['dmi'],
+            'pci': pci,
+            'usb': [d for d in results['usb'] if not d['hub']],
+            'virtualization': results['virt'],
+            'timed_out': sorted(results.timed_out),
+        }
 
     def run(self):
+        self.render(self.collect())
+
+    def render(self, data: Dict[str, Any]):
         self.formatter.header("Hardware Deep Info")
-        
-        cpu = self.scanner.get_cpuinfo()
-        mem = self.scanner.get_meminfo()
-        
+        timed_out = self.formatter.color("timed out", "gray")
+
+        cpu = data['cpu']
+
         # CPU Detailed
-        self.formatter.kv("CPU Model", cpu.get('model', 'Unknown'), "")
+        self.formatter.kv("CPU Model", cpu.get('model', 'Unknown'), "")
         self.formatter.kv("Cores/Threads", str(cpu.get('cores', 'Unknown')), "󰻠")
         self.formatter.kv("Cache Size", cpu.get('cache', 'Unknown'), "󰍛")
-        
-        # VGA / GPU (simple lshw or lspci if available, else skip)
-        try:
-            import subprocess
-            gpu_info = subprocess.check_output(['lspci'], stderr=subprocess.DEVNULL).decode()
-            vga = [l for l in gpu_info.splitlines() if "VGA" in l or "3D controller" in l]
-            if vga:
-                self.formatter.kv("GPU", vga[0].split(':')[-1].strip(), "󰾲")
-        except:
-            pass
+
+        if 'pci' in data['timed_out']:
+            self.formatter.kv("GPU", timed_out, "󰾲")
+        for gpu in data['gpus']:
+            self.formatter.kv("GPU", gpu, "󰾲")
+        for nic in data['network_controllers']:
+            self.formatter.kv("Network", nic, "󰛳")
+        for controller in data['storage_controllers']:
+            self.formatter.kv("Storage", controller, "󰋊")
 
         # Memory configuration
-        total_mem = self.formatter.format_size(mem.get('MemTotal', 0))
-        self.formatter.kv("Total RAM", total_mem, "")
-        
-        # Motherboard / BIOS (requires root for dmidecode)
-        if self.scanner.is_root():
-            try:
-                import subprocess
-                mboard = subprocess.check_output(['dmidecode', '-s', 'baseboard-product-name'], stderr=subprocess.DEVNULL).decode().strip()
-                vendor = subprocess.check_output(['dmidecode', '-s', 'baseboard-manufacturer'], stderr=subprocess.DEVNULL).decode().strip()
-                if mboard:
-                    self.formatter.kv("Motherboard", f"{vendor} {mboard}", "󰟀")
-                
-                bios = subprocess.check_output(['dmidecode', '-s', 'bios-version'], stderr=subprocess.DEVNULL).decode().strip()
-                if bios:
-                    self.formatter.kv("BIOS Version", bios, "󰣖")
-            except:
-                pass
-        
+        total_mem = self.formatter.format_size(data['memory_total'])
+        self.formatter.kv("Total RAM", total_mem, "")
+
+        dmi = data['dmi']
+        if 'dmi' in data['timed_out']:
+            self.formatter.kv("Motherboard", timed_out, "󰟀")
+        else:
+            if dmi.get('product_name'):
+                system = f"{dmi.get('sys_vendor', '')} {dmi['product_name']} {dmi.get('product_version', '')}".strip()
+                self.formatter.kv("System", system, "󰌢")
+            if dmi.get('chassis'):
+                self.formatter.kv("Chassis", dmi['chassis'], "󰌢")
+            if dmi.get('board_name'):
+                self.formatter.kv("Motherboard", f"{dmi.get('board_vendor', '')} {dmi['board_name']} {dmi.get('board_version', '')}".strip(), "󰟀")
+            if dmi.get('bios_version'):
+                bios = f"{dmi.get('bios_vendor', '')} {dmi['bios_version']}".strip()
+                if dmi.get('bios_date'):
+                    bios += f" ({dmi['bios_date']})"
+                self.formatter.kv("BIOS Version", bios, "󰣖")
+
         # Virtualization
-        try:
-            virt = self.scanner.read_file('/proc/cpuinfo')
-            if 'hypervisor' in virt:
-                self.formatter.kv("Virtualization", "Detected (Running in VM/Container)", "󰖟")
-            else:
-                self.formatter.kv("Virtualization", "None (Bare Metal)", "󰖟")
-        except:
-            pass
-        
-        if self.scanner.is_root():
-            print("\n" + self.formatter.color("Honest Hardware Note: Root access used to read DMI tables for full hardware accuracy.", "yellow"))
+        virt = data['virtualization']
+        if 'virt' in data['timed_out']:
+            self.formatter.kv("Virtualization", timed_out, "󰖟")
+        elif virt is not None:
+            parts = []
+            if virt['type'] == 'vm':
+                parts.append(f"VM ({virt['name']})")
+            if virt['container']:
+                parts.append(f"Container ({virt['container']})")
+            self.formatter.kv("Virtualization", ", ".join(parts) or "None (Bare Metal)", "󰖟")
+
+        self.render_pci(data['pci'])
+        self.render_usb(data['usb'])
+
+    def render_pci(self, devices: List[Dict[str, Any]]):
+        if not devices:
+            return
+        print(f"\n{self.formatter.color('PCI DEVICES', 'white', bold=True)}")
+        for d in devices:
+            slot = d['slot'][5:] if d['slot'].startswith('0000:') else d['slot']
+            kind = d['class'] or f"Class {d['class_id']}{d['subclass_id']}"
+            driver = self.formatter.color(f" [{d['driver']}]", 'gray') if d['driver'] else ""
+            print(f"  {slot:<8} {kind[:28]:<28} {self.pci_name(d)}{driver}")
+        if not any(d['vendor'] for d in devices):
+            print(self.formatter.color("Install pciutils (pci.ids) to see device names.", "gray"))
+
+    def render_usb(self, devices: List[Dict[str, Any]]):
+        if not devices:
+            return
+        print(f"\n{self.formatter.color('USB DEVICES', 'white', bold=True)}")
+        for d in devices:
+            name = " ".join(p for p in (d['manufacturer'], d['product']) if p) or "Unknown device"
+            speed = self.formatter.color(f" ({d['speed']} Mbit/s)", 'gray') if d['speed'] else ""
+            print(f"  {d['vendor_id']}:{d['product_id']}  {name}{speed}")
@@ -1,61 +1,181 @@
+from typing import Dict, Any
 from src.core.scanner import Scanner
 from src.core.formatter import Formatter
+from src.core.scheduler import CollectorScheduler
+from src.core.pressure import PressureSampler, stall_percent
+from src.core.hwmon import cpu_temperature
+from src.core.rules import RuleEngine, alert_level, health_facts, health_verdict
 
 class HealthModule:
-    def __init__(self, scanner: Scanner, formatter: Formatter):
+    def __init__(self, scanner: Scanner, formatter: Formatter, scheduler: CollectorScheduler = None,
+                 rules: RuleEngine = None):
         self.scanner = scanner
         self.formatter = formatter
+        self.scheduler = scheduler or CollectorScheduler()
+        # Thresholds live in the rules (built-in or from ~/.config/myfetch/config)
+        self.rules = rules or RuleEngine.default()
+
+    def register_collectors(self, scheduler: CollectorScheduler):
+        scheduler.register('temps', self.scanner.get_temperatures, group='health', default={})
+        scheduler.register('sensors', self.scanner.get_sensors, group='health', default=[])
+        scheduler.register('throttle', self.scanner.get_thermal_throttle, group='health', default=None)
+        scheduler.register('mem', self.scanner.get_meminfo, group='health', default={})
+        scheduler.register('battery', self.scanner.get_battery_info, group='health', default=None)
+        scheduler.register('load', self.scanner.get_loadavg, group='health', default=[0.0, 0.0, 0.0])
+        scheduler.register('pressure', self.scanner.get_pressure, group='health', default={})
+        scheduler.register('failed', self.scanner.get_failed_units, group='health', timeout=3.0, default=None)
+
+    def collect(self) -> Dict[str, Any]:
+        self.register_collectors(self.scheduler)
+        # Unit states are shared within a pass, not across --watch ticks
+        self.scanner.systemd.expire()
+        results = self.scheduler.run('health')
+        temps = results['temps']
+        mem = results['mem']
+
+        # CPU Temperature: the package sensor from hwmon, else the best-named thermal zone
+        sensors = results['sensors']
+        cpu_sensor = cpu_temperature(sensors)
+        if cpu_sensor:
+            pkg_temp = cpu_sensor['value']
+        else:
+            pkg_temp = temps.get('x86_pkg_temp', temps.get('Package id 0', next(iter(temps.values())) if temps else 0))
+
+        # Memory Pressure
+        total = mem.get('MemTotal', 0)
+        available = mem.get('MemAvailable', mem.get('MemFree', 0) + mem.get('Cached', 0))
+        used = total - available
+        memory_percent = (used / total * 100) if total > 0 else 0
+
+        # Only rules whose inputs changed since the last --watch tick are re-evaluated
+        facts = health_facts(load=results['load'], memory_percent=memory_percent, pressure=results['pressure'],
+                             cpu_sensor=cpu_sensor, cpu_temp=pkg_temp, sensors=sensors, throttle=results['throttle'],
+                             failed_units=results['failed'])
+        alerts = self.rules.evaluate(facts)
+        verdict, reasons = health_verdict(alerts)
+
+        return {
+            'temperatures': temps,
+            'cpu_temp': pkg_temp or None,
+            'cpu_temp_level': alert_level(alerts, 'cpu_temperature'),
+            'sensors': sensors,
+            'thermal_throttle': results['throttle'],
+            'memory_percent': memory_percent,
+            'memory_level': alert_level(alerts, 'memory'),
+            'battery': results['battery'],
+            'load': results['load'],
+            'pressure': results['pressure'],
+            'failed_services': results['failed'],
+            'alerts': alerts,
+            'health': {'verdict': verdict, 'reasons': reasons},
+            'timed_out': sorted(results.timed_out),
+        }
 
     def run(self):
+        self.render(self.collect())
+
+    def render(self, data: Dict[str, Any]):
         self.formatter.header("System Health & Hardware")
-        
-        temps = self.scanner.get_temperatures()
-        mem = self.scanner.get_meminfo()
-        battery = self.scanner.get_battery_info()
-        load = self.scanner.get_loadavg()
-        
-        # CPU Temperature
-        pkg_temp = temps.get('x86_pkg_temp', temps.get('Package id 0', next(iter(temps.values())) if temps else 0))
+
+        pkg_temp = data['cpu_temp']
         temp_str = f"{pkg_temp:.1f}°C" if pkg_temp else "N/A"
-        
+
+        level = data['cpu_temp_level']
         health_color = "green"
-        if pkg_temp and pkg_temp > 80:
+        if level == 'critical':
             health_color = "red"
             hint = "(Critical: CPU is overheating!)"
-        elif pkg_temp and pkg_temp > 65:
+        elif level == 'warning':
             health_color = "yellow"
             hint = "(Warning: CPU temperature is high)"
         else:
             hint = "(Safe range)"
             
-        self.formatter.kv("CPU Temp", f"{self.formatter.color(temp_str, health_color)} {self.formatter.color(hint, 'gray')}", "")
+        self.formatter.kv("CPU Temp", f"{self.formatter.color(temp_str, health_color)} {self.formatter.color(hint, 'gray')}", "")
 
-        # Memory Pressure
-        total = mem.get('MemTotal', 0)
-        available = mem.get('MemAvailable', mem.get('MemFree', 0) + mem.get('Cached', 0))
-        used = total - available
-        percent = (used / total * 100) if total > 0 else 0
-        
+        throttle = data['thermal_throttle']
+        if throttle:
+            events = throttle['core_events'] + throttle['package_events']
+            if throttle['since_boot']:
+                status = self.formatter.color(f"{events} events since boot", "gray")
+            elif events:
+                cpus = ", ".join(map(str, throttle['throttled_cpus'][:8]))
+                if len(throttle['throttled_cpus']) > 8:
+                    cpus += f" +{len(throttle['throttled_cpus']) - 8}"
+                status = self.formatter.color(f"{events} new events", "red") + (self.formatter.color(f" (CPUs {cpus})", "gray") if cpus else "")
+            else:
+                status = self.formatter.color("None since last sample", "green")
+            self.formatter.kv("Thermal Throttling", status, "")
+
+        self.render_sensors(data['sensors'], [a for a in data['alerts'] if a['rule'] == 'sensor_limits'])
+
+        percent = data['memory_percent']
         mem_status = "Healthy"
-        if percent > 90: mem_status = "Critical (Out of memory risk)"
-        elif percent > 75: mem_status = "Warning (High memory pressure)"
+        if data['memory_level'] == 'critical': mem_status = "Critical (Out of memory risk)"
+        elif data['memory_level'] == 'warning': mem_status = "Warning (High memory pressure)"
         
-        self.formatter.kv("Memory Status", f"{mem_status} ({percent:.1f}% used)", "")
+        self.formatter.kv("Memory Status", f"{mem_status} ({percent:.1f}% used)", "")
+
+        # Pressure stall information: share of time tasks waited on each resource
+        pressure = data['pressure']
+        if pressure:
+            labels = {'cpu': "CPU", 'memory': "Memory", 'io': "I/O"}
+            for resource in PressureSampler.RESOURCES:
+                kinds = pressure.get(resource)
+                if not kinds:
+                    continue
+                parts = []
+                for kind in ('some', 'full'):
+                    if kind in kinds and not (resource == 'cpu' and kind == 'full'):
+                        stalled = stall_percent(kinds[kind])
+                        color = "red" if stalled > 20 else "yellow" if stalled > 5 else "green"
+                        parts.append(f"{kind} {self.formatter.color(f'{stalled:.1f}%', color)}")
+                window = "now" if 'rate' in kinds.get('some', {}) else "60s avg"
+                self.formatter.kv(f"{labels[resource]} Pressure", f"{' / '.join(parts)} {self.formatter.color(f'({window})', 'gray')}", "")
+        elif 'pressure' not in data['timed_out']:
+            self.formatter.kv("Pressure", self.formatter.color("N/A (kernel without PSI)", "gray"), "")
 
         # Battery
+        battery = data['battery']
         if battery:
             bat_status = f"{battery['capacity']}% ({battery['status']})"
             self.formatter.kv("Battery", bat_status, "󰁹")
 
         # Services Check (Basic detection of failed systemd services)
-        try:
-            import subprocess
-            failed_services = subprocess.check_output(['systemctl', 'list-units', '--state=failed', '--no-legend'], stderr=subprocess.STDOUT).decode().strip()
-            if failed_services:
-                self.formatter.kv("Failed Services", self.formatter.color("Detection Pending (See --services)", "yellow"), "")
-            else:
-                self.formatter.kv("Services Status", self.formatter.color("All services running normally", "green"), "")
-        except:
-            pass
+        failed_services = data['failed_services']
+        if 'failed' in data['timed_out']:
+            self.formatter.kv("Services Status", self.formatter.color("timed out", "gray"), "")
+        elif failed_services:
+            names = ", ".join(u['unit'] for u in failed_services[:3])
+            if len(failed_services) > 3:
+                names += f" +{len(failed_services) - 3}"
+            self.formatter.kv("Failed Services", f"{self.formatter.color(names, 'red')} {self.formatter.color('(see --services)', 'gray')}", "")
+        elif failed_services is not None:
+            self.formatter.kv("Services Status", self.formatter.color("All services running normally", "green"), "")
+
+        health = data['health']
+        if health['reasons']:
+            severity = "red" if health['verdict'] == "Needs Attention" else "yellow"
+            summary = "; ".join(health['reasons'])
+            print("\n" + self.formatter.color(f"Overall Device Health Report: Attention needed: {summary}.", severity, bold=True))
+        else:
+            print("\n" + self.formatter.color("Overall Device Health Report: The system appears functional and stable.", "white", bold=True))
 
-        print("\n" + self.formatter.color("Overall Device Health Report: The system appears functional and stable.", "white", bold=True))
+    def render_sensors(self, sensors, alerts):
+        """Fan speeds and power draw on one line each, then any sensor the sensor_limits rule flags."""
+        fans = [r for r in sensors if r['kind'] == 'fan' and r['value'] > 0]
+        if fans:
+            shown = ", ".join(f"{r['label']} {r['value']:.0f} RPM" for r in fans[:4])
+            if len(fans) > 4:
+                shown += f" +{len(fans) - 4}"
+            self.formatter.kv("Fans", shown, "󰈐")
+        power = [r for r in sensors if r['kind'] == 'power']
+        if power:
+            self.formatter.kv("Power", ", ".join(f"{r['chip']} {r['value']:.1f} W" for r in power[:4]), "")
+        for a in alerts:
+            r = a['item']
+            limit = r['crit'] if a['severity'] == 'critical' else r['max']
+            color = "red" if a['severity'] == 'critical' else "yellow"
+            reading = self.formatter.color(f"{r['value']:g}{r['unit']}", color)
+            note = self.formatter.color(f"(limit {limit:g}{r['unit']})", 'gray') if limit else ""
+            self.formatter.kv("Sensor Alert", f"{r['chip']} {r['label']} {reading} {note}".rstrip(), "")
@@ -0,0 +1,92 @@
+import math
+import time
+from datetime import datetime
+from typing import Optional, Tuple
+from src.core.scanner import Scanner
+from src.core.formatter import Formatter
+from src.core.recorder import RingFile, parse_window, summarize
+
+class HistoryModule:
+    # (summary key, label, value formatter)
+    METRICS = [
+        ('load1', "Load (1m)", lambda f, v: f"{v:.2f}"),
+        ('load5', "Load (5m)", lambda f, v: f"{v:.2f}"),
+        ('mem_percent', "Memory Used", lambda f, v: f"{v:.1f}%"),
+        ('mem_available', "Memory Available", lambda f, v: f.format_size(v / 1024)),
+        ('net_rx_rate', "Network RX", lambda f, v: f.format_size(v / 1024) + "/s"),
+        ('net_tx_rate', "Network TX", lambda f, v: f.format_size(v / 1024) + "/s"),
+        ('temp_max', "Max Temperature", lambda f, v: f"{v:.1f}°C"),
+        ('disk_percent', "Fullest Disk", lambda f, v: f"{v:.1f}%"),
+    ]
+
+    def __init__(self, scanner: Scanner, formatter: Formatter, path: Optional[str] = None):
+        self.scanner = scanner
+        self.formatter = formatter
+        self.path = path
+
+    def sample(self) -> Tuple:
+        """One record in RECORD_FIELDS order."""
+        load = self.scanner.get_loadavg()
+        mem = self.scanner.get_meminfo()
+        total = mem.get('MemTotal', 0)
+        available = mem.get('MemAvailable', 0)
+        net = self.scanner.get_net_stats()
+        temps = self.scanner.get_temperatures()
+        storage = self.scanner.get_storage_info()
+        return (
+            time.time(),
+            load[0], load[1], load[2],
+            ((total - available) / total * 100) if total > 0 else 0.0,
+            available * 1024,
+            sum(s['rx'] for s in net.values()),
+            sum(s['tx'] for s in net.values()),
+            max(temps.values()) if temps else math.nan,
+            max((s['percent'] for s in storage if s['percent'] is not None), default=0.0),
+        )
+
+    def record(self, interval: float = 10.0):
+        """Appends a sample every `interval` seconds until interrupted."""
+        with RingFile(self.path, writable=True) as ring:
+            print(self.formatter.color(f"Recording every {interval:g}s to {ring.path} "
+                                       f"({ring.capacity} samples retained). Press Ctrl+C to stop.", "gray"))
+            try:
+                while True:
+                    started = time.monotonic()
+                    ring.append(self.sample())
+                    time.sleep(max(0.0, interval - (time.monotonic() - started)))
+            except KeyboardInterrupt:
+                print()
+
+    def run(self, window: str = "1h"):
+        try:
+            start, end = parse_window(window)
+        except ValueError as e:
+            print(self.formatter.color(str(e), "red"))
+            return
+
+        try:
+            ring = RingFile(self.path)
+        except (OSError, ValueError):
+            print(self.formatter.color("No history recorded yet. Start a recorder with 'myfetch --record'.", "yellow"))
+            return
+
+        with ring:
+            records = ring.window(start, end)
+            span = f"{datetime.fromtimestamp(start):%Y-%m-%d %H:%M} → {datetime.fromtimestamp(end):%Y-%m-%d %H:%M}"
+            self.formatter.header("History")
+            self.formatter.kv("Window", span, "󰔟")
+            self.formatter.kv("Samples", str(len(records)), "")
+
+            if not records:
+                print("\n" + self.formatter.color("No samples in this window.", "yellow"))
+                return
+
+            summary = summarize(records)
+            print(f"\n{'METRIC':<20} {'MIN':>12} {'AVG':>12} {'MAX':>12} {'P95':>12}")
+            print("─" * 72)
+            for key, label, fmt in self.METRICS:
+                if key not in summary:
+                    continue
+                stats = summary[key]
+                values = [fmt(self.formatter, stats[k]) for k in ('min', 'avg', 'max', 'p95')]
+                print(f"{label:<20} {values[0]:>12} {values[1]:>12} {values[2]:>12} {values[3]:>12}")
@@ -1,18 +1,57 @@
+import time
+from typing import Dict, Any, Optional
 from src.core.scanner import Scanner
 from src.core.formatter import Formatter
+from src.core.netrate import NetRateSampler
 
 class NetworkModule:
     def __init__(self, scanner: Scanner, formatter: Formatter):
         self.scanner = scanner
         self.formatter = formatter
+        self.sampler = None
+
+    def start_sampling(self):
+        """Keeps a NetRateSampler between collect() calls so rates can be computed."""
+        if self.sampler is None:
+            self.sampler = NetRateSampler(self.scanner.read_file)
+            self.sampler.sample()
+
+    def collect(self) -> Dict[str, Any]:
+        interfaces = self.scanner.get_interfaces()
+        data = {
+            'primary': self.scanner.get_primary_address(interfaces) or "Disconnected",
+            'interfaces': interfaces,
+            'counters': self.scanner.get_net_stats(),
+        }
+        if self.sampler is not None:
+            data['rates'] = self.sampler.sample()
+        return data
 
     def run(self):
+        self.render(self.collect())
+
+    def render(self, data: Dict[str, Any]):
         self.formatter.header("Network Analysis")
-        
-        ips = self.scanner.get_ip_addresses()
-        net_stats = self.scanner.get_net_stats()
-        
-        self.formatter.kv("Primary IP", ips.get('primary', 'Unknown'), "󰩟")
+
+        primary = data['primary']
+        interfaces = data['interfaces']
+        net_stats = data['counters']
+
+        self.formatter.kv("Primary IP", primary, "󰩟")
+
+        if interfaces:
+            print(f"\n{self.formatter.color('INTERFACES', 'white', bold=True)}")
+            print(f"{'IFACE':<12} {'STATE':<9} {'MTU':<7} {'SPEED':<11} {'ADDRESSES'}")
+            print("─" * 70)
+            for iface in interfaces:
+                state = iface['operstate']
+                state_color = "green" if state == "up" else "gray" if state == "unknown" else "red"
+                speed = f"{iface['speed']} Mb/s" if iface['speed'] else "-"
+                mtu = str(iface['mtu']) if iface['mtu'] else "-"
+                addresses = iface['ipv4'] + iface['ipv6']
+                print(f"{iface['name']:<12} {self.formatter.color(f'{state:<9}', state_color)} {mtu:<7} {speed:<11} {addresses[0] if addresses else '-'}")
+                for addr in addresses[1:]:
+                    print(f"{'':<42} {addr}")
         
         if not net_stats:
             print(self.formatter.color("No active network interfaces detected.", "yellow"))
@@ -27,8 +66,53 @@ class NetworkModule:
             tx = self.formatter.format_size(stats['tx'] / 1024)
             print(f"{iface:<12} {rx:<15} {tx:<15}")
 
-        status = "Healthy" if ips.get('primary') != "Disconnected" else "Disconnected"
+        # With sampling on (--watch), collect() adds smoothed per-interface rates
+        if data.get('rates') is not None:
+            print(f"\n{self.formatter.color('THROUGHPUT', 'white', bold=True)}")
+            self.render_rates(data['rates'])
+
+        status = "Healthy" if primary != "Disconnected" else "Disconnected"
         color = "green" if status == "Healthy" else "red"
         
         print("\n" + self.formatter.color(f"Connectivity Status: {status}", color, bold=True))
         print(self.formatter.color("Recommendation: Use --network for detailed routing and port scan (future update).", "gray"))
+
+    def render_live(self, data: Dict[str, Any], interval: float):
+        self.formatter.header(f"Network Throughput (every {interval:g}s)")
+        self.render_rates(data.get('rates', {}))
+        print("\n" + self.formatter.color("Rates are smoothed (EWMA). Press Ctrl+C to exit.", "gray"))
+
+    def render_rates(self, rates: Dict[str, Dict[str, float]]):
+        """Per-interface byte, packet, error and drop rates, busiest first."""
+        print(f"{'IFACE':<14} {'RX/s':>11} {'TX/s':>11} {'RX pkt/s':>10} {'TX pkt/s':>10} {'ERR/s':>7} {'DROP/s':>7}")
+        print("─" * 76)
+        busiest = sorted(rates.items(), key=lambda x: x[1]['rx_bytes'] + x[1]['tx_bytes'], reverse=True)
+        for iface, r in busiest:
+            rx = self.formatter.format_size(r['rx_bytes'] / 1024)
+            tx = self.formatter.format_size(r['tx_bytes'] / 1024)
+            errs = f"{r['errs']:>7.1f}"
+            drop = f"{r['drop']:>7.1f}"
+            if r['errs'] > 0:
+                errs = self.formatter.color(errs, "red")
+            if r['drop'] > 0:
+                drop = self.formatter.color(drop, "yellow")
+            print(f"{iface[:14]:<14} {rx:>11} {tx:>11} {r['rx_packets']:>10.1f} {r['tx_packets']:>10.1f} {errs} {drop}")
+        if not rates:
+            print(self.formatter.color("No active network interfaces detected.", "yellow"))
+
+    def run_live(self, interval: float = 2.0, iterations: Optional[int] = None):
+        """Samples /proc/net/dev every `interval` seconds and shows smoothed per-interface rates."""
+        self.start_sampling()
+        tick = 0
+        try:
+            with self.formatter.live():
+                while iterations is None or tick < iterations:
+                    time.sleep(interval)
+                    data = {'rates': self.sampler.sample()}
+                    tick += 1
+
+                    # Only the cells that changed since the last frame are redrawn
+                    with self.formatter.frame():
+                        self.render_live(data, interval)
+        except KeyboardInterrupt:
+            pass
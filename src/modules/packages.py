@@ -0,0 +1,37 @@
+from typing import Dict, Any
+from src.core.scanner import Scanner
+from src.core.formatter import Formatter
+
+class PackagesModule:
+    def __init__(self, scanner: Scanner, formatter: Formatter, limit: int = 15):
+        self.scanner = scanner
+        self.formatter = formatter
+        self.limit = limit
+
+    def collect(self) -> Dict[str, Any]:
+        inventory = self.scanner.get_packages()
+        return {
+            'counts': {manager: len(packages) for manager, packages in inventory.items()},
+            'packages': {manager: [{'name': n, 'version': v} for n, v in packages] for manager, packages in inventory.items()},
+        }
+
+    def run(self):
+        self.render(self.collect())
+
+    def render(self, data: Dict[str, Any]):
+        self.formatter.header("Installed Packages")
+
+        if not data['counts']:
+            print(self.formatter.color("No supported package database found (dpkg, rpm, pacman, flatpak, snap).", "yellow"))
+            return
+
+        for manager, count in data['counts'].items():
+            self.formatter.kv(manager, f"{count} packages", "󰏖")
+
+        for manager, packages in data['packages'].items():
+            title = f"{manager.upper()} (first {min(self.limit, len(packages))} of {len(packages)})"
+            print(f"\n{self.formatter.color(title, 'white', bold=True)}")
+            for p in packages[:self.limit]:
+                print(f"  {p['name'][:40]:<40} {self.formatter.color(p['version'], 'gray')}")
+
+        print("\n" + self.formatter.color("Read directly from the package databases; use --json for the full name/version lists.", "gray"))
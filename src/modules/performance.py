@@ -1,18 +1,96 @@
-from typing import Dict, Any
+import time
+from typing import Dict, Any, Optional
 from src.core.scanner import Scanner
 from src.core.formatter import Formatter
+from src.core.procmon import ProcessMonitor
+from src.core.pressure import stall_percent
+from src.core.cpustat import read_cpu_frequencies
 
 class PerformanceModule:
-    def __init__(self, scanner: Scanner, formatter: Formatter):
+    def __init__(self, scanner: Scanner, formatter: Formatter, memory: str = 'rss'):
         self.scanner = scanner
         self.formatter = formatter
+        # 'rss' (cheap, from /proc/[pid]/stat) or 'pss' (smaps_rollup for the largest processes)
+        self.memory = memory
+        self.monitor = None
+        self._users = {}
 
-    def run(self):
-        self.formatter.header("Performance Monitoring")
-        
+    def start_sampling(self):
+        """Keeps a ProcessMonitor between collect() calls so CPU% can be computed from deltas."""
+        if self.monitor is None:
+            self.monitor = ProcessMonitor(self.scanner.proc_path)
+            self.monitor.sample()
+            # Prime the PSI totals and CPU counters so the first refresh shows interval rates
+            self.scanner.get_pressure()
+            self.scanner.get_cpu_usage()
+
+    def collect(self) -> Dict[str, Any]:
         load = self.scanner.get_loadavg()
         mem = self.scanner.get_meminfo()
-        
+
+        total = mem.get('MemTotal', 0)
+        available = mem.get('MemAvailable', mem.get('MemFree', 0) + mem.get('Cached', 0))
+        used = total - available
+        topology = self.scanner.get_cpu_topology()
+        data = {
+            'load': load,
+            'pressure': self.scanner.get_pressure(),
+            'cpu_usage': self.scanner.get_cpu_usage(),
+            'cpu_topology': topology,
+            'cpu_frequencies': read_cpu_frequencies(self.scanner.sys_path, list(topology['cpus'])),
+            'memory': {
+                'total': total,
+                'available': available,
+                'used': used,
+                'percent': (used / total * 100) if total > 0 else 0,
+                'free': mem.get('MemFree', 0),
+                'cached': mem.get('Cached', 0),
+                'buffers': mem.get('Buffers', 0),
+                'slab': mem.get('Slab', 0),
+                'shared': mem.get('Shmem', 0),
+            },
+        }
+        if self.monitor is None:
+            if self.memory == 'pss':
+                data['memory_accounting'] = self.scanner.get_process_memory(limit=10)
+            else:
+                data['processes'] = self.scanner.get_top_processes(limit=5)
+        else:
+            # The monitor already holds every process; avoid a second /proc scan
+            self.monitor.sample()
+            data['processes'] = self.monitor.top(limit=5, key='rss')
+            data['cpu_processes'] = self.monitor.top(limit=10, key='cpu')
+            data['process_count'] = len(self.monitor)
+            data['processes_added'] = self.monitor.added
+            data['processes_removed'] = self.monitor.removed
+            data['monitor_overhead'] = self.monitor.overhead
+            if self.memory == 'pss':
+                from src.core.smaps import MemoryAccounting
+                accounting = MemoryAccounting(self.scanner.proc_path)
+                data['memory_accounting'] = accounting.inspect(self.monitor.memory_candidates(), limit=5)
+        return data
+
+    def user_name(self, uid) -> str:
+        if uid is None:
+            return "?"
+        name = self._users.get(uid)
+        if name is None:
+            import pwd
+            try:
+                name = pwd.getpwuid(uid).pw_name
+            except KeyError:
+                name = str(uid)
+            self._users[uid] = name
+        return name
+
+    def run(self):
+        self.render(self.collect())
+
+    def render(self, data: Dict[str, Any]):
+        self.formatter.header("Performance Monitoring")
+
+        load = data['load']
+
         # CPU Load
         load_str = f"{load[0]:.2f}, {load[1]:.2f}, {load[2]:.2f}"
         explanation = ""
@@ -22,31 +100,33 @@ class PerformanceModule:
             explanation = "(Normal operating load)"
         else:
             explanation = "(Heavy load detected, performance may be impacted)"
-        
+        cpu_psi = data['pressure'].get('cpu', {}).get('some')
+        if cpu_psi and load[0] >= 4.0 and stall_percent(cpu_psi) < 10:
+            # Load counts runnable and D-state tasks; PSI shows whether they actually wait
+            explanation = "(High load but little CPU contention)"
+
         self.formatter.kv("Load Average", f"{load_str} {self.formatter.color(explanation, 'gray')}", "󰓅")
+        self.render_pressure(data['pressure'])
+        self.render_cpus(data)
 
         # Memory Detailed
-        total = mem.get('MemTotal', 0)
-        available = mem.get('MemAvailable', mem.get('MemFree', 0) + mem.get('Cached', 0))
-        free = mem.get('MemFree', 0)
-        cached = mem.get('Cached', 0)
-        buffers = mem.get('Buffers', 0)
-        slab = mem.get('Slab', 0)
-        shared = mem.get('Shmem', 0)
-        
-        used = total - available
-        percent = (used / total * 100) if total > 0 else 0
-        
-        mem_str = f"{self.formatter.format_size(used)} used of {self.formatter.format_size(total)}"
-        self.formatter.kv("Memory Pressure", f"{self.formatter.get_progress_bar(percent)} {percent:.1f}%", "")
-        
+        mem = data['memory']
+        used = mem['used']
+        percent = mem['percent']
+
+        self.formatter.kv("Memory Pressure", f"{self.formatter.get_progress_bar(percent)} {percent:.1f}%", "")
+
         # Honest Breakdown
         print(f"\n{self.formatter.color('HONEST MEMORY BREAKDOWN', 'white', bold=True)}")
         self.formatter.kv("  Used (Apps/System)", self.formatter.format_size(used))
-        self.formatter.kv("  Cached/Buffers", self.formatter.color(self.formatter.format_size(cached + buffers), "gray"))
-        self.formatter.kv("  Kernel (Slab)", self.formatter.color(self.formatter.format_size(slab), "gray"))
-        self.formatter.kv("  Shared", self.formatter.color(self.formatter.format_size(shared), "gray"))
-        self.formatter.kv("  Truly Free", self.formatter.color(self.formatter.format_size(free), "green"))
+        self.formatter.kv("  Cached/Buffers", self.formatter.color(self.formatter.format_size(mem['cached'] + mem['buffers']), "gray"))
+        self.formatter.kv("  Kernel (Slab)", self.formatter.color(self.formatter.format_size(mem['slab']), "gray"))
+        self.formatter.kv("  Shared", self.formatter.color(self.formatter.format_size(mem['shared']), "gray"))
+        self.formatter.kv("  Truly Free", self.formatter.color(self.formatter.format_size(mem['free']), "green"))
+
+        if 'memory_accounting' in data:
+            self.render_pss(data['memory_accounting'])
+            return
 
         # Top Processes
         is_root = self.scanner.is_root()
@@ -57,10 +137,9 @@ class PerformanceModule:
             header = f"{'PID':<8} {'OWNER':<10} {'NAME':<20} {'MEMORY':<15}"
         print(header)
         print("─" * (len(header) + 5))
-        
-        processes = self.scanner.get_top_processes(limit=5)
+
         total_p_mem = 0
-        for p in processes:
+        for p in data['processes']:
             mem_readable = self.formatter.format_size(p['mem_bytes'] / 1024)
             if is_root:
                 owner = "root" if p['owner'] == 0 else str(p['owner'])
@@ -68,11 +147,143 @@ class PerformanceModule:
             else:
                 print(f"{p['pid']:<8} {p['name']:<20} {mem_readable:<15}")
             total_p_mem += p['mem_bytes']
-        
+
         print("─" * (len(header) + 5))
         total_readable = self.formatter.format_size(total_p_mem / 1024)
-        total_label_width = 18 if is_root else 8
         print(f"{'TOTAL (Top 5)':<29} {self.formatter.color(total_readable, 'yellow', bold=True):<15}")
-        
+
         print("\n" + self.formatter.color("Note: Total system usage includes kernel, many small processes, and reserved memory.", "gray"))
         print(self.formatter.color("Recommendation: Check high memory processes if system feels slow.", "cyan"))
+
+    def render_pss(self, acct: Dict[str, Any]):
+        size = lambda b: self.formatter.format_size(b / 1024)
+        print(f"\n{self.formatter.color('TOP PROCESSES BY PSS', 'white', bold=True)}")
+        header = f"{'PID':<8} {'OWNER':<10} {'NAME':<20} {'RSS':>10} {'PSS':>10} {'USS':>10} {'SWAP':>10}"
+        print(header)
+        print("─" * (len(header) + 2))
+        for p in acct['processes']:
+            print(f"{p['pid']:<8} {self.user_name(p['owner'])[:10]:<10} {p['name'][:20]:<20} {size(p['rss']):>10} "
+                  f"{size(p.get('pss', 0)):>10} {size(p['uss']):>10} {size(p.get('swap', 0)):>10}")
+
+        for key, title, label in (('by_name', 'BY PROCESS NAME', 'NAME'), ('by_user', 'BY USER', 'USER')):
+            print(f"\n{self.formatter.color(title, 'white', bold=True)}")
+            header = f"{label:<20} {'PROCS':>6} {'PSS':>10} {'USS':>10} {'SWAP':>10}"
+            print(header)
+            print("─" * (len(header) + 2))
+            for g in acct[key][:5]:
+                name = g['name'] if key == 'by_name' else self.user_name(g['owner'])
+                print(f"{name[:20]:<20} {g['count']:>6} {size(g['pss']):>10} {size(g['uss']):>10} {size(g['swap']):>10}")
+
+        note = f"PSS from smaps_rollup for the {acct['inspected']} largest processes by RSS"
+        if acct['unreadable']:
+            note += f" ({acct['unreadable']} not readable{'' if self.scanner.is_root() else ', run as root for all'})"
+        if acct['uninspected']:
+            note += f"; {acct['uninspected']} smaller processes ({size(acct['uninspected_rss'])} RSS) skipped"
+        print("\n" + self.formatter.color(note + ".", "gray"))
+        print(self.formatter.color("PSS splits shared pages between the processes mapping them; USS is memory freed if the process exits.", "cyan"))
+
+    def render_pressure(self, pressure: Dict[str, Any]):
+        """One line of PSI: share of time some/all tasks stalled on CPU, memory and I/O."""
+        if not pressure:
+            return
+        parts = []
+        for resource, label in (('cpu', "CPU"), ('memory', "Mem"), ('io', "I/O")):
+            kinds = pressure.get(resource)
+            if not kinds or 'some' not in kinds:
+                continue
+            values = [stall_percent(kinds['some'])]
+            if resource != 'cpu' and 'full' in kinds:
+                values.append(stall_percent(kinds['full']))
+            worst = max(values)
+            color = "red" if worst > 20 else "yellow" if worst > 5 else "green"
+            parts.append(f"{label} " + self.formatter.color("/".join(f"{v:.1f}%" for v in values), color))
+        window = "now" if 'rate' in pressure.get('cpu', {}).get('some', {}) else "60s avg"
+        self.formatter.kv("Stall (PSI)", "  ".join(parts) + " " + self.formatter.color(f"(some/full, {window})", "gray"), "")
+
+    def render_cpus(self, data: Dict[str, Any]):
+        """CPU time split, topology and a per-CPU heatmap (one glyph per logical CPU)."""
+        usage = data['cpu_usage']
+        if not usage['cpus']:
+            return
+        topology = data['cpu_topology']
+        total = usage['total']
+        split = "  ".join(f"{label} {total[field]:.1f}%" for field, label in
+                          (('user', "usr"), ('system', "sys"), ('iowait', "iowait"), ('irq', "irq"), ('softirq', "soft"), ('steal', "steal")))
+        window = "since boot" if usage['since_boot'] else f"last {usage['interval']:.1f}s"
+        self.formatter.kv("CPU Usage", f"{self.formatter.get_progress_bar(total['busy'])} {total['busy']:.1f}%  "
+                                       f"{self.formatter.color(f'{split} ({window})', 'gray')}", "")
+
+        if topology['threads']:
+            layout = f"{topology['sockets']} socket(s), {topology['cores']} cores, {topology['threads']} threads"
+            if topology['smt']:
+                layout += " (SMT)"
+            freqs = data['cpu_frequencies']
+            peak = max((c['max_mhz'] or 0 for c in topology['cpus'].values()), default=0)
+            if freqs:
+                layout += f", {sum(freqs.values()) / len(freqs) / 1000:.2f} GHz avg"
+                if peak:
+                    layout += f" of {peak / 1000:.2f} GHz max"
+            self.formatter.kv("Topology", layout, "")
+
+        cpus = usage['cpus']
+        if len(cpus) > 1:
+            width = 64
+            busy = [c['busy'] for c in cpus]
+            for row, line in enumerate(self.formatter.heatmap(busy, width)):
+                first = cpus[row * width]['cpu']
+                print(f"  {self.formatter.color(f'{first:>4}', 'gray')} {line}")
+
+    def render_live(self, data: Dict[str, Any], interval: float):
+        load = data['load']
+        percent = data['memory']['percent']
+        is_root = self.scanner.is_root()
+
+        self.formatter.header(f"Performance Monitoring (every {interval:g}s)")
+        self.formatter.kv("Load Average", f"{load[0]:.2f}, {load[1]:.2f}, {load[2]:.2f}", "󰓅")
+        self.render_pressure(data['pressure'])
+        self.render_cpus(data)
+        self.formatter.kv("Memory Pressure", f"{self.formatter.get_progress_bar(percent)} {percent:.1f}%", "")
+        self.formatter.kv("Processes", f"{data['process_count']} (+{data['processes_added']} / -{data['processes_removed']})", "")
+
+        print(f"\n{self.formatter.color('TOP PROCESSES BY CPU', 'white', bold=True)}")
+        header = f"{'PID':<8} {'NAME':<20} {'CPU%':>6} {'MEMORY':>12}"
+        if is_root:
+            header = f"{'PID':<8} {'OWNER':<10} {'NAME':<20} {'CPU%':>6} {'MEMORY':>12}"
+        print(header)
+        print("─" * (len(header) + 5))
+        for p in data['cpu_processes']:
+            mem_readable = self.formatter.format_size(p['mem_bytes'] / 1024)
+            if is_root:
+                owner = "root" if p['owner'] == 0 else str(p['owner'])
+                print(f"{p['pid']:<8} {owner:<10} {p['name'][:20]:<20} {p['cpu']:>6.1f} {mem_readable:>12}")
+            else:
+                print(f"{p['pid']:<8} {p['name'][:20]:<20} {p['cpu']:>6.1f} {mem_readable:>12}")
+
+        acct = data.get('memory_accounting')
+        if acct:
+            print(f"\n{self.formatter.color('TOP PROCESSES BY PSS', 'white', bold=True)}")
+            header = f"{'PID':<8} {'NAME':<20} {'PSS':>12} {'USS':>12} {'SWAP':>12}"
+            print(header)
+            print("─" * (len(header) + 5))
+            for p in acct['processes']:
+                print(f"{p['pid']:<8} {p['name'][:20]:<20} {self.formatter.format_size(p.get('pss', 0) / 1024):>12} "
+                      f"{self.formatter.format_size(p['uss'] / 1024):>12} {self.formatter.format_size(p.get('swap', 0) / 1024):>12}")
+
+        print("\n" + self.formatter.color(f"Monitor overhead: {data['monitor_overhead']:.2f}% of one core. Press Ctrl+C to exit.", "gray"))
+
+    def run_live(self, interval: float = 2.0, iterations: Optional[int] = None):
+        """Refreshes the view every `interval` seconds with per-process CPU% until Ctrl+C."""
+        self.start_sampling()
+        tick = 0
+        try:
+            with self.formatter.live():
+                while iterations is None or tick < iterations:
+                    time.sleep(interval)
+                    data = self.collect()
+                    tick += 1
+
+                    # Only the cells that changed since the last frame are redrawn
+                    with self.formatter.frame():
+                        self.render_live(data, interval)
+        except KeyboardInterrupt:
+            pass
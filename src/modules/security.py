@@ -1,16 +1,16 @@
 import os
+from typing import Dict, Any
 from src.core.scanner import Scanner
 from src.core.formatter import Formatter
+from src.core.scheduler import CollectorScheduler
 
 class SecurityModule:
-    def __init__(self, scanner: Scanner, formatter: Formatter):
+    def __init__(self, scanner: Scanner, formatter: Formatter, scheduler: CollectorScheduler = None):
         self.scanner = scanner
         self.formatter = formatter
+        self.scheduler = scheduler or CollectorScheduler()
 
-    def run(self):
-        self.formatter.header("Security Status")
-        
-        # 1. Firewall Check (basic)
+    def get_firewall_status(self) -> str:
         fw_status = "Unknown"
         try:
             if os.path.exists('/usr/sbin/ufw'):
@@ -23,28 +23,89 @@ class SecurityModule:
                 fw_status = "Active" if out == "running" else "Inactive"
         except:
             pass
-        
+        return fw_status
+
+    def get_ssh_status(self) -> str:
+        # Debian names the unit ssh.service, with sshd.service only as an alias
+        state = self.scanner.systemd.state('sshd', 'ssh') if self.scanner.is_live else None
+        if state is None:
+            return "Unknown"
+        return "Enabled" if state == 'active' else "Disabled"
+
+    def register_collectors(self, scheduler: CollectorScheduler):
+        scheduler.register('firewall', self.get_firewall_status, group='security', default="Unknown")
+        scheduler.register('ssh', self.get_ssh_status, group='security', timeout=3.0, default="Unknown")
+        scheduler.register('ports', self.scanner.get_listening_ports, group='security', default=[])
+
+    def collect(self) -> Dict[str, Any]:
+        self.register_collectors(self.scheduler)
+        # Unit states are shared within a pass, not across --watch ticks
+        self.scanner.systemd.expire()
+        results = self.scheduler.run('security')
+
+        # SELinux / AppArmor
+        sec_module = "None"
+        if os.path.exists(self.scanner.path('/sys/fs/selinux')):
+            sec_module = "SELinux (Enforcing)" # Simplifying for this tool
+        elif os.path.exists(self.scanner.path('/sys/kernel/security/apparmor')):
+            sec_module = "AppArmor"
+
+        return {
+            'firewall': results['firewall'],
+            'ssh': results['ssh'],
+            'kernel_security': sec_module,
+            'listening': results['ports'],
+            'timed_out': sorted(results.timed_out),
+        }
+
+    def run(self):
+        self.render(self.collect())
+
+    def render(self, data: Dict[str, Any]):
+        self.formatter.header("Security Status")
+        timed_out = self.formatter.color("timed out", "gray")
+
+        # 1. Firewall Check (basic)
+        fw_status = data['firewall']
         fw_color = "green" if fw_status == "Active" else "yellow"
-        self.formatter.kv("Firewall", self.formatter.color(fw_status, fw_color), "󰒃")
+        if 'firewall' in data['timed_out']:
+            self.formatter.kv("Firewall", timed_out, "󰒃")
+        else:
+            self.formatter.kv("Firewall", self.formatter.color(fw_status, fw_color), "󰒃")
 
         # 2. SSH Status
-        ssh_status = "Disabled"
-        try:
-            import subprocess
-            subprocess.check_output(['systemctl', 'is-active', 'sshd'], stderr=subprocess.STDOUT)
-            ssh_status = "Enabled"
-        except:
-            pass
+        ssh_status = timed_out if 'ssh' in data['timed_out'] else data['ssh']
         self.formatter.kv("SSH Service", ssh_status, "󰣀")
 
         # 3. SELinux / AppArmor
-        sec_module = "None"
-        if os.path.exists('/sys/fs/selinux'):
-            sec_module = "SELinux (Enforcing)" # Simplifying for this tool
-        elif os.path.exists('/sys/kernel/security/apparmor'):
-            sec_module = "AppArmor"
-            
-        self.formatter.kv("Kernel Security", sec_module, "󰞀")
+        self.formatter.kv("Kernel Security", data['kernel_security'], "󰞀")
+
+        # 4. Port audit (from /proc/net, no `ss` needed)
+        ports = data['listening']
+        exposed = 0
+        print(f"\n{self.formatter.color('LISTENING PORTS', 'white', bold=True)}")
+        if 'ports' in data['timed_out']:
+            print(timed_out)
+        elif not ports:
+            print(self.formatter.color("No listening sockets found.", "gray"))
+        else:
+            print(f"{'PROTO':<6} {'ADDRESS':<28} {'PORT':<7} {'PROGRAM':<20}")
+            print("─" * 65)
+            for p in ports:
+                program = f"{p['pid']}/{p['program']}" if p['pid'] else "-"
+                address = p['local']
+                if address in ('0.0.0.0', '::'):
+                    exposed += 1
+                    address = self.formatter.color(f"{address:<28}", "yellow")
+                elif address.startswith('127.') or address == '::1':
+                    address = self.formatter.color(f"{address:<28}", "gray")
+                else:
+                    address = f"{address:<28}"
+                print(f"{p['proto']:<6} {address} {p['port']:<7} {program:<20}")
+            if exposed:
+                print("\n" + self.formatter.color(f"{exposed} socket(s) listen on all interfaces.", "yellow"))
+            if not self.scanner.is_root():
+                print(self.formatter.color("Run with sudo to see the owners of every socket.", "gray"))
+        print()
 
-        
         print(self.formatter.color("Basic security risk summary: System is protected by kernel security modules.", "white"))
@@ -1,41 +1,93 @@
-import subprocess
+from typing import Dict, Any
 from src.core.scanner import Scanner
 from src.core.formatter import Formatter
+from src.core.scheduler import CollectorScheduler
 
 class ServicesModule:
-    def __init__(self, scanner: Scanner, formatter: Formatter):
+    def __init__(self, scanner: Scanner, formatter: Formatter, scheduler: CollectorScheduler = None, limit: int = 10):
         self.scanner = scanner
         self.formatter = formatter
+        self.scheduler = scheduler or CollectorScheduler()
+        self.limit = limit
+
+    def register_collectors(self, scheduler: CollectorScheduler):
+        # One `systemctl list-units` for every unit state, and blame/critical-chain side by side
+        scheduler.register('units', self.scanner.get_systemd_units, group='services', timeout=3.0, default=None)
+        scheduler.register('boot', self.scanner.get_boot_analysis, group='services', timeout=3.0, default=None)
+
+    def collect(self) -> Dict[str, Any]:
+        self.register_collectors(self.scheduler)
+        # Unit states are shared within a pass, not across --watch ticks
+        self.scanner.systemd.expire()
+        results = self.scheduler.run('services')
+        units = results['units']
+        boot = results['boot']
+        if units is not None:
+            running = [u for u in units if u['unit'].endswith('.service') and u['sub'] == 'running']
+            failed = [u for u in units if u['active'] == 'failed']
+        else:
+            running = failed = None
+        return {
+            'available': units is not None,
+            'units': len(units) if units is not None else None,
+            'running': len(running) if running is not None else None,
+            'failed': failed,
+            'boot_time': boot['userspace_time'] if boot else None,
+            'blame': boot['blame'][:self.limit] if boot else [],
+            'critical_chain': boot['critical_chain'] if boot else [],
+            'timed_out': sorted(results.timed_out),
+        }
 
     def run(self):
+        self.render(self.collect())
+
+    def render(self, data: Dict[str, Any]):
         self.formatter.header("System Services")
-        
-        # Debug: Confirming user privileges
-        # print(f"DEBUG: Current UID is {os.getuid()}") 
-        
-        try:
-            # Running services count
-            running = subprocess.check_output(['systemctl', 'list-units', '--state=running', '--no-legend']).decode().count('\n')
-            # Failed services list
-            failed = subprocess.check_output(['systemctl', 'list-units', '--state=failed', '--no-legend']).decode().strip()
-            
-            self.formatter.kv("Running Services", str(running), "󰒲")
+
+        timed_out = self.formatter.color("timed out", "gray")
+
+        if 'units' in data['timed_out']:
+            self.formatter.kv("Services Status", timed_out, "")
+        elif not data['available']:
+            print(self.formatter.color("Systemd not detected or inaccessible.", "yellow"))
+        else:
+            loaded = self.formatter.color(f"({data['units']} units loaded)", 'gray')
+            self.formatter.kv("Running Services", f"{data['running']} {loaded}", "󰒲")
+
+            failed = data['failed']
             if failed:
-                print(f"\n{self.formatter.color('FAILED SERVICES DETECTED', 'red', bold=True)}")
-                print(failed)
+                print(f"\n{self.formatter.color(f'FAILED UNITS ({len(failed)})', 'red', bold=True)}")
+                for u in failed:
+                    state = f"{u['load']}/{u['active']}/{u['sub']}"
+                    unit = self.formatter.color(f"{u['unit']:<40}", 'red')
+                    print(f"  {unit} {state:<24} {self.formatter.color(u['description'], 'gray')}")
             else:
-                self.formatter.kv("Services Status", self.formatter.color("All services operational", "green"), "")
+                self.formatter.kv("Services Status", self.formatter.color("All services operational", "green"), "")
 
-            # Boot performance (basic systemd-analyze)
-            try:
-                boot_time = subprocess.check_output(['systemd-analyze', 'time']).decode().strip()
-                self.formatter.kv("Boot Time", boot_time.split('=')[-1].strip(), "")
-            except:
-                pass
+        self.render_boot(data)
 
+        print("\n" + self.formatter.color("Tip: Use 'systemctl status <service>' for deep inspection.", "gray"))
 
-                
-        except:
-            print(self.formatter.color("Systemd not detected or inaccessible.", "yellow"))
+    def render_boot(self, data: Dict[str, Any]):
+        """Userspace boot time, the slowest units and the chain the default target waited on."""
+        if 'boot' in data['timed_out']:
+            self.formatter.kv("Boot Time", self.formatter.color("timed out", "gray"), "")
+            return
+        if data['boot_time'] is not None:
+            self.formatter.kv("Boot Time", f"{data['boot_time']:.2f}s {self.formatter.color('(userspace)', 'gray')}", "")
 
-        print("\n" + self.formatter.color("Tip: Use 'systemctl status <service>' for deep inspection.", "gray"))
+        if data['blame']:
+            print(f"\n{self.formatter.color('SLOWEST UNITS AT BOOT', 'white', bold=True)}")
+            for entry in data['blame']:
+                seconds = entry['seconds']
+                color = "red" if seconds > 10 else "yellow" if seconds > 3 else "green"
+                print(f"  {self.formatter.color(f'{seconds:>8.2f}s', color)}  {entry['unit']}")
+
+        if data['critical_chain']:
+            print(f"\n{self.formatter.color('CRITICAL CHAIN', 'white', bold=True)}")
+            for entry in data['critical_chain']:
+                timing = f"@{entry['at']:.2f}s" if entry['at'] is not None else ""
+                if entry['took']:
+                    timing += self.formatter.color(f" +{entry['took']:.2f}s", "yellow" if entry['took'] > 1 else "gray")
+                branch = "  " * (entry['depth'] - 1) + "└─" if entry['depth'] else ""
+                print(f"  {branch}{entry['unit']} {timing}")
@@ -1,15 +1,68 @@
+import time
+from typing import Dict, Any, Optional
 from src.core.scanner import Scanner
 from src.core.formatter import Formatter
+from src.core.diskstats import DiskStatsSampler
+from src.core.rules import RuleEngine, health_facts, item_level
 
 class StorageModule:
-    def __init__(self, scanner: Scanner, formatter: Formatter):
+    def __init__(self, scanner: Scanner, formatter: Formatter, limit: int = 15, include_remote: bool = False,
+                 rules: RuleEngine = None):
         self.scanner = scanner
         self.formatter = formatter
+        self.limit = limit
+        # Also list network, FUSE and overlay filesystems
+        self.include_remote = include_remote
+        # Usage tags come from the rules over filesystems (built-in or from ~/.config/myfetch/config)
+        self.rules = rules or RuleEngine.default()
+
+    def start_sampling(self):
+        """Takes a first diskstats sample so later collect() calls report interval rates."""
+        if self.scanner.disk_stats.last_time is None:
+            self.scanner.get_disk_io()
+
+    def collect(self) -> Dict[str, Any]:
+        storage = self.scanner.get_storage_info(include_remote=self.include_remote)
+
+        # Rows are already one per filesystem (major:minor), so BTRFS subvolumes and bind
+        # mounts are not counted twice; remote and unresponsive filesystems stay out of the total
+        total_cap = 0
+        total_used = 0
+        for s in storage:
+            if s['status'] == 'ok' and not s['remote']:
+                total_cap += s['total']
+                total_used += s['used']
+
+        # Map each mount to its block device, and each partition's mounts to its disk
+        io = self.scanner.get_disk_io()
+        index = DiskStatsSampler.index(io['devices'])
+        mounts = {}
+        for s in storage:
+            entry = index.get((s['major'], s['minor'])) or DiskStatsSampler.resolve(self.scanner.path(s['device']), index)
+            s['block_device'] = entry['name'] if entry else None
+            if entry:
+                disk = entry['parent'] if entry['partition'] else entry['name']
+                mounts.setdefault(disk, []).append(s['mount'])
+        devices = [dict(d, mounts=mounts.get(d['name'], [])) for d in io['devices'] if not d['partition']]
+        devices.sort(key=lambda d: (-(d['util'] or 0), -(d['reads'] + d['writes'])))
+
+        return {
+            'filesystems': storage,
+            'alerts': self.rules.evaluate(health_facts(filesystems=storage)),
+            'io': {'since_boot': io['since_boot'], 'interval': io['interval'],
+                   'devices': devices[:self.limit], 'omitted': max(0, len(devices) - self.limit)},
+            'total': total_cap,
+            'used': total_used,
+            'percent': (total_used / total_cap * 100) if total_cap > 0 else 0,
+        }
 
     def run(self):
+        self.render(self.collect())
+
+    def render(self, data: Dict[str, Any]):
         self.formatter.header("Storage & Filesystems")
         
-        storage = self.scanner.get_storage_info()
+        storage = data['filesystems']
         
         if not storage:
             print(self.formatter.color("No physical storage devices detected.", "yellow"))
@@ -18,38 +71,89 @@ class StorageModule:
         print(f"{'DEVICE':<15} {'MOUNT':<20} {'TYPE':<10} {'USAGE':<25}")
         print("─" * 70)
         
-        total_cap = 0
-        total_used = 0
-        seen_devices = set()
-        
+        tagged = False
         for s in storage:
-            # For total calculation, we only count each physical device once to avoid overcounting (e.g. BTRFS subvolumes)
-            if s['device'] not in seen_devices:
-                total_cap += s['total']
-                total_used += s['used']
-                seen_devices.add(s['device'])
-            
+            if s['status'] == 'unresponsive':
+                # statvfs did not return in time: typically a dead NFS server or a hung FUSE daemon
+                status = self.formatter.color("unresponsive", "red", bold=True)
+                print(f"{s['device']:<15} {s['mount']:<20} {s['type']:<10} {status}")
+                continue
             usage_str = f"{self.formatter.format_size(s['used'] / 1024)} / {self.formatter.format_size(s['total'] / 1024)}"
             bar = self.formatter.get_progress_bar(s['percent'], width=10)
             
             # Warning logic
             status_tag = ""
-            if s['percent'] > 90:
+            level = item_level(data['alerts'], 'filesystems', s['mount'])
+            tagged = tagged or level is not None
+            if level == 'critical':
                 status_tag = self.formatter.color(" [CRITICAL]", "red", bold=True)
-            elif s['percent'] > 80:
+            elif level == 'warning':
                 status_tag = self.formatter.color(" [WARNING]", "yellow", bold=True)
                 
             print(f"{s['device']:<15} {s['mount']:<20} {s['type']:<10} {bar} {s['percent']:>5.1f}%{status_tag}")
 
         print("─" * 70)
-        total_gb = total_cap / (1024**3)
-        used_gb = total_used / (1024**3)
-        total_percent = (total_used / total_cap * 100) if total_cap > 0 else 0
+        total_gb = data['total'] / (1024**3)
+        used_gb = data['used'] / (1024**3)
+        total_percent = data['percent']
         
         summary_str = f"TOTAL SYSTEM STORAGE: {used_gb:.1f} GB / {total_gb:.1f} GB ({total_percent:.1f}% Used)"
         print(self.formatter.color(summary_str, "white", bold=True))
 
-        if any(s['percent'] > 80 for s in storage):
+        self.render_io(data['io'])
+
+        if any(s['status'] == 'unresponsive' for s in storage):
+            timeout = self.scanner.mount_stat.timeout
+            print(self.formatter.color(f"\nSome mounts did not answer statvfs within {timeout:g}s; check their servers or FUSE daemons.", "red"))
+
+        if tagged:
             print(self.formatter.color("\nWarning: Some partitions are near capacity. Consider cleaning up old logs or temp files.", "yellow"))
         
         print("\n" + self.formatter.color("Performance Hint: Use 'noatime' mount option for better SSD performance.", "cyan"))
+
+    def render_io(self, io: Dict[str, Any]):
+        """Per-disk IOPS, throughput, latency and saturation; partitions are folded into their disk."""
+        if not io['devices']:
+            return
+        window = "averages since boot" if io['since_boot'] else f"last {io['interval']:.1f}s"
+        title = f"BLOCK DEVICE I/O ({window})"
+        print(f"\n{self.formatter.color(title, 'white', bold=True)}")
+        header = f"{'DEVICE':<14} {'R/S':>8} {'W/S':>8} {'READ':>11} {'WRITE':>11} {'AWAIT':>8} {'QD':>6} {'UTIL':>6}  MOUNTS"
+        print(header)
+        print("─" * (len(header) + 10))
+        # Rates are None when no time has elapsed (e.g. a --root tree without /proc/uptime)
+        rate = lambda bps: "-" if bps is None else self.formatter.format_size(bps / 1024) + "/s"
+        num = lambda value, spec: "-" if value is None else format(value, spec)
+        for d in io['devices']:
+            name = d['dm_name'] or d['name']
+            util = d['util']
+            if util is None:
+                color, util_str = "gray", "-"
+            else:
+                color, util_str = "red" if util > 90 else "yellow" if util > 60 else "green", f"{util:.1f}%"
+            mounts = ", ".join(d['mounts'][:2])
+            if len(d['mounts']) > 2:
+                mounts += f" +{len(d['mounts']) - 2}"
+            print(f"{name[:14]:<14} {num(d['read_iops'], '.1f'):>8} {num(d['write_iops'], '.1f'):>8} {rate(d['read_bps']):>11} "
+                  f"{rate(d['write_bps']):>11} {d['await']:>6.1f}ms {num(d['queue_depth'], '.2f'):>6} "
+                  f"{self.formatter.color(f'{util_str:>6}', color)}  {self.formatter.color(mounts, 'gray')}")
+        if io['omitted']:
+            print(self.formatter.color(f"… {io['omitted']} more devices", "gray"))
+        if io['since_boot']:
+            print(self.formatter.color("Add --interval N (or --watch N) for current rates.", "gray"))
+
+    def run_live(self, interval: float = 2.0, iterations: Optional[int] = None):
+        """Refreshes capacity and per-device I/O rates every `interval` seconds."""
+        self.start_sampling()
+        tick = 0
+        try:
+            with self.formatter.live():
+                while iterations is None or tick < iterations:
+                    time.sleep(interval)
+                    data = self.collect()
+                    tick += 1
+
+                    with self.formatter.frame():
+                        self.render(data)
+        except KeyboardInterrupt:
+            pass